@@ -0,0 +1,70 @@
+"""
+Compares registering the compiled resources.rcc to importing resources_rc, each in a fresh interpreter like a real launch
+
+Run from the repo root with: python -m Benchmarks.BenchResources
+"""
+import json
+import subprocess
+import sys
+
+from helpers.Resources import RCC_PATH, ROOT_DIR
+
+LAUNCHES = 10
+
+# PySide6 is imported before the clock starts, we only want the cost of getting the resources loaded
+_SCRIPT = '''
+import json, sys
+from time import perf_counter
+from PySide6.QtCore import QFile
+start = perf_counter()
+{load}
+elapsed = perf_counter() - start
+assert QFile.exists(':/icons/Static/pysplitIcon.png')
+print(json.dumps(elapsed))
+'''
+
+
+def launch(load: str) -> float:
+    """
+    Loads the resources in a new interpreter
+
+    Args:
+        load: (str) the code that loads the resources
+
+    Returns:
+        (float) how long loading took in milliseconds
+    """
+    out = subprocess.run([sys.executable, '-c', _SCRIPT.format(load=load)], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    return json.loads(out.stdout) * 1000
+
+
+def bench(name: str, load: str) -> float:
+    """
+    Launches a few times and prints the result
+
+    Returns:
+        (float) the best time in milliseconds
+    """
+    launch(load)  # the first launch writes the .pyc files, every launch after that is a normal start
+    best = min(launch(load) for _ in range(LAUNCHES))
+
+    print(f'{name:<24}{best:>10.2f} ms')
+
+    return best
+
+
+def main():
+    if not RCC_PATH.is_file():
+        print(f'{RCC_PATH} has not been built, run: python -m helpers.Resources')
+        return
+
+    print(f'loading the resources, best of {LAUNCHES} launches')
+
+    old = bench('import resources_rc', 'import resources_rc')
+    new = bench('resources.rcc', 'from PySide6.QtCore import QResource; QResource.registerResource(%r)' % str(RCC_PATH))
+
+    print(f'speedup: {old / new:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Times loading a really long game into the splits widget, with both the list view and a widget per split
+
+Run from the repo root with: python -m Benchmarks.BenchSplitLoad
+"""
+import sys
+import timeit
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from Models.Split import Split
+from Styling.Settings import Settings
+from Widgets.SplitsWidget import SplitsWidget
+
+SPLIT_COUNT = 3000
+REPEATS = 5
+
+CONFIG_PATH = Path(__file__).resolve().parents[1] / 'Testing' / 'conf' / 'test_settings.json'
+
+
+def bench(name: str, splits_widget: SplitsWidget, splits: list[Split], app: QApplication, repeats: int = REPEATS) -> float:
+    """
+    Times loading the splits into the widget and drawing them once, and prints the result
+
+    Returns:
+        (float) the best load time in milliseconds
+    """
+    def load():
+        splits_widget.load_splits_from_list(splits)
+        app.processEvents()  # include laying out and drawing what's on screen
+
+    best = min(timeit.repeat(load, number=1, repeat=repeats)) * 1000
+
+    print(f'{name:<20}{best:>10.1f} ms')
+
+    return best
+
+
+def main():
+    app = QApplication.instance() or QApplication(sys.argv)
+
+    settings = Settings(CONFIG_PATH)
+    splits = [Split(f'split {i}', (i + 1) * 1000, 1000, 900) for i in range(SPLIT_COUNT)]
+
+    splits_widget = SplitsWidget(settings, parent=None)
+    splits_widget.setStyleSheet(settings.style.formatted_style_sheet)
+    splits_widget.show()
+
+    print(f'loading {SPLIT_COUNT} splits')
+
+    settings.settings['virtual_split_threshold'] = SPLIT_COUNT - 1
+    bench('list view', splits_widget, splits, app)
+
+    settings.settings['virtual_split_threshold'] = SPLIT_COUNT
+    bench('widget per split', splits_widget, splits, app, repeats=1)  # this one takes seconds, once is plenty
+
+
+if __name__ == '__main__':
+    main()
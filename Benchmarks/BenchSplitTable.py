@@ -0,0 +1,64 @@
+"""
+Compares editing a gold in the middle of a long game in a SplitTable to recomputing the totals over a list of splits
+
+Run from the repo root with: python -m Benchmarks.BenchSplitTable
+"""
+import timeit
+
+from Models.Split import Split
+from Models.SplitTable import SplitTable, update_segment_totals
+
+SPLIT_COUNT = 3000
+EDITS = 1000
+REPEATS = 5
+
+
+def make_splits() -> list[Split]:
+    return [Split(f'split {i}', (i + 1) * 1000, 1000, 900) for i in range(SPLIT_COUNT)]
+
+
+def bench(name: str, func) -> float:
+    """
+    Times the edits with the given function and prints the result
+
+    Returns:
+        (float) the best time per edit in microseconds
+    """
+    best = min(timeit.repeat(func, number=1, repeat=REPEATS))
+    per_edit_us = best / EDITS * 1e6
+
+    print(f'{name:<28}{per_edit_us:>10.1f} us/edit')
+
+    return per_edit_us
+
+
+def main():
+    splits = make_splits()
+    table = SplitTable(make_splits())
+    middle = SPLIT_COUNT // 2
+
+    def edit_list():
+        for i in range(EDITS):
+            splits[middle].gold_segment_ms = 800 + i % 50
+            update_segment_totals(splits)
+            splits[-1].gold_segment_total_ms
+
+    def edit_table():
+        for i in range(EDITS):
+            table[middle].gold_segment_ms = 800 + i % 50
+            table[-1].gold_segment_total_ms
+
+    edit_list()
+    edit_table()
+    assert splits[-1].gold_segment_total_ms == table[-1].gold_segment_total_ms == table.sum_of_best()
+
+    print(f'editing a gold in the middle of {SPLIT_COUNT} splits')
+
+    old = bench('list + update_segment_totals', edit_list)
+    new = bench('SplitTable', edit_table)
+
+    print(f'speedup: {old / new:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares formatting a large stylesheet with a StyleTemplate to replacing each variable in turn
+
+Run from the repo root with: python -m Benchmarks.BenchStyleTemplate
+"""
+import timeit
+from pathlib import Path
+
+from Styling.Style.styleTemplate import StyleTemplate, format_by_replacing
+
+SHEET_COPIES = 50  # how many times the default sheet is repeated, to stand in for a big custom style
+FORMATS = 200
+REPEATS = 5
+
+CONF_DIR = Path(__file__).resolve().parents[1] / 'conf'
+
+
+def load_style() -> tuple[str, dict[str, str]]:
+    """
+    Returns:
+        (tuple[str, dict[str, str]]) the default sheet repeated SHEET_COPIES times, and the default variables
+    """
+    raw = (CONF_DIR / 'style.qss').read_text() * SHEET_COPIES
+    variable_map = {}
+
+    for line in (CONF_DIR / 'vars.qvars').read_text().split('\n'):
+        if '//' in line:
+            line = line[:line.index('//')].strip(' ')
+
+        if line:
+            k, v = line.split(':')
+            variable_map[k] = v
+
+    return raw, variable_map
+
+
+def bench(name: str, func) -> float:
+    """
+    Times the formats with the given function and prints the result
+
+    Returns:
+        (float) the best time per format in microseconds
+    """
+    best = min(timeit.repeat(func, number=1, repeat=REPEATS))
+    per_format_us = best / FORMATS * 1e6
+
+    print(f'{name:<20}{per_format_us:>10.1f} us/format')
+
+    return per_format_us
+
+
+def main():
+    raw, variable_map = load_style()
+    template = StyleTemplate(raw)
+
+    assert template.format(variable_map) == format_by_replacing(raw, variable_map)
+
+    def replacing():
+        for _ in range(FORMATS):
+            format_by_replacing(raw, variable_map)
+
+    def compiled():
+        for _ in range(FORMATS):
+            template.format(variable_map)
+
+    print(f'formatting a {len(raw)} character sheet with {len(variable_map)} variables')
+
+    old = bench('replacing', replacing)
+    new = bench('StyleTemplate', compiled)
+
+    print(f'speedup: {old / new:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,399 @@
+"""
+Runs a benchmark for each of the hot paths on the offscreen Qt platform, and saves the results so the next run can be
+compared to the median of the last few
+
+Run from the repo root with: python -m Benchmarks.BenchSuite
+    --no-save           don't add this run to the results file
+    --results PATH      the results file to compare to and save in, Benchmarks/results.jsonl by default
+    --threshold 0.4     how much slower than the recent runs counts as a regression, 40% by default
+    --baseline 5        how many of the last saved runs to take the median of to compare to, 5 by default
+    --only NAME         just run the benchmarks with NAME in their name, can be given more than once
+"""
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')  # before anything imports Qt
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import timeit
+from collections import deque
+from datetime import datetime, timezone
+from pathlib import Path
+from statistics import median
+from time import perf_counter_ns
+
+import PySide6
+from PySide6.QtWidgets import QApplication
+
+from helpers.SyntheticGame import generate_game
+from helpers.TimerFormat import format_wall_clock_from_ms, WallClockFormatter
+from Models.Game import Game
+from Models.Split import Split
+from Styling.Settings import Settings
+from Styling.Style.styleBuilder import StyleBuilder
+from Widgets.SplitsWidget import SplitsWidget
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CONFIG_PATH = ROOT_DIR / 'Testing' / 'conf' / 'test_settings.json'
+CONF_DIR = ROOT_DIR / 'conf'
+RESULTS_PATH = Path(__file__).resolve().parent / 'results.jsonl'
+
+REGRESSION_THRESHOLD = 0.4  # runs on the same machine move around by up to about 25% on their own, so flag well past that
+BASELINE_RUNS = 5  # the saved runs whose median each benchmark is compared to, so one noisy run doesn't set the bar
+REPEATS = 7
+
+FRAME_MS = 16  # roughly what a 60Hz screen asks for
+FORMAT_FRAMES = 100_000
+GAME_SPLITS = 10_000
+STYLE_FORMATS = 200
+WIDGET_SPLITS = 50  # under the list view threshold, so a widget per split
+TICK_RATE = 240  # the highest refresh rate we tick at by default
+INPUT_EVENTS = 10_000
+
+BENCHMARKS = []  # (name, unit, function that returns the best time in that unit)
+
+
+def benchmark(name: str, unit: str):
+    """
+    Adds the function to the suite, it should return its best time in the given unit
+    """
+    def register(func):
+        BENCHMARKS.append((name, unit, func))
+        return func
+
+    return register
+
+
+def best_of(func, repeats: int = REPEATS) -> float:
+    """
+    Returns:
+        (float) the fastest of a few runs of the function in seconds
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeats))
+
+
+def make_splits(count: int) -> list[Split]:
+    return [Split(f'split {i}', (i + 1) * 1000, 1000, 900) for i in range(count)]
+
+
+@benchmark('format_wall_clock_from_ms', 'ns/call')
+def bench_format_wall_clock(app: QApplication) -> float:
+    times = [-3000 + i * FRAME_MS for i in range(FORMAT_FRAMES)]
+
+    return best_of(lambda: [format_wall_clock_from_ms(t) for t in times]) / len(times) * 1e9
+
+
+@benchmark('WallClockFormatter.format', 'ns/call')
+def bench_wall_clock_formatter(app: QApplication) -> float:
+    times = [-3000 + i * FRAME_MS for i in range(FORMAT_FRAMES)]
+    formatter = WallClockFormatter()
+
+    return best_of(lambda: [formatter.format(t) for t in times]) / len(times) * 1e9
+
+
+@benchmark(f'Game.from_json_file {GAME_SPLITS} splits', 'ms')
+def bench_game_from_json(app: QApplication) -> float:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'game.json')
+
+        with open(path, 'w') as f:
+            json.dump(generate_game(GAME_SPLITS, seed=GAME_SPLITS), f, indent=4)
+
+        return best_of(lambda: Game.from_json_file(path)) * 1000
+
+
+@benchmark('StyleBuilder.format_style', 'us/format')
+def bench_format_style(app: QApplication) -> float:
+    builder = StyleBuilder(str(CONF_DIR / 'style.qss'), str(CONF_DIR / 'vars.qvars'))
+    key = next(iter(builder.variable_map))
+    values = (builder.variable_map[key], builder.variable_map[key] + ' ')
+
+    def format_styles():
+        # change a variable every time, an unchanged one is skipped without formatting
+        for i in range(STYLE_FORMATS):
+            builder.variable_map[key] = values[i & 1]
+            builder.format_style()
+
+    return best_of(format_styles) / STYLE_FORMATS * 1e6
+
+
+def make_splits_widget() -> SplitsWidget:
+    settings = Settings(CONFIG_PATH)
+
+    splits_widget = SplitsWidget(settings, parent=None)
+    splits_widget.setStyleSheet(settings.style.formatted_style_sheet)
+    splits_widget.show()
+
+    return splits_widget
+
+
+@benchmark(f'SplitsWidget.load_splits_from_list {WIDGET_SPLITS} widgets', 'ms')
+def bench_load_split_widgets(app: QApplication) -> float:
+    splits_widget = make_splits_widget()
+    splits = make_splits(WIDGET_SPLITS)
+
+    def load():
+        splits_widget.load_splits_from_list(splits)
+        app.processEvents()  # include laying out and drawing what's on screen
+
+    try:
+        return best_of(load) * 1000
+    finally:
+        splits_widget.deleteLater()
+
+
+@benchmark(f'SplitsWidget.load_splits_from_list {GAME_SPLITS} rows', 'ms')
+def bench_load_split_rows(app: QApplication) -> float:
+    splits_widget = make_splits_widget()
+    splits = make_splits(GAME_SPLITS)
+
+    def load():
+        splits_widget.load_splits_from_list(splits)
+        app.processEvents()
+
+    try:
+        return best_of(load) * 1000
+    finally:
+        splits_widget.deleteLater()
+
+
+@benchmark(f'update_split for 1 s at {TICK_RATE} Hz', 'ms')
+def bench_update_split_ticks(app: QApplication) -> float:
+    splits_widget = make_splits_widget()
+    splits_widget.load_splits_from_list(make_splits(WIDGET_SPLITS))
+    splits_widget.handle_control('STARTSPLIT', perf_counter_ns())
+
+    tick_ms = 1000 / TICK_RATE
+    start_ms = 0  # within a second of the first split's pb, so the delta is drawn on every tick
+
+    def one_second():
+        for tick in range(TICK_RATE):
+            splits_widget.update_split(round(start_ms + tick * tick_ms))
+            app.processEvents()  # and draw it, like the frame would
+
+    try:
+        return best_of(one_second) * 1000
+    finally:
+        splits_widget.deleteLater()
+
+
+@benchmark(f'Main.refresh_frame for 1 s at {TICK_RATE} Hz', 'ms')
+def bench_refresh_frame(app: QApplication) -> float:
+    # the whole frame, the timer, the splits and the stats footer, drawn from one sample of the time source
+    from Main import Main  # the main window sets up the keyboard listener, so it needs pynput like the input benchmark
+
+    main = Main(str(CONFIG_PATH))
+    main.autosaver.close()  # nothing here should be saved over the test config
+    main.splits.RunEvent.disconnect(main.journal.log)
+    main.show()
+
+    frame = [0]
+    main.time_source.now = lambda: frame[0]
+    main.time_source.start()
+    main.splits.handle_control('STARTSPLIT')
+    main.frame_scheduler.stop()  # the frames come from here instead
+
+    tick_ms = 1000 / TICK_RATE
+
+    def one_second():
+        for tick in range(TICK_RATE):
+            frame[0] = round(tick * tick_ms)
+            main.refresh_frame()
+            app.processEvents()
+
+    try:
+        return best_of(one_second) * 1000
+    finally:
+        close_main(main)
+
+
+def close_main(main):
+    """
+    Shuts the main window's threads down like closing it does, without asking to save
+    """
+    main.timer_controller.toggle_listening()
+    main.journal.close()
+    main.attempt_history.close()
+    main.Quit.emit()
+
+    main.frame_scheduler.stop()
+    main.splitStats.stop_worker()
+    main.game_timer_thread.quit()
+    main.game_timer_thread.wait()
+
+    main.deleteLater()
+
+
+@benchmark('TimerController.input_event', 'us/event')
+def bench_input_event(app: QApplication) -> float:
+    # pynput needs a display to import, so this is the only benchmark that needs more than the offscreen platform
+    from pynput.keyboard import KeyCode
+
+    from Listeners.KeyboardListener import KeyboardListener
+    from Timer.TimerController import TimerController
+
+    class QuietKeyboardListener(KeyboardListener):
+        def listen(self):
+            self.listening = True  # don't hook the real keyboard, we feed it the keys ourselves
+
+    listener = QuietKeyboardListener()
+    controller = TimerController(listener=listener, settings=Settings(CONFIG_PATH))
+
+    received = []
+    controller.ControlEvent.connect(lambda event, timestamp_ns: received.append(event))
+
+    # half mapped and half not, like someone actually playing, the lock key would turn the controller off so leave it out
+    mapped = next(obj.obj for obj, event in controller.event_map.items() if event != 'LOCK')
+    unmapped = next(KeyCode.from_char(c) for c in 'qwertyuiop' if KeyCode.from_char(c) not in controller.event_map)
+
+    keys = [mapped if i & 1 else unmapped for i in range(INPUT_EVENTS)]
+
+    def press():
+        for key in keys:
+            listener.on_input_event(key)
+
+    best = best_of(press)
+
+    assert received, 'The mapped key should have made it through to the controller'
+
+    return best / INPUT_EVENTS * 1e6
+
+
+def git_commit() -> str | None:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+    return out.stdout.strip()
+
+
+def load_last_runs(results_path: Path, count: int = BASELINE_RUNS) -> list[dict]:
+    """
+    Returns:
+        (list[dict]) up to the last count runs saved in the results file, oldest first
+    """
+    if not results_path.is_file():
+        return []
+
+    with open(results_path, 'r') as f:
+        lines = deque((line for line in f if line.strip()), maxlen=count)
+
+    return [json.loads(line) for line in lines]
+
+
+def baseline(runs: list[dict]) -> dict[str, dict]:
+    """
+    Returns:
+        (dict[str, dict]) each benchmark's median {'value', 'unit'} over the runs that have it in its latest unit
+    """
+    values = {}
+
+    for run in runs:
+        for name, result in run['results'].items():
+            if name in values and values[name][0] != result['unit']:
+                del values[name]  # the benchmark changed what it measures, only compare to the runs since
+
+            values.setdefault(name, (result['unit'], []))[1].append(result['value'])
+
+    return {name: {'value': median(numbers), 'unit': unit} for name, (unit, numbers) in values.items()}
+
+
+def save_run(results_path: Path, run: dict):
+    with open(results_path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def run_suite(names: list[str] = None) -> dict:
+    """
+    Runs the benchmarks, printing each one as it finishes
+
+    Args:
+        names: (list[str], optional) only run benchmarks with one of these in their name
+
+    Returns:
+        (dict) the run, when and where it was run and every benchmark's {'value', 'unit'}
+    """
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+
+    for name, unit, func in BENCHMARKS:
+        if names and not any(n in name for n in names):
+            continue
+
+        try:
+            value = func(app)
+        except ImportError as e:
+            print(f'{name:<48}{"skipped":>12}  ({e})')
+            continue
+
+        results[name] = {'value': value, 'unit': unit}
+        print(f'{name:<48}{value:>12.2f} {unit}')
+
+    return {
+        'time': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'python': sys.version.split()[0],
+        'pyside': PySide6.__version__,
+        'platform': os.environ.get('QT_QPA_PLATFORM'),
+        'results': results
+    }
+
+
+def compare(run: dict, last_runs: list[dict], threshold: float = REGRESSION_THRESHOLD) -> list[str]:
+    """
+    Prints how each benchmark changed compared to the median of the last saved runs
+
+    Returns:
+        (list[str]) the names of the benchmarks that got slower by more than the threshold
+    """
+    print(f'\ncompared to the median of {len(last_runs)} run(s), {last_runs[0].get("commit")} to {last_runs[-1].get("commit")}:')
+
+    regressions = []
+    medians = baseline(last_runs)
+
+    for name, result in run['results'].items():
+        last = medians.get(name)
+
+        if last is None or last['unit'] != result['unit'] or last['value'] <= 0:
+            print(f'  {name:<46}{"new":>12}')
+            continue
+
+        change = result['value'] / last['value'] - 1
+        flag = ''
+
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions.append(name)
+
+        print(f'  {name:<46}{change:>+11.1%}{flag}')
+
+    return regressions
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmarks the hot paths and compares them to the last saved runs')
+    parser.add_argument('--no-save', action='store_true', help="don't add this run to the results file")
+    parser.add_argument('--results', type=Path, default=RESULTS_PATH, help='the results file to compare to and save in')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD, help='how much slower counts as a regression')
+    parser.add_argument('--baseline', type=int, default=BASELINE_RUNS, help='how many saved runs to take the median of')
+    parser.add_argument('--only', action='append', help='only run the benchmarks with this in their name')
+    args = parser.parse_args(argv)
+
+    last_runs = load_last_runs(args.results, max(args.baseline, 1))
+    run = run_suite(args.only)
+
+    regressions = compare(run, last_runs, args.threshold) if last_runs else []
+
+    if not args.no_save:
+        save_run(args.results, run)
+        print(f'\nsaved to {args.results}')
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+Compares the table driven WallClockFormatter to format_wall_clock_from_ms on the kind of times the timer actually shows
+
+Run from the repo root with: python -m Benchmarks.BenchTimerFormat
+"""
+import timeit
+
+from helpers.TimerFormat import format_wall_clock_from_ms, WallClockFormatter
+
+FRAME_MS = 16  # roughly what a 60Hz screen asks for
+FRAMES = 100_000  # a little over 26 minutes of run at 60Hz
+REPEATS = 5
+
+
+def frame_times(start_ms: int = -3000) -> list[int]:
+    """
+    Builds the times a 60Hz timer would show, starting from a negative offset
+
+    Args:
+        start_ms: (int) the time the timer starts at
+
+    Returns:
+        (list[int]) the time shown on each frame
+    """
+    return [start_ms + i * FRAME_MS for i in range(FRAMES)]
+
+
+def bench(name: str, func, times: list[int]) -> float:
+    """
+    Times formatting every frame with the given function and prints the result
+
+    Returns:
+        (float) the best time per call in nanoseconds
+    """
+    best = min(timeit.repeat(lambda: [func(t) for t in times], number=1, repeat=REPEATS))
+    per_call_ns = best / len(times) * 1e9
+
+    print(f'{name:<28}{per_call_ns:>10.1f} ns/call')
+
+    return per_call_ns
+
+
+def main():
+    times = frame_times()
+    formatter = WallClockFormatter()
+
+    # make sure we are comparing the same output before we compare the speed
+    for t in times:
+        assert formatter(t) == format_wall_clock_from_ms(t), t
+
+    old = bench('format_wall_clock_from_ms', format_wall_clock_from_ms, times)
+    new = bench('WallClockFormatter', WallClockFormatter(), times)
+
+    print(f'speedup: {old / new:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,240 @@
+"""
+An append-only history of every attempt at a game, kept in a JSON lines file next to the game's JSON
+"""
+from __future__ import annotations
+
+import json
+import os
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterator
+
+from helpers.FileHelpers import atomic_write
+
+HISTORY_SUFFIX = '.history.jsonl'
+INDEX_SUFFIX = '.idx'
+
+
+class AttemptHistory:
+    """
+    Appends one line of JSON per attempt to the history file, and keeps an index of where each game and category's
+    attempts start in the file so they can be read back without parsing everything else
+
+    Appending never reads the file or the index, so it costs the same on the ten thousandth attempt as the first. The
+    index is only loaded the first time something is read, and it remembers how much of the file it covers, so any
+    attempts appended since it was last saved are picked up by reading just the end of the file.
+    """
+    def __init__(self, path: str):
+        """
+        Args:
+            path: (str) the path of the history file, it is made on the first append if it doesn't exist
+        """
+        self.path = str(path)
+        self.index_path = self.path + INDEX_SUFFIX
+
+        self._file = None
+        self._index = None  # (game, category) -> list of byte offsets, None until something is read
+        self._indexed_size = 0  # how much of the file the index covers
+        self._index_dirty = False
+
+    @classmethod
+    def for_game(cls, game_path: str) -> AttemptHistory:
+        """
+        Makes the history that goes with a game file, eg: conf/testGame.json keeps its history in conf/testGame.history.jsonl
+
+        Args:
+            game_path: (str) the path of the game's JSON file
+
+        Returns:
+            (AttemptHistory) the history for the game
+        """
+        game_path = Path(game_path)
+        return cls(str(game_path.with_name(game_path.stem + HISTORY_SUFFIX)))
+
+    def append(self, attempt: dict) -> int:
+        """
+        Adds an attempt to the end of the history
+
+        Args:
+            attempt: (dict) the attempt, it should have a 'game' and 'category' so it can be found again
+
+        Returns:
+            (int) where the attempt starts in the file
+        """
+        if self._file is None:
+            self._open_for_append()
+
+        offset = self._file.tell()
+        line = json.dumps(attempt, separators=(',', ':')) + '\n'
+
+        self._file.write(line.encode('utf-8'))
+        self._file.flush()
+
+        # only keep the index up to date if it's loaded, otherwise it catches up on its own when it is
+        if self._index is not None and self._indexed_size == offset:
+            self._index.setdefault(_key(attempt), []).append(offset)
+            self._indexed_size = self._file.tell()
+            self._index_dirty = True
+
+        return offset
+
+    def categories(self) -> list[tuple[str, str]]:
+        """
+        Returns:
+            (list[tuple[str, str]]) every (game, category) pair with at least one attempt
+        """
+        return list(self._load_index().keys())
+
+    def count(self, game: str, category: str) -> int:
+        """
+        Returns:
+            (int) the number of attempts for the game and category
+        """
+        return len(self._load_index().get((game, category), []))
+
+    def size(self) -> int:
+        """
+        Returns:
+            (int) how much has been written to the history in bytes, any attempt appended after this starts at or past it
+        """
+        if self._file is not None:
+            self._file.flush()
+            return self._file.tell()
+
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def attempts(self, game: str, category: str, start: int = 0, before: int = None) -> Iterator[dict]:
+        """
+        Reads back the attempts for a game and category, oldest first
+
+        Args:
+            game: (str) the title of the game
+            category: (str) the category, the game's sub-title
+            start: (int, optional) how many attempts to skip, negative counts back from the newest
+            before: (int, optional) only the attempts that start before this point in the file, eg: the size() when
+                another thread was asked to read the history, so it leaves out anything appended since
+
+        Returns:
+            (Iterator[dict]) each attempt
+        """
+        offsets = self._load_index().get((game, category), [])
+
+        if before is not None:
+            offsets = offsets[:bisect_left(offsets, before)]
+
+        offsets = offsets[start:]
+
+        if not offsets:
+            return
+
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield json.loads(f.readline())
+
+    def save_index(self):
+        """
+        Writes the index next to the history so the next read doesn't have to rebuild it
+        """
+        if self._index is None or not self._index_dirty:
+            return
+
+        data = {
+            'size': self._indexed_size,
+            'categories': [{'game': game, 'category': category, 'offsets': offsets} for (game, category), offsets in self._index.items()]
+        }
+
+        atomic_write(self.index_path, json.dumps(data, separators=(',', ':')))
+        self._index_dirty = False
+
+    def close(self):
+        """
+        Closes the history file and saves the index if it changed
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        self.save_index()
+
+    def _open_for_append(self):
+        self._file = open(self.path, 'ab')
+
+        # if we crashed part way through a line before, start on a fresh one so the next attempt can still be read
+        if self._file.tell() > 0:
+            with open(self.path, 'rb') as f:
+                f.seek(-1, os.SEEK_END)
+
+                if f.read(1) != b'\n':
+                    self._file.write(b'\n')
+                    self._file.flush()
+
+    def _load_index(self) -> dict[tuple[str, str], list[int]]:
+        """
+        Loads the saved index, and reads any attempts that were added after it was saved
+        """
+        if self._index is not None:
+            self._catch_up()
+            return self._index
+
+        self._index = {}
+        self._indexed_size = 0
+
+        try:
+            with open(self.index_path, 'r') as f:
+                data = json.load(f)
+
+            index = {(entry['game'], entry['category']): entry['offsets'] for entry in data['categories']}
+            size = data['size']
+
+            if size <= os.path.getsize(self.path):
+                self._index = index
+                self._indexed_size = size
+
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # no index, or one we can't trust, so build it again from the history
+
+        self._catch_up()
+
+        return self._index
+
+    def _catch_up(self):
+        """
+        Indexes whatever is in the history file past the end of the index
+        """
+        if self._file is not None:
+            self._file.flush()
+
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return  # nothing has been written yet
+
+        if size <= self._indexed_size:
+            return
+
+        with open(self.path, 'rb') as f:
+            f.seek(self._indexed_size)
+            offset = self._indexed_size
+
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # a line that is still being written, or was cut off by a crash
+
+                try:
+                    attempt = json.loads(line)
+                    self._index.setdefault(_key(attempt), []).append(offset)
+                except ValueError:
+                    pass  # a broken line, skip it so the rest of the history can still be read
+
+                offset += len(line)
+
+        self._indexed_size = offset
+        self._index_dirty = True
+
+
+def _key(attempt: dict) -> tuple[str, str]:
+    return attempt.get('game', ''), attempt.get('category', '')
@@ -0,0 +1,253 @@
+"""
+The times a run can be compared against, each one worked out for every split at once
+"""
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from typing import Sequence
+
+from Core.SegmentStats import SegmentStatsEngine
+from Models.Split import Split
+
+PERSONAL_BEST = 'Personal Best'
+BEST_SEGMENTS = 'Best Segments'
+AVERAGE = 'Average Segments'
+MEDIAN = 'Median Segments'
+BALANCED = 'Balanced PB'
+LATEST = 'Latest Run'
+
+COMPARISONS = (PERSONAL_BEST, BEST_SEGMENTS, AVERAGE, MEDIAN, BALANCED, LATEST)  # in the order the hotkey goes through them
+
+# the comparisons that come from each thing that can change
+FROM_SPLITS = (PERSONAL_BEST, BEST_SEGMENTS, BALANCED)
+FROM_STATS = (AVERAGE, MEDIAN, BALANCED)
+FROM_ATTEMPTS = FROM_STATS + (LATEST,)
+
+
+class ComparisonEngine:
+    """
+    Keeps each comparison as an array of the time at every split, 0 for a split it has no time for
+
+    The splits read the time they compare against from current, so switching comparisons is swapping which array that
+    is and redrawing, nothing is worked out per split or per frame. A comparison is built the first time it is asked for
+    after whatever it comes from changes, only the one on screen is built straight away.
+    """
+    def __init__(self, splits: Sequence[Split], stats: SegmentStatsEngine = None, comparison: str = PERSONAL_BEST):
+        """
+        Args:
+            splits: (Sequence[Split]) the game's splits
+            stats: (SegmentStatsEngine, optional) the stats for each segment, the average, median and balanced comparisons
+                need them
+            comparison: (str, optional) the comparison to start on, one of COMPARISONS
+        """
+        self.splits = splits
+        self.stats = stats
+        self.latest = []  # the split times of the last attempt that ended
+
+        self._built = {}  # comparison -> array of times
+        self.name = comparison if comparison in COMPARISONS else PERSONAL_BEST
+        self.current = self.times(self.name)
+
+    def times(self, name: str) -> array:
+        """
+        Args:
+            name: (str) one of COMPARISONS
+
+        Returns:
+            (array) the comparison's time at every split in ms, built if it isn't already
+        """
+        times = self._built.get(name)
+
+        if times is None:
+            times = self._built[name] = self._build(name)
+
+        return times
+
+    def set_comparison(self, name: str) -> array:
+        """
+        Switches the comparison the splits read from
+
+        Args:
+            name: (str) one of COMPARISONS
+
+        Returns:
+            (array) the comparison's times
+        """
+        if name not in COMPARISONS:
+            raise ValueError(f'{name!r} is not a comparison, it should be one of {COMPARISONS}')
+
+        self.name = name
+        self.current = self.times(name)
+
+        return self.current
+
+    def next_comparison(self) -> str:
+        """
+        Switches to the comparison after the current one, going back around to the first after the last
+
+        Returns:
+            (str) the comparison switched to
+        """
+        self.set_comparison(COMPARISONS[(COMPARISONS.index(self.name) + 1) % len(COMPARISONS)])
+
+        return self.name
+
+    def segment(self, index: int) -> int:
+        """
+        Returns:
+            (int) how long the current comparison has the segment ending on the given split take, 0 if it has no time for it
+        """
+        current = self.current
+
+        if current[index] == 0 or (index > 0 and current[index - 1] == 0):
+            return 0
+
+        return current[index] - current[index - 1] if index > 0 else current[index]
+
+    def invalidate(self, names: Sequence[str] = COMPARISONS) -> bool:
+        """
+        Throws out comparisons after what they come from changed, the current one is built again straight away
+
+        Args:
+            names: (Sequence[str], optional) the comparisons to throw out, all of them by default
+
+        Returns:
+            (bool) whether the current comparison was one of them
+        """
+        for name in names:
+            self._built.pop(name, None)
+
+        if self.name in names:
+            self.current = self.times(self.name)
+            return True
+
+        return False
+
+    def set_splits(self, splits: Sequence[Split]) -> bool:
+        """
+        Takes the game's splits after they were swapped out, or their times changed
+
+        Returns:
+            (bool) whether the current comparison changed
+        """
+        if splits is not self.splits or len(splits) != len(self.current):
+            self.splits = splits
+            return self.invalidate()
+
+        return self.invalidate(FROM_SPLITS)
+
+    def set_stats(self, stats: SegmentStatsEngine) -> bool:
+        """
+        Takes new stats, for when they were loaded again or moved around with the game's splits
+
+        Returns:
+            (bool) whether the current comparison changed
+        """
+        self.stats = stats
+
+        return self.invalidate(FROM_STATS)
+
+    def add_attempt(self, attempt: dict) -> bool:
+        """
+        Takes an attempt that just ended as the latest run, call this once the stats have it too
+
+        Args:
+            attempt: (dict) the attempt, as it is added to the attempt history
+
+        Returns:
+            (bool) whether the current comparison changed
+        """
+        self.latest = list(attempt.get('split_times') or [])
+
+        return self.invalidate(FROM_ATTEMPTS)
+
+    def _build(self, name: str) -> array:
+        if name == PERSONAL_BEST:
+            return array('q', (split.pb_time_ms for split in self.splits))
+
+        elif name == BEST_SEGMENTS:
+            return _running_total(split.gold_segment_ms for split in self.splits)
+
+        elif name == LATEST:
+            latest = self.latest[:len(self.splits)]
+            return array('q', latest + [0] * (len(self.splits) - len(latest)))
+
+        segments = self._segment_stats()
+
+        if segments is None:
+            return array('q', [0]) * len(self.splits)
+
+        if name == AVERAGE:
+            return _running_total(round(segment.mean) if segment.count else 0 for segment in segments)
+
+        elif name == MEDIAN:
+            return _running_total(round(segment.median) if segment.count else 0 for segment in segments)
+
+        elif name == BALANCED:
+            return self._balanced(segments)
+
+        raise ValueError(f'{name!r} is not a comparison, it should be one of {COMPARISONS}')
+
+    def _segment_stats(self):
+        if self.stats is None or len(self.stats) != len(self.splits):
+            return None  # the stats are for a different set of splits, they'll be swapped in a moment
+
+        return self.stats.segments
+
+    def _balanced(self, segments) -> array:
+        """
+        Finds the one percentile that, taken for every segment, adds up to the pb, so the pb's time is spread over the
+        segments the way the history says the runner usually loses and saves it
+
+        Every segment's quantile estimates are at the same levels, so the total at each level is added up once and the
+        percentile is found between the two levels the pb falls between. That makes it O(n) for any number of splits.
+        """
+        splits = self.splits
+
+        if not splits or splits[-1].pb_time_ms <= 0:
+            return array('q', [0]) * len(splits)
+
+        levels = (0.0,) + tuple(self.stats.quantiles) + (1.0,)
+        curves = []  # each segment's time at every level, or just its pb segment if there's no history for it
+        totals = [0.0] * len(levels)
+
+        for split, segment in zip(splits, segments):
+            if segment.count:
+                curve = [segment.running.min] + [segment.percentile(p) for p in self.stats.quantiles] + [segment.running.max]
+
+                for i in range(1, len(curve)):
+                    curve[i] = max(curve[i], curve[i - 1])  # the estimates can cross a little, a percentile can't go down
+            else:
+                curve = [split.pb_segment_ms] * len(levels)
+
+            curves.append(curve)
+
+            for i, value in enumerate(curve):
+                totals[i] += value
+
+        # the totals only go up with the level, so the pb is between two of them, or past one end
+        target = splits[-1].pb_time_ms
+        k = min(max(bisect_right(totals, target) - 1, 0), len(levels) - 2)
+        span = totals[k + 1] - totals[k]
+        t = min(max((target - totals[k]) / span, 0.0), 1.0) if span else 0.0
+
+        return _running_total(round(curve[k] + (curve[k + 1] - curve[k]) * t) for curve in curves)
+
+
+def _running_total(segments) -> array:
+    """
+    Adds up segment times into the time at each split, once a segment has no time none of the splits after it do either
+    """
+    times = array('q')
+    total = 0
+
+    for segment in segments:
+        if segment <= 0 or total < 0:
+            total = -1  # stays unknown from here on
+            times.append(0)
+        else:
+            total += segment
+            times.append(total)
+
+    return times
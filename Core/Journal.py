@@ -0,0 +1,305 @@
+"""
+A write-ahead journal of everything the run does, so a crash or power loss part way through a session can't lose a PB
+"""
+from __future__ import annotations
+
+import json
+import os
+import queue
+import threading
+from time import monotonic
+from pathlib import Path
+
+from Core.Run import Run
+from helpers.FileHelpers import atomic_write
+
+JOURNAL_SUFFIX = '.journal.jsonl'
+FLUSH_INTERVAL = 0.25  # the most time in seconds that events wait to be grouped into one write and fsync
+WAIT_POLL = 0.1  # how often in seconds wait() checks the writer thread is still alive
+
+# tells the writer thread to finish up, anything else on the queue is an entry, a (_CLEAR, through) command, or an event
+# to set once everything before it is on disk
+_CLEAR = object()
+_CLOSE = object()
+
+
+class RunJournal:
+    """
+    Logs each control event the run acted on, and the time on the timer it happened at, to a file next to the game
+
+    Logging only puts the event on a queue, a background thread does the writing and groups everything that comes in
+    within FLUSH_INTERVAL into one write and one fsync, so the GUI thread never waits on the disk. The journal is cleared
+    whenever the game is saved, so replaying it on top of the saved game gets back to where the session was.
+    """
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        """
+        Args:
+            path: (str) the path of the journal file
+            flush_interval: (float, optional) the most time in seconds to wait to group events into one write
+        """
+        self.path = str(path)
+        self.flush_interval = flush_interval
+
+        self._queue = queue.SimpleQueue()
+        self._thread = None
+
+        self.error = None  # the last OSError the writer hit, entries logged after it are dropped until a write works again
+
+        self.seq = 0  # the number of the last entry logged, so a save can clear only what it covered
+
+    @classmethod
+    def for_game(cls, game_path: str, flush_interval: float = FLUSH_INTERVAL) -> RunJournal:
+        """
+        Makes the journal that goes with a game file, eg: conf/testGame.json journals to conf/testGame.journal.jsonl
+
+        Args:
+            game_path: (str) the path of the game's JSON file
+            flush_interval: (float, optional) the most time in seconds to wait to group events into one write
+
+        Returns:
+            (RunJournal) the journal for the game
+        """
+        game_path = Path(game_path)
+        return cls(str(game_path.with_name(game_path.stem + JOURNAL_SUFFIX)), flush_interval)
+
+    def log(self, event: str, time_ms: int = None):
+        """
+        Adds an event to the journal, this never touches the disk so it is safe to call while the timer is running
+
+        Args:
+            event: (str) the control event the run acted on
+            time_ms: (int, optional) the time on the timer when it happened
+        """
+        self._start_writer()
+
+        self.seq += 1
+        self._queue.put({'seq': self.seq, 'event': event, 'time': time_ms})
+
+    def read(self) -> list[dict]:
+        """
+        Reads back every complete entry in the journal, anything cut off by a crash is left out
+
+        Returns:
+            (list[dict]) the entries, oldest first
+        """
+        entries = []
+
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # anything after a broken entry can't be trusted
+        except FileNotFoundError:
+            pass
+
+        return entries
+
+    def replay(self, run: Run) -> int:
+        """
+        Plays the journal back through a run over the saved splits, saving any PBs and golds it had reached
+
+        An attempt that was still going when the journal ends is stopped, so the golds for the segments it finished are kept.
+
+        Args:
+            run: (Core.Run.Run) a fresh run over the splits the journal was written against
+
+        Returns:
+            (int) the number of entries replayed
+        """
+        entries = self.read()
+
+        for entry in entries:
+            run.handle(entry['event'], entry.get('time'))
+
+        if run.started and not run.done:
+            run.stop()
+
+        return len(entries)
+
+    def clear(self, through: int = None):
+        """
+        Empties the journal, call it once everything in it has been saved
+
+        Args:
+            through: (int, optional) only clear the entries up to and including this seq, for when the save was taken
+                before some of the entries were logged, everything if not given
+
+        Raises:
+            OSError: if the journal couldn't be written or cleared
+        """
+        self._start_writer()  # clear from the writer thread, so it can't race an entry being written
+
+        self._queue.put((_CLEAR, through))
+        self.wait()
+
+    def wait(self):
+        """
+        Blocks until everything logged so far is on disk
+
+        Raises:
+            OSError: if the writer couldn't write the journal, so what was logged isn't on disk
+        """
+        if self._thread is None:
+            return
+
+        done = threading.Event()
+        self._queue.put(done)
+
+        # the writer sets the event even after an error, but don't hang on a thread that died some other way
+        while not done.wait(WAIT_POLL):
+            if not self._thread.is_alive():
+                break
+
+        if self.error is not None:
+            raise self.error
+
+    def close(self):
+        """
+        Writes out anything left and stops the writer thread
+        """
+        if self._thread is None:
+            return
+
+        self._queue.put(_CLOSE)
+        self._thread.join()
+        self._thread = None
+
+    def _start_writer(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, name='RunJournal', daemon=True)
+            self._thread.start()
+
+    def _write_loop(self):
+        f = self._open()
+        closing = False
+
+        while not closing:
+            batch = [self._queue.get()]  # wait for something to write
+            deadline = monotonic() + self.flush_interval
+
+            # then group anything else that comes in shortly after it into the same write, unless someone is waiting on us
+            while isinstance(batch[-1], dict):
+                remaining = deadline - monotonic()
+
+                try:
+                    batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            lines = []
+
+            for item in batch:
+                if isinstance(item, dict):
+                    lines.append(json.dumps(item, separators=(',', ':')) + '\n')
+                    continue
+
+                # anything that isn't an entry needs everything before it on disk first
+                f = self._write(f, lines)
+                lines = []
+
+                if isinstance(item, tuple):
+                    try:
+                        f = self._clear_file(f, item[1])
+                    except OSError as e:
+                        self.error = e
+                        f = self._close(f)
+                elif item is _CLOSE:
+                    closing = True
+                else:
+                    item.set()
+
+            f = self._write(f, lines)
+
+        self._close(f)
+
+    def _open(self):
+        """
+        Returns:
+            the journal file opened to append to, or None if it can't be, with the error kept
+        """
+        try:
+            f = open(self.path, 'ab')
+        except OSError as e:
+            self.error = e
+            return None
+
+        self.error = None
+        return f
+
+    def _write(self, f, lines: list[str]):
+        """
+        Writes entries from the writer thread, the file is opened again first if an earlier error closed it
+
+        Returns:
+            the file to keep appending to, or None if the write failed
+        """
+        if not lines:
+            return f
+
+        if f is None:
+            f = self._open()
+
+            if f is None:
+                return None
+
+        try:
+            _write_lines(f, lines)
+        except OSError as e:
+            self.error = e
+            return self._close(f)
+
+        self.error = None
+        return f
+
+    @staticmethod
+    def _close(f):
+        if f is not None:
+            try:
+                f.close()
+            except OSError:
+                pass
+
+        return None
+
+    def _clear_file(self, f, through: int = None):
+        """
+        Clears the journal file from the writer thread, keeping any entries logged after the given seq
+
+        Returns:
+            the file to keep appending to
+        """
+        keep = [] if through is None else [entry for entry in self.read() if entry.get('seq', 0) > through]
+
+        if not keep:
+            if f is None:
+                f = open(self.path, 'wb')
+            else:
+                _truncate(f)
+
+            self.error = None
+            return f
+
+        self._close(f)
+        atomic_write(self.path, ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in keep))
+
+        f = open(self.path, 'ab')
+        self.error = None
+        return f
+
+
+def _write_lines(f, lines: list[str]):
+    if lines:
+        f.write(''.join(lines).encode('utf-8'))
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _truncate(f):
+    f.truncate(0)
+    f.flush()
+    os.fsync(f.fileno())
@@ -0,0 +1,191 @@
+"""
+Estimates the chance of the run in progress ending in a PB, by playing the rest of it out many times with segment times
+drawn from the attempt history
+
+Every trial is run at once as NumPy array operations, so the only Python loops are over batches of trials and chunks of
+splits, never over single trials. NumPy is optional, without it there is no estimate and everything else still works.
+"""
+from __future__ import annotations
+
+from array import array
+from time import perf_counter
+from typing import Iterable
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+DEFAULT_TRIALS = 10_000
+DEFAULT_BUDGET_MS = 50  # how long one estimate can take before it settles for the trials it has done
+BATCH_TRIALS = 2000  # trials run between checks of the time budget
+MAX_BATCH_CELLS = 1_000_000  # the most segment draws held in memory at once, so long games are sampled in chunks of splits
+
+
+def available() -> bool:
+    """
+    Returns:
+        (bool) whether NumPy is installed, so there can be an estimate at all
+    """
+    return np is not None
+
+
+class PBChanceEstimator:
+    """
+    Keeps every segment time from the attempt history and estimates the PB chance from them
+
+    A split with no history falls back to its gold as its only time. The history is packed into flat NumPy arrays the
+    first time an estimate needs them after it changes, not on every estimate.
+    """
+    def __init__(self, split_count: int, golds: Iterable[int] = (), pb_time_ms: int = 0, seed: int = None):
+        """
+        Args:
+            split_count: (int) how many splits the game has
+            golds: (Iterable[int], optional) the gold segment of each split, for splits with no history
+            pb_time_ms: (int, optional) the pb's final time, 0 if the game hasn't been finished
+            seed: (int, optional) makes the same estimates every time for the same seed
+        """
+        self.samples = [array('q') for _ in range(split_count)]
+        self.golds = list(golds)
+        self.pb_time_ms = pb_time_ms
+
+        self._rng = np.random.default_rng(seed) if np is not None else None
+        self._packed = None  # (flat, offsets, lengths), None when the samples changed since they were packed
+
+    @classmethod
+    def from_attempts(cls, split_count: int, attempts: Iterable[dict], golds: Iterable[int] = (), pb_time_ms: int = 0,
+                      seed: int = None) -> PBChanceEstimator:
+        """
+        Builds the estimator from a game's past attempts
+
+        Args:
+            split_count: (int) how many splits the game has
+            attempts: (Iterable[dict]) the attempts, as they are kept in the attempt history
+            golds: (Iterable[int], optional) the gold segment of each split
+            pb_time_ms: (int, optional) the pb's final time
+            seed: (int, optional) makes the same estimates every time for the same seed
+
+        Returns:
+            (PBChanceEstimator) the estimator
+        """
+        estimator = cls(split_count, golds, pb_time_ms, seed)
+
+        for attempt in attempts:
+            estimator.add_attempt(attempt)
+
+        return estimator
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def add_attempt(self, attempt: dict):
+        """
+        Adds every segment an attempt finished
+
+        Args:
+            attempt: (dict) the attempt, with its 'split_times' in timer time
+        """
+        prev = 0
+
+        for samples, split_time in zip(self.samples, attempt.get('split_times') or []):
+            if split_time - prev > 0:
+                samples.append(split_time - prev)
+
+            prev = split_time
+
+        self._packed = None
+
+    def set_golds(self, golds: Iterable[int], pb_time_ms: int):
+        """
+        Takes the game's golds and pb after they change
+        """
+        self.golds = list(golds)
+        self.pb_time_ms = pb_time_ms
+        self._packed = None
+
+    def insert_segments(self, first: int, count: int):
+        """
+        Makes room for splits that were added to the game, they start without any samples
+        """
+        self.samples[first:first] = [array('q') for _ in range(count)]
+        self._packed = None
+
+    def remove_segments(self, first: int, count: int):
+        """
+        Drops the samples of splits that were removed from the game
+        """
+        del self.samples[first:first + count]
+        self._packed = None
+
+    def _pack(self):
+        if self._packed is None:
+            parts = []
+
+            for i, samples in enumerate(self.samples):
+                if not samples and i < len(self.golds) and self.golds[i] > 0:
+                    samples = array('q', [self.golds[i]])
+
+                parts.append(np.frombuffer(samples, dtype=np.int64) if samples else np.empty(0, np.int64))
+
+            lengths = np.array([len(part) for part in parts], dtype=np.int64)
+            offsets = np.zeros(len(parts), dtype=np.int64)
+            np.cumsum(lengths[:-1], out=offsets[1:])
+
+            flat = np.concatenate(parts) if parts else np.empty(0, np.int64)
+            self._packed = (flat, offsets, lengths)
+
+        return self._packed
+
+    def estimate(self, index: int, start_ms: int, elapsed_ms: int = 0, trials: int = DEFAULT_TRIALS,
+                 budget_ms: float = DEFAULT_BUDGET_MS) -> tuple[float | None, int]:
+        """
+        Plays out the rest of the run from the given split, and counts how many of the trials beat the pb
+
+        Args:
+            index: (int) the split the run is on
+            start_ms: (int) the time on the timer when the current segment started
+            elapsed_ms: (int, optional) how long the current segment has already taken, no trial can do it faster
+            trials: (int, optional) how many trials to run
+            budget_ms: (float, optional) stop after the batch that goes over this many ms, with at least one batch run
+
+        Returns:
+            (tuple[float | None, int]) the chance between 0 and 1 and how many trials it came from, or (None, 0) if there
+                is no estimate because NumPy isn't installed, there is no pb, or a split to come has no times at all
+        """
+        if np is None or self.pb_time_ms <= 0 or not 0 <= index < len(self.samples) or trials <= 0:
+            return None, 0
+
+        flat, offsets, lengths = self._pack()
+
+        if not lengths[index:].all():
+            return None, 0
+
+        rng = self._rng
+        target = self.pb_time_ms - start_ms  # what the rest of the run has to come in under
+        split_count = len(self.samples)
+        deadline = perf_counter() + budget_ms / 1000
+
+        wins = 0
+        done = 0
+
+        while done < trials:
+            size = min(BATCH_TRIALS, trials - done)
+            chunk = max(1, MAX_BATCH_CELLS // size)
+
+            # the current segment can't come in under what it has already taken
+            picks = offsets[index] + (rng.random(size) * lengths[index]).astype(np.int64)
+            totals = np.maximum(flat[picks], elapsed_ms)
+
+            for first in range(index + 1, split_count, chunk):
+                last = min(first + chunk, split_count)
+
+                picks = offsets[first:last] + (rng.random((size, last - first)) * lengths[first:last]).astype(np.int64)
+                totals += flat[picks].sum(axis=1)
+
+            wins += int(np.count_nonzero(totals < target))
+            done += size
+
+            if perf_counter() >= deadline:
+                break
+
+        return wins / done, done
@@ -0,0 +1,305 @@
+"""
+The state of a single run through a game's splits, kept free of Qt so it can be driven from tests, scripts or servers
+"""
+from Models.Split import Split
+from Models.SplitTable import update_segment_totals
+
+# what handle() says happened, so whatever is drawing the run knows what to redraw
+STARTED = 'STARTED'
+SPLIT = 'SPLIT'
+FINISHED = 'FINISHED'
+UNSPLIT = 'UNSPLIT'
+RESET = 'RESET'
+STOPPED = 'STOPPED'
+PAUSED = 'PAUSED'
+RESUMED = 'RESUMED'
+
+
+class Run:
+    """
+    Tracks where we are in the splits, the times for each split, and saves any PBs and golds once the run is over
+
+    All times are in milliseconds from the start of the run (including the start offset), the run never reads a clock
+    itself, so the caller decides what time each event happened at.
+    """
+    def __init__(self, splits: list[Split], session_attempts: int = 0, lifetime_attempts: int = 0):
+        self.session_attempts = session_attempts
+        self.lifetime_attempts = lifetime_attempts
+
+        self.splits = []
+        self.index = 0  # the split we are currently on
+
+        # the current state of the run
+        self.started = False
+        self.done = False
+        self.paused = False
+
+        self.last_attempt = None  # what happened on the last attempt that ended, for the attempt history
+
+        # the times for each split in this run, indexed the same as the splits
+        self.split_times = []
+        self.segment_times = []
+        self.start_times = []
+        self.pauses = []  # [paused at, resumed at] pairs in timer time, resumed at is None while paused
+
+        self.set_splits(splits)
+
+    def set_splits(self, splits: list[Split]):
+        """
+        Swaps out the splits we are running through, anything in progress is thrown out unless they are the same splits
+
+        Args:
+            splits: (list[Split]) the splits to run through
+        """
+        if splits is self.splits and len(self.split_times) == len(splits):
+            return  # nothing changed, keep the run going
+
+        self.splits = splits
+        self.reset()
+
+    @property
+    def current_split(self) -> Split:
+        return self.splits[self.index]
+
+    @property
+    def current_time(self) -> int:
+        return self.split_times[self.index]
+
+    @property
+    def is_last_split(self) -> bool:
+        return self.index == len(self.splits) - 1
+
+    def handle(self, event: str, time_ms: int = None) -> str:
+        """
+        Handles a control event at the given time
+
+        Args:
+            event: (str) the control event, the same ones the timer controller sends out
+            time_ms: (int, optional) the time on the timer when the event happened, needed for splits
+
+        Returns:
+            (str) what happened to the run, or None if the event didn't change anything
+        """
+        if event == 'STARTSPLIT':
+            return self.split(time_ms)
+
+        elif event == 'UNSPLIT':
+            return self.unsplit()
+
+        elif event == 'RESET':
+            return self.reset()
+
+        elif event == 'STOP':
+            return self.stop()
+
+        elif event == 'PAUSE':
+            return self.pause(time_ms)
+
+        elif event == 'RESUME':
+            return self.resume(time_ms)
+
+        return None
+
+    def update(self, time_ms: int):
+        """
+        Updates the current split with the time on the timer
+
+        Args:
+            time_ms: (int) the current time on the timer in milliseconds
+        """
+        if self.started and not self.done:
+            self.split_times[self.index] = time_ms
+            self.segment_times[self.index] = time_ms - self.start_times[self.index]
+
+    def split(self, time_ms: int = None) -> str:
+        """
+        Starts the run, moves on to the next split, or finishes the run if we are on the last split
+
+        Args:
+            time_ms: (int, optional) the time on the timer at the moment of the split
+
+        Returns:
+            (str) STARTED, SPLIT or FINISHED, or None if the split was ignored
+        """
+        if time_ms is not None:
+            self.update(time_ms)
+
+        if not self.started:
+            self.start()
+            return STARTED
+
+        if self.done:
+            return None
+
+        if self.current_time < 0:
+            return None  # ignore splits before the time offset finishes
+
+        if self.is_last_split:
+            self.finish()
+            return FINISHED
+
+        self.index += 1
+        self.start_times[self.index] = self.split_times[self.index - 1]
+
+        return SPLIT
+
+    def start(self):
+        """
+        Starts a new attempt from the first split
+        """
+        self._clear_times()
+
+        self.index = 0
+        self.started = True
+        self.done = False
+
+        self.session_attempts += 1
+        self.lifetime_attempts += 1
+
+    def pause(self, time_ms: int = None) -> str:
+        """
+        Notes that the timer was paused, so the attempt history knows the run wasn't one straight go
+
+        Args:
+            time_ms: (int, optional) the time on the timer when it was paused
+
+        Returns:
+            (str) PAUSED, or None if there is no run to pause
+        """
+        if not self.started or self.done or self.paused:
+            return None
+
+        self.paused = True
+        self.pauses.append([time_ms, None])
+
+        return PAUSED
+
+    def resume(self, time_ms: int = None) -> str:
+        """
+        Notes that the timer was resumed
+
+        Args:
+            time_ms: (int, optional) the time on the timer when it was resumed
+
+        Returns:
+            (str) RESUMED, or None if the run wasn't paused
+        """
+        if not self.paused:
+            return None
+
+        self.paused = False
+        self.pauses[-1][1] = time_ms
+
+        return RESUMED
+
+    def unsplit(self) -> str:
+        """
+        Goes back to the previous split, throwing out the time on the current one
+
+        Returns:
+            (str) UNSPLIT, or None if there is nothing to go back to
+        """
+        if not self.started or self.done or self.index == 0:
+            return None
+
+        self.split_times[self.index] = 0
+        self.segment_times[self.index] = 0
+        self.start_times[self.index] = 0
+
+        self.index -= 1
+
+        return UNSPLIT
+
+    def finish(self):
+        """
+        Ends the run on the last split and saves the PB and any golds
+        """
+        final_time = self.split_times[-1]
+        pb_time = self.splits[-1].pb_time_ms
+        did_pb = pb_time == 0 or final_time < pb_time  # a pb of 0 means this game hasn't been finished yet
+
+        for i, split in enumerate(self.splits):
+            if did_pb:
+                split.pb_time_ms = self.split_times[i]
+                split.pb_segment_ms = self.segment_times[i]
+
+            self._save_gold(i)
+
+        self.update_totals()
+        self._end_attempt(FINISHED)
+
+        self.started = False
+        self.done = True
+
+    def stop(self) -> str:
+        """
+        Stops the run early, saving golds for any segments that were finished
+
+        Returns:
+            (str) STOPPED
+        """
+        if self.started and not self.done:
+            for i in range(self.index):  # the current segment wasn't finished, so it can't be a gold
+                self._save_gold(i)
+
+            self.update_totals()
+            self._end_attempt(STOPPED)
+
+        self._clear_times()
+
+        self.index = 0
+        self.started = False
+        self.done = False
+
+        return STOPPED
+
+    def reset(self) -> str:
+        """
+        Throws out the current run without saving anything
+
+        Returns:
+            (str) RESET
+        """
+        if self.started and not self.done:
+            self._end_attempt(RESET)
+
+        self._clear_times()
+
+        self.index = 0
+        self.started = False
+        self.done = False
+
+        return RESET
+
+    def update_totals(self):
+        """
+        Recalculates the running pb and gold segment totals on the splits after their times change
+        """
+        update_segment_totals(self.splits)
+
+    def _save_gold(self, i: int):
+        segment = self.segment_times[i]
+        gold = self.splits[i].gold_segment_ms
+
+        if segment > 0 and (gold == 0 or segment < gold):  # a gold of 0 means we have never done this segment
+            self.splits[i].gold_segment_ms = segment
+
+    def _end_attempt(self, result: str):
+        """
+        Keeps what happened on the attempt that just ended, before the times are cleared for the next one
+        """
+        finished = result == FINISHED
+
+        self.last_attempt = {
+            'result': result,
+            'split_times': self.split_times[:len(self.splits) if finished else self.index],  # only the splits that were actually split
+            'reset_index': None if finished else self.index,
+            'pauses': [list(pause) for pause in self.pauses]
+        }
+
+    def _clear_times(self):
+        self.split_times = [0] * len(self.splits)
+        self.segment_times = [0] * len(self.splits)
+        self.start_times = [0] * len(self.splits)
+        self.pauses = []
+        self.paused = False
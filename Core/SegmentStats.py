@@ -0,0 +1,489 @@
+"""
+Running statistics for each segment of a game, kept up to date one finished segment at a time
+"""
+from __future__ import annotations
+
+from array import array
+from math import sqrt
+from typing import Iterable
+
+from helpers.FenwickTree import FenwickTree
+
+QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)  # the percentiles every segment keeps an estimate of
+
+
+class RunningStats:
+    """
+    The count, mean, variance, min and max of a stream of numbers, with Welford's update so nothing is ever rescanned
+    """
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0  # the sum of squared differences from the mean
+        self.min = None
+        self.max = None
+
+    def add(self, x: float):
+        self.count += 1
+
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+
+        if self.min is None or x < self.min:
+            self.min = x
+
+        if self.max is None or x > self.max:
+            self.max = x
+
+    @property
+    def variance(self) -> float:
+        """
+        The sample variance, 0 until there are two values
+        """
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return sqrt(self.variance)
+
+
+class P2Quantile:
+    """
+    Estimates one quantile of a stream in constant memory with the P² algorithm (Jain and Chlamtac, 1985)
+
+    Five markers track the min, the max, the quantile and the points halfway to it on either side. Each value nudges the
+    marker heights along a parabola through their neighbours, so the estimate settles in without keeping the values.
+    Until there are five values the quantile is worked out exactly from them.
+    """
+    __slots__ = ('p', '_heights', '_positions', '_desired', '_increments')
+
+    def __init__(self, p: float):
+        """
+        Args:
+            p: (float) the quantile to estimate, between 0 and 1, eg: 0.5 for the median
+        """
+        self.p = p
+
+        self._heights = []  # the first five values, then the marker heights
+        self._positions = [1, 2, 3, 4, 5]
+        self._desired = [1, 1 + 2 * p, 1 + 4 * p, 3 + 2 * p, 5]
+        self._increments = (0, p / 2, p, (1 + p) / 2, 1)
+
+    def add(self, x: float):
+        heights = self._heights
+
+        if len(heights) < 5:
+            heights.append(x)
+            heights.sort()
+            return
+
+        positions = self._positions
+
+        # find which cell the value lands in, stretching the ends if it's a new min or max, every marker above it moves up
+        # (unrolled, this runs for every quantile of every segment of every attempt when the history is loaded)
+        if x < heights[0]:
+            heights[0] = x
+            positions[1] += 1
+            positions[2] += 1
+            positions[3] += 1
+        elif x < heights[1]:
+            positions[1] += 1
+            positions[2] += 1
+            positions[3] += 1
+        elif x < heights[2]:
+            positions[2] += 1
+            positions[3] += 1
+        elif x < heights[3]:
+            positions[3] += 1
+        elif x >= heights[4]:
+            heights[4] = x
+
+        positions[4] += 1
+
+        desired = self._desired
+        increments = self._increments
+        desired[1] += increments[1]
+        desired[2] += increments[2]
+        desired[3] += increments[3]
+        desired[4] += 1
+
+        # move any middle marker that has drifted a whole position from where it should be
+        for i in (1, 2, 3):
+            d = desired[i] - positions[i]
+
+            if (d >= 1 and positions[i + 1] - positions[i] > 1) or (d <= -1 and positions[i - 1] - positions[i] < -1):
+                d = 1 if d > 0 else -1
+                height = self._parabolic(i, d)
+
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + d * (heights[i + d] - heights[i]) / (positions[i + d] - positions[i])
+
+                heights[i] = height
+                positions[i] += d
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self._heights, self._positions
+
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i]) +
+            (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+    @property
+    def value(self) -> float | None:
+        """
+        The estimate, None if nothing has been added
+        """
+        heights = self._heights
+
+        if not heights:
+            return None
+
+        if len(heights) < 5 or self._positions[4] == 5:
+            # interpolate between the values we have
+            rank = self.p * (len(heights) - 1)
+            low = int(rank)
+            high = min(low + 1, len(heights) - 1)
+
+            return heights[low] + (heights[high] - heights[low]) * (rank - low)
+
+        return heights[2]
+
+
+class SegmentStats:
+    """
+    Everything we know about one segment's times, each new time is an O(1) update no matter how many came before
+    """
+    __slots__ = ('running', 'quantiles', 'best')
+
+    def __init__(self, quantiles: Iterable[float] = QUANTILES):
+        self.running = RunningStats()
+        self.quantiles = {p: P2Quantile(p) for p in quantiles}
+        self.best = 0  # 0 until we have a time, the same as a split with no gold
+
+    def add(self, segment_ms: int):
+        self.running.add(segment_ms)
+
+        for quantile in self.quantiles.values():
+            quantile.add(segment_ms)
+
+        if self.best == 0 or segment_ms < self.best:
+            self.best = segment_ms
+
+    def offer_best(self, segment_ms: int):
+        """
+        Counts a time as the best if it is, without adding it to the stats, for golds we don't have the attempt for
+        """
+        if segment_ms > 0 and (self.best == 0 or segment_ms < self.best):
+            self.best = segment_ms
+
+    @property
+    def count(self) -> int:
+        return self.running.count
+
+    @property
+    def mean(self) -> float | None:
+        return self.running.mean if self.running.count else None
+
+    @property
+    def stdev(self) -> float:
+        return self.running.stdev
+
+    @property
+    def median(self) -> float | None:
+        return self.percentile(0.5)
+
+    def percentile(self, p: float) -> float | None:
+        """
+        Args:
+            p: (float) one of the quantiles this segment keeps, eg: 0.9
+
+        Returns:
+            (float | None) the estimate, None if there are no times yet
+
+        Raises:
+            KeyError: if the quantile isn't one being kept
+        """
+        return self.quantiles[p].value
+
+
+class SegmentStatsEngine:
+    """
+    Keeps SegmentStats for every split of a game, fed with the finished segments of each attempt
+
+    The sum of best, average and median comparisons are kept as running totals per split in Fenwick trees, so a new
+    segment only costs an O(1) stats update plus an O(log n) change to the totals, and reading the comparison at any
+    split costs O(log n), instead of going back over the history. Building from a whole history skips the per segment
+    changes to the totals and builds the trees once at the end.
+    """
+    def __init__(self, split_count: int, quantiles: Iterable[float] = QUANTILES):
+        self.quantiles = tuple(quantiles)
+        self.segments = [SegmentStats(self.quantiles) for _ in range(split_count)]
+        self.attempts = 0
+
+        # whole ms, so the trees stay ints and the totals match what is on screen
+        self._best = FenwickTree([0] * split_count)
+        self._average = FenwickTree([0] * split_count)
+        self._median = FenwickTree([0] * split_count)
+        self._shown = [[0, 0, 0] for _ in range(split_count)]  # what each tree has for each split, (best, average, median)
+
+    @classmethod
+    def from_attempts(cls, split_count: int, attempts: Iterable[dict], golds: Iterable[int] = ()) -> SegmentStatsEngine:
+        """
+        Builds the stats from a game's past attempts
+
+        Args:
+            split_count: (int) how many splits the game has
+            attempts: (Iterable[dict]) the attempts, as they are kept in the attempt history
+            golds: (Iterable[int], optional) the game's gold segments, which count towards the best even without an attempt
+
+        Returns:
+            (SegmentStatsEngine) the stats
+        """
+        engine = cls(split_count)
+
+        for attempt in attempts:
+            engine._add_segments(attempt)
+            engine.attempts += 1
+
+        for segment, gold in zip(engine.segments, golds):
+            segment.offer_best(gold)
+
+        engine._build_totals()
+
+        return engine
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def add_segment(self, index: int, segment_ms: int):
+        """
+        Adds a finished segment's time
+
+        Args:
+            index: (int) the split the segment ends on
+            segment_ms: (int) how long the segment took
+        """
+        segment = self.segments[index]
+        segment.add(segment_ms)
+
+        self._update_totals(index)
+
+    def add_attempt(self, attempt: dict) -> int:
+        """
+        Adds every segment an attempt finished, whether it was finished, reset or stopped
+
+        Args:
+            attempt: (dict) the attempt, with its 'split_times' in timer time, so pauses are already left out
+
+        Returns:
+            (int) how many segments were added
+        """
+        added = self._add_segments(attempt)
+
+        for i in added:
+            self._update_totals(i)
+
+        self.attempts += 1
+
+        return len(added)
+
+    def _add_segments(self, attempt: dict) -> list[int]:
+        """
+        Adds an attempt's segments to the stats without touching the totals
+
+        Returns:
+            (list[int]) the splits that got a segment
+        """
+        split_times = attempt.get('split_times') or []
+        segments = self.segments
+        added = []
+        prev = 0
+
+        for i, split_time in enumerate(split_times[:len(segments)]):
+            segment_ms = split_time - prev
+            prev = split_time
+
+            if segment_ms > 0:
+                segments[i].add(segment_ms)
+                added.append(i)
+
+        return added
+
+    def insert_segments(self, first: int, count: int):
+        """
+        Makes room for splits that were added to the game, they start with no history and everything after them moves
+        along with its stats, rather than the whole history being gone through again
+
+        Args:
+            first: (int) where the first new split is
+            count: (int) how many were added
+        """
+        self.segments[first:first] = [SegmentStats(self.quantiles) for _ in range(count)]
+        self._build_totals()
+
+    def remove_segments(self, first: int, count: int):
+        """
+        Drops the stats of splits that were removed from the game, everything after them moves back
+
+        Args:
+            first: (int) where the first removed split was
+            count: (int) how many were removed
+        """
+        del self.segments[first:first + count]
+        self._build_totals()
+
+    def offer_best(self, index: int, segment_ms: int):
+        """
+        Counts a time as the segment's best if it is, without it counting towards the other stats
+        """
+        self.segments[index].offer_best(segment_ms)
+        self._update_totals(index)
+
+    def _build_totals(self):
+        """
+        Builds the trees from every segment's current stats in O(n), for after a whole history or the splits changed
+        """
+        self._shown = [[_whole_ms(segment.best), _whole_ms(segment.mean), _whole_ms(segment.median)] for segment in self.segments]
+
+        self._best = FenwickTree(shown[0] for shown in self._shown)
+        self._average = FenwickTree(shown[1] for shown in self._shown)
+        self._median = FenwickTree(shown[2] for shown in self._shown)
+
+    def _update_totals(self, index: int):
+        segment = self.segments[index]
+        shown = self._shown[index]
+
+        for i, tree, value in ((0, self._best, segment.best), (1, self._average, segment.mean), (2, self._median, segment.median)):
+            value = _whole_ms(value)
+
+            if value != shown[i]:
+                tree.add(index, value - shown[i])
+                shown[i] = value
+
+    def sum_of_best(self, index: int = None) -> int:
+        """
+        Args:
+            index: (int, optional) the last split to include, all of them if not given
+
+        Returns:
+            (int) the best segments added up, in ms
+        """
+        return self._total(self._best, index)
+
+    def average_time(self, index: int = None) -> int:
+        """
+        Returns:
+            (int) the average segments added up to the given split, or the whole game, in ms
+        """
+        return self._total(self._average, index)
+
+    def median_time(self, index: int = None) -> int:
+        """
+        Returns:
+            (int) the median segments added up to the given split, or the whole game, in ms
+        """
+        return self._total(self._median, index)
+
+    @staticmethod
+    def _total(tree: FenwickTree, index: int = None) -> int:
+        return tree.total() if index is None else tree.prefix_sum(index)
+
+
+def _whole_ms(value: float | None) -> int:
+    return round(value) if value is not None else 0
+
+
+class GoldSums:
+    """
+    The golds of a game added up from each split to the end, so the sum of best and best possible time are O(1) to read
+
+    The sums are only worked out again when a gold actually changes, reading them every frame doesn't walk the splits.
+    """
+    def __init__(self, golds: Iterable[int] = (), pb_time_ms: int = 0):
+        """
+        Args:
+            golds: (Iterable[int]) the gold segment of each split, 0 for one that has never been done
+            pb_time_ms: (int, optional) the pb's final time, 0 if the game hasn't been finished
+        """
+        self.golds = array('q')
+        self._after = array('q', [0])  # _after[i] is the sum of the golds from split i to the end
+        self._last_missing = -1  # the last split without a gold, the sums aren't a real time before it
+
+        self.pb_time_ms = pb_time_ms
+        self.set_golds(golds)
+
+    def set_golds(self, golds: Iterable[int]) -> bool:
+        """
+        Takes the game's golds, working the sums out again if any of them changed
+
+        Args:
+            golds: (Iterable[int]) the gold segment of each split
+
+        Returns:
+            (bool) whether anything changed
+        """
+        golds = array('q', golds)
+
+        if golds == self.golds:
+            return False
+
+        after = array('q', [0]) * (len(golds) + 1)
+        total = 0
+        self._last_missing = -1
+
+        for i in range(len(golds) - 1, -1, -1):
+            total += golds[i]
+            after[i] = total
+
+            if golds[i] <= 0 and self._last_missing < 0:
+                self._last_missing = i
+
+        self.golds = golds
+        self._after = after
+
+        return True
+
+    def __len__(self) -> int:
+        return len(self.golds)
+
+    def sum_of_best(self) -> int:
+        """
+        Returns:
+            (int) the golds added up, 0 if a split has never been done so there isn't a sum of best yet
+        """
+        return self._after[0] if self._last_missing < 0 else 0
+
+    def best_possible_time(self, index: int, segment_start_ms: int, curr_time_ms: int) -> int:
+        """
+        The fastest the run in progress could still finish, if every segment from here on is a gold
+
+        Args:
+            index: (int) the split the run is on
+            segment_start_ms: (int) the time on the timer when the current segment started
+            curr_time_ms: (int) the time on the timer now
+
+        Returns:
+            (int) the time in ms, 0 if a split still to come has never been done
+        """
+        if index >= len(self.golds) or index < self._last_missing:
+            return 0
+
+        # once the current segment is slower than its gold, every ms spent on it comes off the best possible time
+        return max(curr_time_ms, segment_start_ms + self.golds[index]) + self._after[index + 1]
+
+    def possible_time_save(self, best_possible_ms: int) -> int:
+        """
+        Args:
+            best_possible_ms: (int) the best possible time, from sum_of_best or best_possible_time
+
+        Returns:
+            (int) how much faster than the pb that is, 0 if there isn't a pb or it can't be beaten anymore
+        """
+        if self.pb_time_ms <= 0 or best_possible_ms <= 0:
+            return 0
+
+        return max(0, self.pb_time_ms - best_possible_ms)
@@ -0,0 +1,178 @@
+"""
+A shared clock that any widget can read the current time from when it repaints, instead of being pushed the time on every tick
+"""
+from time import perf_counter_ns, time_ns
+
+NS_PER_MS = 1_000_000
+
+
+class TimeSource:
+    """
+    Holds the state of the run's clock so it can be read from any thread at any time
+
+    The timer thread is the only thing that should change the state, everything else just reads it. All the state lives
+    in a single tuple that is swapped out whole, so a reader on another thread always sees a consistent clock without a lock.
+    """
+    def __init__(self, offset_ms: int = 0):
+        # (anchor_ns, prev_time_ms, offset_ms, running, paused)
+        self._state = (0, 0, offset_ms, False, False)
+
+        self.frame_time = offset_ms  # the time sampled for the frame currently being drawn
+
+    @property
+    def running(self) -> bool:
+        return self._state[3]
+
+    @property
+    def paused(self) -> bool:
+        return self._state[4]
+
+    @property
+    def ticking(self) -> bool:
+        """
+        Whether the time is currently moving, aka running and not paused
+        """
+        _, _, _, running, paused = self._state
+        return running and not paused
+
+    @property
+    def prev_time(self) -> int:
+        return self._state[1]
+
+    @property
+    def offset(self) -> int:
+        return self._state[2]
+
+    def now(self) -> int:
+        """
+        Reads the current time on the clock
+
+        Returns:
+            (int) The current time in milliseconds, including the offset
+        """
+        return self.time_at(perf_counter_ns())
+
+    def time_at(self, timestamp_ns: int) -> int:
+        """
+        Works out what the clock read (or will read) at the given moment
+
+        Args:
+            timestamp_ns: (int) a perf_counter_ns() timestamp
+
+        Returns:
+            (int) The time on the clock at that moment in milliseconds, including the offset
+        """
+        anchor_ns, prev_time_ms, offset_ms, running, paused = self._state  # read it once so it can't change under us
+
+        if running and not paused:
+            return (timestamp_ns - anchor_ns) // NS_PER_MS + prev_time_ms + offset_ms
+
+        return prev_time_ms + offset_ms
+
+    def sample(self) -> int:
+        """
+        Reads the clock once for a frame so that every widget drawn in that frame shows the same time
+
+        Returns:
+            (int) The time that was sampled in milliseconds
+        """
+        self.frame_time = self.now()
+
+        return self.frame_time
+
+    def start(self, timestamp_ns: int = None):
+        """
+        Starts the clock over from 0
+
+        Args:
+            timestamp_ns: (int, optional) when the clock should be started from, defaults to now
+        """
+        if timestamp_ns is None:
+            timestamp_ns = perf_counter_ns()
+
+        self._state = (timestamp_ns, 0, self.offset, True, False)
+
+    def pause(self, timestamp_ns: int = None):
+        """
+        Pauses the clock, keeping the time it had reached so it can be resumed
+
+        Args:
+            timestamp_ns: (int, optional) when the clock was paused, defaults to now
+        """
+        if timestamp_ns is None:
+            timestamp_ns = perf_counter_ns()
+
+        anchor_ns, prev_time_ms, offset_ms, running, paused = self._state
+
+        if running and not paused:
+            prev_time_ms += (timestamp_ns - anchor_ns) // NS_PER_MS
+            self._state = (anchor_ns, prev_time_ms, offset_ms, True, True)
+
+    def resume(self, timestamp_ns: int = None):
+        """
+        Resumes a paused clock from where it was paused
+
+        Args:
+            timestamp_ns: (int, optional) when the clock was resumed, defaults to now
+        """
+        if timestamp_ns is None:
+            timestamp_ns = perf_counter_ns()
+
+        _, prev_time_ms, offset_ms, running, paused = self._state
+
+        if running and paused:
+            self._state = (timestamp_ns, prev_time_ms, offset_ms, True, False)
+
+    def stop(self, timestamp_ns: int = None) -> int:
+        """
+        Stops the clock and holds the time it stopped at, a stopped clock cannot be resumed
+
+        Args:
+            timestamp_ns: (int, optional) when the clock was stopped, defaults to now
+
+        Returns:
+            (int) The time the clock stopped at in milliseconds, including the offset
+        """
+        if timestamp_ns is None:
+            timestamp_ns = perf_counter_ns()
+
+        final_time = self.time_at(timestamp_ns)
+        offset_ms = self.offset
+
+        self._state = (0, final_time - offset_ms, offset_ms, False, False)
+
+        return final_time
+
+    def reset(self):
+        """
+        Puts the clock back to its starting time
+        """
+        self._state = (0, 0, self.offset, False, False)
+
+    def set_offset(self, offset_ms: int):
+        """
+        Changes the time the clock starts at, usually negative to give a countdown before the run starts
+
+        Args:
+            offset_ms: (int) the starting time of the clock in milliseconds
+        """
+        anchor_ns, prev_time_ms, _, running, paused = self._state
+        self._state = (anchor_ns, prev_time_ms, offset_ms, running, paused)
+
+
+def wall_clock_ms(timestamp_ns: int = None) -> int:
+    """
+    Works out the wall clock time of a perf_counter_ns() timestamp, for saving when something happened
+
+    Args:
+        timestamp_ns: (int, optional) a perf_counter_ns() timestamp, defaults to now
+
+    Returns:
+        (int) milliseconds since the epoch
+    """
+    now_ns = time_ns()
+
+    if timestamp_ns is not None:
+        now_ns -= perf_counter_ns() - timestamp_ns
+
+    return now_ns // NS_PER_MS
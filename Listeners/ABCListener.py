@@ -65,6 +65,8 @@ class ABCListenedObject(ABC):
     """
     The thing that our implementations of these abstract listeners must output as what their listened event saw
     """
+    timestamp_ns = None  # a perf_counter_ns() stamp taken the moment the input was captured, None for objects that weren't captured (eg loaded from a file)
+
     @abstractmethod
     def __init__(self, obj):  # takes in an object and creates the source, type, and value strings for this thing
         ...
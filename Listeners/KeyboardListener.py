@@ -1,4 +1,5 @@
 from abc import ABC
+from time import perf_counter_ns
 
 #import Xlib.error
 from pynput.keyboard import Listener, Key, KeyCode
@@ -11,7 +12,9 @@ KEY_PRESS_SOURCE = 'pynput'
 
 
 class KeyPressObject(ABCListenedObject):
-    def __init__(self, obj: Key = None):
+    def __init__(self, obj: Key = None, timestamp_ns: int = None):
+        self.timestamp_ns = timestamp_ns
+
         if obj is not None:
             self.source = KEY_PRESS_SOURCE
             self.value = key_to_str(obj)
@@ -104,8 +107,10 @@ class KeyboardListener(ABCListener, ABC):
         self.listener.start()
 
     def on_input_event(self, event):
+        timestamp_ns = perf_counter_ns()  # stamp it first thing, before the event has to wait in any Qt queues
+
         if self.listening:  # only emit the event if the listener is currently "on"
-            self.on_event.emit(self.event_type(event))
+            self.on_event.emit(self.event_type(event, timestamp_ns))
 
     @Slot()
     def pause_listening(self):
@@ -1,4 +1,6 @@
-import resources_rc
+from helpers.StartupProfiler import profiler  # first, so it can time every import after it
+
+from helpers.Resources import load_resources
 
 from PySide6.QtWidgets import QApplication, QWidget, QVBoxLayout, QMenu, QMessageBox, QMainWindow
 from PySide6.QtCore import Slot, Signal, QThread, Qt, QFile
@@ -12,6 +14,11 @@ from Popups.AssignButtonsTab import AssignButtonsTab
 from Popups.BasicSettingsTab import BasicSettingsTab
 from Popups.SettingsWindow import SettingsWindow
 from Popups.GameSettingsTab import GameSettingsTab
+from Timer.TickScheduler import TickScheduler, screen_refresh_rate, DEFAULT_MAX_REFRESH_RATE
+from Core.TimeSource import TimeSource
+from Core.AttemptHistory import AttemptHistory
+from Core.Journal import RunJournal
+from Core.Run import Run
 from Timer.Timer import Timer
 from Timer.TimerController import TimerController
 from Widgets.SplitsWidget import SplitsWidget
@@ -19,6 +26,11 @@ from Widgets.TimeStatsWidget import TimeStatsWidget
 from Widgets.TimerWidget import TimerWidget
 from Widgets.TitleWidget import TitleWidget
 from Styling.Settings import Settings
+from Styling.AutoSaver import AutoSaver, DEFAULT_AUTOSAVE_DELAY_MS
+from Styling.Style.styleApplier import StyleApplier
+
+with profiler.phase('load resources'):
+    load_resources()  # the icons, from the compiled resources.rcc if it has been built
 
 
 class Main(QWidget):
@@ -32,8 +44,11 @@ class Main(QWidget):
     SaveSettings = Signal()
 
     _widget_starting_location = None  # the starting location of the widget, used for click and drag actions
+    _refresh_rate = None  # the refresh rate of the screen we were last on, so we only reconfigure the ticks when it changes
 
     def __init__(self, settings_path: str = 'conf/settings.json'):
+        profiler.checkpoint('window')
+
         super().__init__()
         self.setWindowTitle('PySplit v0.0')
         self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window | Qt.WindowStaysOnTopHint)
@@ -46,8 +61,15 @@ class Main(QWidget):
         layout.setSpacing(0)
 
         # load the settings from the file
+        profiler.checkpoint('settings')
         self.settings = Settings(settings_path)
 
+        # put back anything from a session that crashed before it could save, before anything is built from the game
+        profiler.checkpoint('journal recovery')
+        self.journal = RunJournal.for_game(self.settings.game_path)
+        self.recover_from_journal()
+
+        profiler.checkpoint('title and menu')
         self.title = TitleWidget.from_game(self.settings.game)
 
         self.context_menu = QMenu(self)
@@ -63,14 +85,41 @@ class Main(QWidget):
         self.exit_action = self.context_menu.addAction('Exit')
         self.exit_action.triggered.connect(QApplication.instance().quit)
 
-        # use the configurations from the file
-        self.settings.style.UpdateStyle.connect(self.set_style)
+        # the clock every widget reads from when it draws, the timer thread is the only thing that changes it
+        profiler.checkpoint('splits and timer widgets')
+        self.time_source = TimeSource(round(self.settings.game.start_offset * 1000))
 
-        self.splits = SplitsWidget(self.settings, parent=self)
+        self.splits = SplitsWidget(self.settings, parent=self, time_source=self.time_source)
         self.settings.SettingsUpdate.connect(self.splits.apply_settings)
 
-        self.main_timer_widget = TimerWidget(self.splits)
-        self.splitStats = TimeStatsWidget()
+        # every attempt is added to the history next to the game file as soon as it ends, not just when we save
+        self.attempt_history = AttemptHistory.for_game(self.settings.game_path)
+        self.splits.AttemptEnded.connect(self.attempt_history.append)
+        self.splits.RunEvent.connect(self.journal.log)
+
+        self.main_timer_widget = TimerWidget(self.splits, self.time_source)
+
+        # the footer's stats are built from the history on its own thread, then each attempt that ends just adds its segments
+        profiler.checkpoint('segment stats')
+        self.splitStats = TimeStatsWidget(self.settings, self.attempt_history, run=self.splits.run, time_source=self.time_source)
+        self.splits.set_comparison_stats(self.splitStats.stats)
+        self.splitStats.StatsChanged.connect(self.splits.set_comparison_stats)  # the same stats, so the comparisons built from them keep up with the footer
+        self.splitStats.show_comparison(self.splits.comparisons.name)
+        self.splits.AttemptEnded.connect(self.splitStats.add_attempt)
+        self.splits.ComparisonChanged.connect(self.splitStats.show_comparison)
+        self.splits.RunEvent.connect(self.splitStats.handle_run_event)
+        self.settings.SettingsUpdate.connect(self.splitStats.apply_settings)
+
+        # use the configurations from the file, each part of the window gets the rules for it so a change only re-polishes that part
+        profiler.checkpoint('style applier')
+        self.style_applier = StyleApplier(self, {
+            self.title: ('TitleFrame', 'TitleLabel', 'SubLabel', 'sessionAttemptsLabel', 'lifetimeAttemptsLabel'),
+            self.splits: ('SingleSplit',),
+            self.main_timer_widget: ('TimerFrame', 'TimerLabel'),
+            self.splitStats: ('TimerStatsWidget',)
+        }, parent=self)
+        self.settings.style.UpdateStyle.connect(self.set_style)
+        self.style_applier.StyleApplied.connect(self.main_timer_widget.update_style)
 
         layout.addWidget(self.title)
         layout.addWidget(self.splits)
@@ -80,20 +129,28 @@ class Main(QWidget):
         self.setLayout(layout)
         self.setGeometry(800, 800, 225, 200)
 
+        # ticks on the GUI thread in time with the screen, each tick samples the time source once and redraws from it
+        profiler.checkpoint('frame scheduler')
+        self._refresh_rate = screen_refresh_rate()
+        self.frame_scheduler = TickScheduler(self._refresh_rate, self.settings.settings.get('max_refresh_rate', DEFAULT_MAX_REFRESH_RATE), self.settings.settings.get('precision_timing', False), parent=self)
+        self.frame_scheduler.timeout.connect(self.refresh_frame)
+        self.settings.SettingsUpdate.connect(self.update_tick_settings)
+
         # create and connect to the timer thread
-        self.game_timer = Timer(self.settings)
+        profiler.checkpoint('timer thread')
+        self.game_timer = Timer(self.settings, self.time_source)
         self.game_timer_thread = QThread()
         self.game_timer.moveToThread(self.game_timer_thread)
         self.settings.game.GameUpdated.connect(self.game_timer.update_settings)
 
-        # connect the game timer signals to the desired slots
-        self.game_timer.update.connect(self.main_timer_widget.update_time)
-        self.game_timer.update.connect(self.splits.update_split)
+        # the timer only tells us when its state changes, the ticks come from the frame scheduler
+        self.game_timer.update.connect(self.timer_state_changed)
         self.game_timer_thread.started.connect(self.game_timer.run)
-        self.game_timer_thread.destroyed.connect(self.game_timer.stop_timer)
+        self.game_timer_thread.destroyed.connect(self.game_timer.quit)
 
         self.game_timer_thread.start()
 
+        profiler.checkpoint('input listener')
         aggregate_listener = AggregateListener(listeners=[KeyboardListener()])
 
         # create the timer controller from the config
@@ -110,16 +167,41 @@ class Main(QWidget):
         self.settings.game.GameUpdated.connect(self.splits.load_splits_from_game)
         self.settings.game.GameUpdated.connect(self.title.update_from_game)
 
+        # smaller changes to the game only patch what changed instead of reloading everything
+        self.settings.game.AttemptsUpdated.connect(self.title.update_attempts)
+        self.settings.game.AttemptsUpdated.connect(self.splits.update_attempts)
+        self.settings.game.MetadataUpdated.connect(self.title.update_from_game)
+        self.settings.game.MetadataUpdated.connect(self.game_timer.update_settings)
+        self.settings.game.SplitsAdded.connect(self.splits.insert_splits)
+        self.settings.game.SplitsRemoved.connect(self.splits.remove_splits)
+        self.settings.game.SplitsEdited.connect(self.splits.update_split_names)
+        self.settings.game.TimesUpdated.connect(self.splits.update_split_times)
+
+        # the stats are kept by split index, so they move around with the splits rather than being built again
+        self.settings.game.GameUpdated.connect(self.splitStats.load_stats)
+        self.settings.game.SplitsAdded.connect(self.splitStats.insert_splits)
+        self.settings.game.SplitsRemoved.connect(self.splitStats.remove_splits)
+        self.settings.game.TimesUpdated.connect(self.splitStats.update_golds)
+
+        profiler.checkpoint('settings window')
         self.settings_window = SettingsWindow(parent=self)
         self.settings_window.setGeometry(900, 900, 600, 400)
         self.settings_window.setMinimumSize(600, 400)
-        self.settings_window.add_tab(AssignButtonsTab(settings=self.settings, timer_controller=self.timer_controller, parent=self.settings_window), 'Key Bindings')
-        self.settings_window.add_tab(GameSettingsTab(self.settings, parent=self.settings_window), 'Splits')
-        self.settings_window.add_tab(BasicSettingsTab(self.settings, parent=self.settings_window), 'Settings')
-        self.settings_window.add_tab(AdvancedStyleTab(self.settings, parent=self.settings_window), 'Advanced')
+
+        # the tabs are only built the first time they are opened, most sessions never open the settings at all
+        self.settings_window.add_tab(lambda: AssignButtonsTab(settings=self.settings, timer_controller=self.timer_controller, parent=self.settings_window), 'Key Bindings')
+        self.settings_window.add_tab(lambda: GameSettingsTab(self.settings, parent=self.settings_window), 'Splits')
+        self.settings_window.add_tab(lambda: BasicSettingsTab(self.settings, parent=self.settings_window), 'Settings')
+        self.settings_window.add_tab(lambda: AdvancedStyleTab(self.settings, parent=self.settings_window), 'Advanced')
 
         self.settings_window.toggle_tab_visibility('Advanced')
 
+        # save whatever changed in the background once things settle, but never while the timer is running
+        profiler.checkpoint('autosave')
+        self.autosaver = AutoSaver(self.settings, self.journal, is_busy=lambda: self.time_source.running, delay_ms=self.settings.settings.get('autosave_delay_ms', DEFAULT_AUTOSAVE_DELAY_MS), parent=self)
+        self.autosaver.enabled = self.settings.settings.get('autosave', True)
+        self.settings.SettingsUpdate.connect(self.update_autosave_settings)
+
         # connect up the closing signals to the closing slots
         self.Quit.connect(self.game_timer.quit)
         self.Quit.connect(self.timer_controller.listener.quit)
@@ -161,7 +243,7 @@ class Main(QWidget):
         Args:
             stylesheet: (str) the style sheet data, probably read from file
         """
-        self.setStyleSheet(stylesheet)
+        self.style_applier.apply(stylesheet)
 
     def get_style(self):
         """
@@ -170,12 +252,42 @@ class Main(QWidget):
         Returns:
             (str): The stylesheet data that the app is currently using
         """
-        return self.styleSheet()
+        self.style_applier.flush()
+
+        return self.style_applier.style_sheet if self.style_applier.style_sheet is not None else self.styleSheet()
 
     def closeEvent(self, event):
         # stop listening to events
         self.timer_controller.toggle_listening()
 
+        if self.autosaver.enabled:
+            self.autosaver.flush()  # everything is already saved as we go, so just finish off anything still waiting
+
+        else:
+            self.ask_to_save()
+
+        self.autosaver.close()
+        self.journal.close()
+        self.attempt_history.close()
+
+        # emit a close so the threads clean themselves up
+        self.Quit.emit()  # emit a quit signal
+        sleep(0.125)  # wait for the quits to go through, not my proudest work, but it works
+
+        self.frame_scheduler.stop()
+        self.splitStats.stop_worker()
+
+        # stop the timer thread
+        self.game_timer_thread.quit()
+        self.game_timer_thread.wait()
+
+        # accept the close event and actually close
+        event.accept()
+
+    def ask_to_save(self):
+        """
+        Asks the user if they would like to save their changes, and saves them if they do
+        """
         # make a popup to ask the user if they would like to save changes before exiting
         save_box = QMessageBox(self)
         save_box.setWindowTitle('Save Changes?')
@@ -194,18 +306,102 @@ class Main(QWidget):
 
         if result == QMessageBox.StandardButton.Yes:
             self.settings.write_settings()
-            self.settings.game.to_json_file(self.settings.settings['game_path'])
+            self.save_game()
 
-        # emit a close so the threads clean themselves up
-        self.Quit.emit()  # emit a quit signal
-        sleep(0.125)  # wait for the quits to go through, not my proudest work, but it works
+        else:
+            self.clear_journal()  # they didn't want to keep this session, so don't bring it back next time
 
-        # stop the timer thread
-        self.game_timer_thread.quit()
-        self.game_timer_thread.wait()
+    def save_game(self):
+        """
+        Saves the game over its file, and empties the journal since everything in it is now in the file
+        """
+        self.settings.game.to_json_file(self.settings.game_path)
+        self.settings.game.mark_clean()
+        self.clear_journal()
 
-        # accept the close event and actually close
-        event.accept()
+    def clear_journal(self):
+        """
+        Empties the journal, telling the user if it couldn't be written so they know a crash now could lose the session
+        """
+        try:
+            self.journal.clear()
+        except OSError as e:
+            QMessageBox.warning(self, 'Journal Error', f'The run journal at {self.journal.path} could not be written:\n{e}')
+
+    def recover_from_journal(self):
+        """
+        Replays the journal left behind by a session that crashed on top of the saved game, and saves the result
+        """
+        game = self.settings.game
+        run = Run(game.splits, game.session_attempts, game.lifetime_attempts)
+
+        if self.journal.replay(run):
+            game.set_attempts(run.session_attempts, run.lifetime_attempts)
+            self.save_game()
+
+    @Slot(int)
+    def timer_state_changed(self, time: int):
+        """
+        Redraws with the new state of the timer, and only keeps ticking while the time is actually moving
+
+        Args:
+            time: (int) the time the timer changed state at in milliseconds, the widgets read it from the time source instead
+        """
+        if self.time_source.ticking:
+            self.frame_scheduler.start()
+        else:
+            self.frame_scheduler.stop()
+
+        if not self.time_source.running:
+            self.autosaver.schedule()  # anything that changed during the run can be saved now
+
+        self.refresh_frame()
+
+    @Slot()
+    def refresh_frame(self):
+        """
+        Samples the time source once and has every timing widget redraw from that sample so they all agree
+        """
+        self.time_source.sample()
+
+        self.main_timer_widget.refresh()
+        self.splits.refresh()
+        self.splitStats.refresh()
+
+    @Slot()
+    def update_autosave_settings(self):
+        """
+        Turns autosaving on or off to match the settings
+        """
+        self.autosaver.enabled = self.settings.settings.get('autosave', True)
+        self.autosaver.schedule()
+
+    @Slot()
+    def update_tick_settings(self):
+        """
+        Re-reads the tick rate settings so changes to the cap or precision mode apply without a restart
+        """
+        self.frame_scheduler.configure(max_rate=self.settings.settings.get('max_refresh_rate', DEFAULT_MAX_REFRESH_RATE), precision=self.settings.settings.get('precision_timing', False))
+
+    def check_refresh_rate(self):
+        """
+        Retunes the frame ticks if the window has ended up on a screen with a different refresh rate
+        """
+        refresh_rate = screen_refresh_rate(self.screen())
+
+        if refresh_rate != self._refresh_rate:
+            self._refresh_rate = refresh_rate
+
+            if hasattr(self, 'frame_scheduler'):  # moves can come in before we've finished building everything
+                self.frame_scheduler.configure(refresh_rate=refresh_rate)
+
+    def showEvent(self, event):
+        self.check_refresh_rate()
+        super().showEvent(event)
+
+    def moveEvent(self, event):
+        self.check_refresh_rate()  # dragging the window to another monitor could change how fast we should tick
+        super().moveEvent(event)
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
@@ -220,18 +416,29 @@ class Main(QWidget):
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    icon = QIcon(':icons/Static/pysplitIcon.png')
+    with profiler.phase('QApplication'):
+        app = QApplication(sys.argv)
+        icon = QIcon(':icons/Static/pysplitIcon.png')
+
+    with profiler.phase('Main'):
+        window = Main()
+
+        # set the window's icon
+        window.setWindowIcon(icon)
 
-    window = Main()
+    with profiler.phase('stylesheet'):
+        # use main's style configurations to get the initial stylesheet
+        style = window.settings.style.formatted_style_sheet
+        app.setStyleSheet(style)
 
-    # set the window's icon
-    window.setWindowIcon(icon)
+    with profiler.phase('show'):
+        window.show()
 
-    # use main's style configurations to get the initial stylesheet
-    style = window.settings.style.formatted_style_sheet
-    app.setStyleSheet(style)
+    if profiler.enabled:
+        # the first pass through the event loop is when the window actually gets drawn, so that's where startup ends
+        with profiler.phase('first frame'):
+            app.processEvents()
 
-    window.show()
+        profiler.finish()
 
     sys.exit(app.exec())
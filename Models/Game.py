@@ -1,14 +1,28 @@
 from __future__ import annotations
 
 import json
+from typing import Iterable
+
 from PySide6.QtCore import Signal, QObject
 
+from Models.Split import Split
+from Models.SplitTable import SplitTable
+from helpers.FileHelpers import atomic_write
+
 
 class Game(QObject):
     """A representation of a game and the splits we'd like to track during a run"""
-    GameUpdated = Signal(QObject)
+    GameUpdated = Signal(QObject)  # the whole game was swapped out, anything showing it should reload
+
+    # finer grained updates so anything showing the game only has to patch what actually changed
+    AttemptsUpdated = Signal(int, int)  # session attempts, lifetime attempts
+    MetadataUpdated = Signal(QObject)  # the title, sub-title, start offset or display pb changed
+    SplitsAdded = Signal(int, int)  # index of the first new split, number of splits added
+    SplitsRemoved = Signal(int, int)  # index of the first removed split, number of splits removed
+    SplitsEdited = Signal(list)  # indexes of the splits that were renamed
+    TimesUpdated = Signal(list)  # indexes of the splits whose saved times changed
 
-    def __init__(self, title: str, sub_title: str, splits: list[Split], lifetime_attempts: int, session_attempts: int, start_offset: float, display_pb: bool = True):
+    def __init__(self, title: str, sub_title: str, splits: Iterable[Split], lifetime_attempts: int, session_attempts: int, start_offset: float, display_pb: bool = True):
         super().__init__()
 
         self.title = title
@@ -19,6 +33,36 @@ class Game(QObject):
         self.display_pb = display_pb
         self.start_offset = start_offset
 
+        self._split_snapshot = self._snapshot_splits()  # what the splits looked like the last time we told anyone
+        self._dirty = False  # whether anything changed since the game was last saved
+
+    @property
+    def splits(self) -> SplitTable:
+        return self._splits
+
+    @splits.setter
+    def splits(self, splits: Iterable[Split]):
+        # anything given a list of splits gets a table, so the segment totals are always kept up to date
+        self._splits = splits if isinstance(splits, SplitTable) else SplitTable(splits)
+        self._dirty = True
+
+    @property
+    def dirty(self) -> bool:
+        """
+        Whether the game or any of its splits changed since it was last saved
+        """
+        return self._dirty or bool(self._splits.dirty_rows)
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def mark_clean(self):
+        """
+        Lets the game know it was just saved
+        """
+        self._dirty = False
+        self._splits.dirty_rows.clear()
+
     @classmethod
     def from_json(cls, json_dict: dict) -> Game:
         """
@@ -35,18 +79,8 @@ class Game(QObject):
         session_attempts = json_dict.get('session_attempts', 0)
         start_offset = json_dict.get('start_offset', 0.0)
 
-        prev_pb_segment_total_ms = 0
-        prev_gold_segment_total_ms = 0
-
-        # build the splits from the JSON in the game dictionary
-        splits = []
-        for split in json_dict['splits']:
-            new_split = Split.from_json(split, prev_pb_segment_total_ms, prev_gold_segment_total_ms)
-
-            prev_pb_segment_total_ms = new_split.pb_segment_total_ms
-            prev_gold_segment_total_ms = new_split.gold_segment_total_ms
-
-            splits.append(new_split)
+        # build the splits from the JSON in the game dictionary, the table works out the segment totals
+        splits = SplitTable.from_json(json_dict['splits'])
 
         # call the constructor on the data we extracted from the JSON
         return cls(title, sub_title, splits, lifetime_attempts, session_attempts, start_offset)
@@ -85,26 +119,17 @@ class Game(QObject):
         Args:
             json_dict: (dict) the JSON representation of the game
         """
+        self._dirty = True
+
         self.title = json_dict['title']
         self.sub_title = json_dict['sub_title']
         self.lifetime_attempts = json_dict['lifetime_attempts']
         self.session_attempts = json_dict.get('session_attempts', 0)
         self.start_offset = json_dict.get('start_delay', 0.0)
 
-        prev_pb_segment_total_ms = 0
-        prev_gold_segment_total_ms = 0
-
-        # build the splits from the JSON in the game dictionary
-        splits = []
-        for split in json_dict['splits']:
-            new_split = Split.from_json(split, prev_pb_segment_total_ms, prev_gold_segment_total_ms)
-
-            prev_pb_segment_total_ms = new_split.pb_segment_total_ms
-            prev_gold_segment_total_ms = new_split.gold_segment_total_ms
-
-            splits.append(new_split)
-
-        self.splits = splits
+        # build the splits from the JSON in the game dictionary, the table works out the segment totals
+        self.splits = SplitTable.from_json(json_dict['splits'])
+        self._split_snapshot = self._snapshot_splits()
 
     def update_from_str(self, json_str: str) -> Game:
         """
@@ -162,10 +187,7 @@ class Game(QObject):
         return json.dumps(self.to_dict(), indent=4)
 
     def to_json_file(self, file_path: str):
-        data = self.to_json()
-
-        with open(file_path, 'w') as f:
-            f.write(data)
+        atomic_write(file_path, self.to_json())  # a crash part way through saving can't leave a broken game file behind
 
     def __str__(self):
         """
@@ -176,78 +198,117 @@ class Game(QObject):
         return self.to_json()
 
     def add_attempt(self):
-        self.session_attempts += 1
-        self.GameUpdated.emit(self)
-
-
-class Split:
-    """A class that represents a single split in a speedrun"""
-    def __init__(self, split_name: str, pb_time_ms: int, pb_segment_ms: int, gold_segment_ms: int, pb_segment_total_ms: int = 0, gold_segment_total_ms: int = 0):
-        self.split_name = split_name
-        self.pb_time_ms = pb_time_ms
-        self.pb_segment_ms = pb_segment_ms
-        self.gold_segment_ms = gold_segment_ms
-        self.pb_segment_total_ms = pb_segment_total_ms
-        self.gold_segment_total_ms = gold_segment_total_ms
+        self.set_attempts(self.session_attempts + 1, self.lifetime_attempts)
 
-    @classmethod
-    def from_json(cls, json_dict: dict, prev_pb_segment_total_ms: int = 0, prev_gold_segment_total_ms: int = 0):
+    def set_attempts(self, session_attempts: int, lifetime_attempts: int):
         """
-        Makes a single split from the dictionary (aka JSON)
-        Args:
-            json_dict: (dict) the JSON dictionary representing the split
-            prev_pb_segment_total_ms: (int) the total of the previously seen segments pb segment times in ms
-            prev_gold_segment_total_ms: (int) the total of the previously seen segments gold segment times in ms
+        Updates the attempt counters, and lets anyone listening know if they changed
 
-        Returns:
-            (Split) the split detailed in the JSON object
+        Args:
+            session_attempts: (int) the number of attempts since the app was opened
+            lifetime_attempts: (int) the number of attempts ever
         """
-        # track the local segment totals
-        prev_pb_segment_total_ms += json_dict['pb_segment_ms']
-        prev_gold_segment_total_ms += json_dict['gold_segment_ms']
+        if session_attempts == self.session_attempts and lifetime_attempts == self.lifetime_attempts:
+            return
 
-        return cls(json_dict['split_name'], json_dict['pb_time_ms'], json_dict['pb_segment_ms'], json_dict['gold_segment_ms'], prev_pb_segment_total_ms, prev_gold_segment_total_ms)
+        self.session_attempts = session_attempts
+        self.lifetime_attempts = lifetime_attempts
+        self._dirty = True
 
-    @classmethod
-    def from_json_str(cls, json_str: str, prev_pb_segment_total_ms: int = 0, prev_gold_segment_total_ms: int = 0):
-        """
-        Makes a split object from a json string representation
-        Args:
-            json_str: (str) the string representing the split as JSON as a string
-            prev_pb_segment_total_ms: (int) the total of the previously seen segments pb segment times in ms
-            prev_gold_segment_total_ms: (int) the total of the previously seen segments gold segment times in ms
+        self.AttemptsUpdated.emit(session_attempts, lifetime_attempts)
 
-        Returns:
-            (Split) the Split object that the JSON string represents
+    def set_metadata(self, title: str = None, sub_title: str = None, start_offset: float = None, display_pb: bool = None):
         """
-        json_dict = json.loads(json_str)
-        return cls.from_json(json_dict, prev_pb_segment_total_ms, prev_gold_segment_total_ms)
+        Updates any of the given information about the game, and lets anyone listening know if any of it changed
 
-    def __str__(self):
-        """
-        Turns the split object into a JSON string
-        Returns:
-            (str) the JSON object as a string
+        Args:
+            title: (str, optional) the title of the game
+            sub_title: (str, optional) the sub-title, usually the category
+            start_offset: (float, optional) the number of seconds the timer starts at, usually negative
+            display_pb: (bool, optional) whether to show the pb
         """
-        return self.to_json()
+        old = (self.title, self.sub_title, self.start_offset, self.display_pb)
 
-    def to_dict(self):
-        """
-        Makes a dictionary out of the Split
-        Returns:
-            (dict): the dictionary that has all the data for this object
-        """
-        return {
-            'split_name': self.split_name,
-            'pb_time_ms': self.pb_time_ms,
-            'pb_segment_ms': self.pb_segment_ms,
-            'gold_segment_ms': self.gold_segment_ms
-        }
+        if title is not None:
+            self.title = title
 
-    def to_json(self):
+        if sub_title is not None:
+            self.sub_title = sub_title
+
+        if start_offset is not None:
+            self.start_offset = start_offset
+
+        if display_pb is not None:
+            self.display_pb = display_pb
+
+        if old != (self.title, self.sub_title, self.start_offset, self.display_pb):
+            self._dirty = True
+            self.MetadataUpdated.emit(self)
+
+    def set_splits(self, splits: list[Split] = None):
         """
-        Turns the split object into a JSON string
-        Returns:
-            (str) the JSON object as a string
+        Updates the splits, and lets anyone listening know exactly which splits were added, removed, renamed or retimed
+
+        Call it with no splits after changing the split objects in place (like after a run saves its golds) to send out
+        whatever changed.
+
+        Args:
+            splits: (list[Split], optional) the new splits, the splits we already have if not given
         """
-        return json.dumps(self.to_dict(), indent=4)
+        if splits is None:
+            splits = self.splits
+
+        old = self._split_snapshot
+        old_splits = [snap[0] for snap in old]
+
+        if len(splits) == len(old_splits) and all(a is b for a, b in zip(splits, old_splits)):
+            # same splits in the same order, so nothing was added or removed, and we keep our list so a run in progress carries on
+            pairs = list(zip(range(len(splits)), old))
+            splits = self.splits
+
+        else:
+            # keep whatever matches at the start and end, and treat everything in between as replaced
+            prefix = 0
+            while prefix < min(len(splits), len(old_splits)) and splits[prefix] is old_splits[prefix]:
+                prefix += 1
+
+            suffix = 0
+            while suffix < min(len(splits), len(old_splits)) - prefix and splits[-1 - suffix] is old_splits[-1 - suffix]:
+                suffix += 1
+
+            self.splits = splits  # a new table for the new layout, which works out the totals again
+
+            removed = len(old_splits) - prefix - suffix
+            added = len(splits) - prefix - suffix
+
+            if removed:
+                self.SplitsRemoved.emit(prefix, removed)
+
+            if added:
+                self.SplitsAdded.emit(prefix, added)
+
+            pairs = [(i, old[i]) for i in range(prefix)]
+            pairs += [(len(splits) - suffix + i, old[len(old) - suffix + i]) for i in range(suffix)]
+
+        edited = []
+        retimed = []
+
+        for i, (_, old_name, old_times) in pairs:
+            split = splits[i]
+
+            if split.split_name != old_name:
+                edited.append(i)
+
+            if split.time_values() != old_times:
+                retimed.append(i)
+
+        self._split_snapshot = self._snapshot_splits()
+
+        if edited:
+            self.SplitsEdited.emit(edited)
+
+        if retimed:
+            self.TimesUpdated.emit(retimed)
+
+    def _snapshot_splits(self) -> list[tuple[Split, str, tuple[int, int, int]]]:
+        return [(split, split.split_name, split.time_values()) for split in self.splits]
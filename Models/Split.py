@@ -0,0 +1,144 @@
+import json
+
+
+class _SplitValue:
+    """
+    One of the split's saved values, read from the SplitTable the split is in, or from the split itself if it isn't in one
+    """
+    def __init__(self, column: str):
+        self.column = column
+        self.slot = '_' + column
+
+    def __get__(self, split, owner=None):
+        if split is None:
+            return self
+
+        if split._table is None:
+            return getattr(split, self.slot)
+
+        return split._table.get(self.column, split._row)
+
+    def __set__(self, split, value):
+        if split._table is None:
+            setattr(split, self.slot, value)
+        else:
+            split._table.set(self.column, split._row, value)
+
+
+class _SplitTotal(_SplitValue):
+    """
+    A running total up to the split, the SplitTable works these out itself so they can only be set on splits outside a table
+    """
+    def __init__(self, column: str, total_of: str):
+        super().__init__(column)
+        self.total_of = total_of
+
+    def __get__(self, split, owner=None):
+        if split is None:
+            return self
+
+        if split._table is None:
+            return getattr(split, self.slot)
+
+        return split._table.total(self.total_of, split._row)
+
+    def __set__(self, split, value):
+        if split._table is None:
+            setattr(split, self.slot, value)
+
+
+class Split:
+    """
+    A class that represents a single split in a speedrun
+
+    A split on its own holds its own values, once it is put in a Models.SplitTable.SplitTable it becomes a view of its row
+    in the table, so the table can keep the segment totals up to date as the times change.
+    """
+    __slots__ = ('_table', '_row', '_split_name', '_pb_time_ms', '_pb_segment_ms', '_gold_segment_ms', '_pb_segment_total_ms', '_gold_segment_total_ms')
+
+    split_name = _SplitValue('split_name')
+    pb_time_ms = _SplitValue('pb_time_ms')
+    pb_segment_ms = _SplitValue('pb_segment_ms')
+    gold_segment_ms = _SplitValue('gold_segment_ms')
+    pb_segment_total_ms = _SplitTotal('pb_segment_total_ms', 'pb_segment_ms')
+    gold_segment_total_ms = _SplitTotal('gold_segment_total_ms', 'gold_segment_ms')
+
+    def __init__(self, split_name: str, pb_time_ms: int, pb_segment_ms: int, gold_segment_ms: int, pb_segment_total_ms: int = 0, gold_segment_total_ms: int = 0):
+        self._table = None  # the SplitTable this split is a row of, if any
+        self._row = 0
+
+        self.split_name = split_name
+        self.pb_time_ms = pb_time_ms
+        self.pb_segment_ms = pb_segment_ms
+        self.gold_segment_ms = gold_segment_ms
+        self.pb_segment_total_ms = pb_segment_total_ms
+        self.gold_segment_total_ms = gold_segment_total_ms
+
+    @classmethod
+    def from_json(cls, json_dict: dict, prev_pb_segment_total_ms: int = 0, prev_gold_segment_total_ms: int = 0):
+        """
+        Makes a single split from the dictionary (aka JSON)
+        Args:
+            json_dict: (dict) the JSON dictionary representing the split
+            prev_pb_segment_total_ms: (int) the total of the previously seen segments pb segment times in ms
+            prev_gold_segment_total_ms: (int) the total of the previously seen segments gold segment times in ms
+
+        Returns:
+            (Split) the split detailed in the JSON object
+        """
+        # track the local segment totals
+        prev_pb_segment_total_ms += json_dict['pb_segment_ms']
+        prev_gold_segment_total_ms += json_dict['gold_segment_ms']
+
+        return cls(json_dict['split_name'], json_dict['pb_time_ms'], json_dict['pb_segment_ms'], json_dict['gold_segment_ms'], prev_pb_segment_total_ms, prev_gold_segment_total_ms)
+
+    @classmethod
+    def from_json_str(cls, json_str: str, prev_pb_segment_total_ms: int = 0, prev_gold_segment_total_ms: int = 0):
+        """
+        Makes a split object from a json string representation
+        Args:
+            json_str: (str) the string representing the split as JSON as a string
+            prev_pb_segment_total_ms: (int) the total of the previously seen segments pb segment times in ms
+            prev_gold_segment_total_ms: (int) the total of the previously seen segments gold segment times in ms
+
+        Returns:
+            (Split) the Split object that the JSON string represents
+        """
+        json_dict = json.loads(json_str)
+        return cls.from_json(json_dict, prev_pb_segment_total_ms, prev_gold_segment_total_ms)
+
+    def __str__(self):
+        """
+        Turns the split object into a JSON string
+        Returns:
+            (str) the JSON object as a string
+        """
+        return self.to_json()
+
+    def to_dict(self):
+        """
+        Makes a dictionary out of the Split
+        Returns:
+            (dict): the dictionary that has all the data for this object
+        """
+        return {
+            'split_name': self.split_name,
+            'pb_time_ms': self.pb_time_ms,
+            'pb_segment_ms': self.pb_segment_ms,
+            'gold_segment_ms': self.gold_segment_ms
+        }
+
+    def to_json(self):
+        """
+        Turns the split object into a JSON string
+        Returns:
+            (str) the JSON object as a string
+        """
+        return json.dumps(self.to_dict(), indent=4)
+
+    def time_values(self) -> tuple[int, int, int]:
+        """
+        Returns:
+            (tuple[int, int, int]) the saved times of the split, pb time, pb segment and gold segment, so changes can be spotted
+        """
+        return self.pb_time_ms, self.pb_segment_ms, self.gold_segment_ms
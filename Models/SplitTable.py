@@ -0,0 +1,153 @@
+"""
+Column storage for a game's splits, so the segment totals can be kept up to date without walking every split
+"""
+from __future__ import annotations
+
+from array import array
+from collections.abc import Sequence
+from typing import Iterable
+
+from helpers.FenwickTree import FenwickTree
+from Models.Split import Split
+
+TIME_COLUMNS = ('pb_time_ms', 'pb_segment_ms', 'gold_segment_ms')
+TOTALLED_COLUMNS = ('pb_segment_ms', 'gold_segment_ms')  # the columns with running totals, sum of best is the gold one
+
+
+class SplitTable(Sequence):
+    """
+    Holds the names and times of every split in compact columns, with a Fenwick tree over the segment columns
+
+    Indexing the table gives back Split objects that read and write their row, the same object every time, so code
+    written against a list of splits keeps working. Changing a segment time updates the totals for every split after it
+    in O(log n) instead of recomputing all of them.
+    """
+    def __init__(self, splits: Iterable[Split] = ()):
+        """
+        Args:
+            splits: (Iterable[Split]) the splits in run order, they become views of their rows in this table
+        """
+        splits = list(splits)
+
+        self.names = [split.split_name for split in splits]
+        self.columns = {column: array('q', [getattr(split, column) for split in splits]) for column in TIME_COLUMNS}
+        self.totals = {column: FenwickTree(self.columns[column]) for column in TOTALLED_COLUMNS}
+
+        # only take the splits over once every value has been read, some of them could still be reading from an old table
+        for row, split in enumerate(splits):
+            split._table = self
+            split._row = row
+
+        self._splits = splits
+        self.dirty_rows = set()  # the rows that changed since the table was last saved
+
+    @classmethod
+    def from_json(cls, json_list: list[dict]) -> SplitTable:
+        """
+        Makes a table from a list of split dictionaries (aka JSON)
+
+        Args:
+            json_list: (list[dict]) the JSON dictionaries for each split in order
+
+        Returns:
+            (SplitTable) the table holding the splits
+        """
+        return cls(Split(split['split_name'], split['pb_time_ms'], split['pb_segment_ms'], split['gold_segment_ms']) for split in json_list)
+
+    def __len__(self) -> int:
+        return len(self._splits)
+
+    def __getitem__(self, index):
+        return self._splits[index]
+
+    def __iter__(self):
+        return iter(self._splits)
+
+    def __repr__(self) -> str:
+        return f'SplitTable({self._splits!r})'
+
+    def get(self, column: str, row: int):
+        """
+        Reads a value from the table
+
+        Args:
+            column: (str) the name of the value, like pb_time_ms or split_name
+            row: (int) the index of the split
+
+        Returns:
+            the value
+        """
+        if column == 'split_name':
+            return self.names[row]
+
+        return self.columns[column][row]
+
+    def set(self, column: str, row: int, value):
+        """
+        Writes a value into the table, keeping the totals up to date
+
+        Args:
+            column: (str) the name of the value, like pb_time_ms or split_name
+            row: (int) the index of the split
+            value: the new value
+        """
+        if column == 'split_name':
+            if value != self.names[row]:
+                self.names[row] = value
+                self.dirty_rows.add(row)
+
+            return
+
+        values = self.columns[column]
+        delta = value - values[row]
+
+        if not delta:
+            return
+
+        values[row] = value
+        self.dirty_rows.add(row)
+
+        if column in self.totals:
+            self.totals[column].add(row, delta)
+
+    def total(self, column: str, row: int) -> int:
+        """
+        Sums a segment column from the first split up to and including the given one
+
+        Args:
+            column: (str) pb_segment_ms or gold_segment_ms
+            row: (int) the index of the last split to include
+
+        Returns:
+            (int) the total in milliseconds
+        """
+        return self.totals[column].prefix_sum(row)
+
+    def sum_of_best(self) -> int:
+        """
+        Returns:
+            (int) the total of every gold segment
+        """
+        return self.totals['gold_segment_ms'].total()
+
+
+def update_segment_totals(splits: Sequence[Split]):
+    """
+    Recalculates the running pb and gold segment totals on the splits after their times change, a SplitTable already
+    keeps its totals up to date so there is nothing to do for one
+
+    Args:
+        splits: (Sequence[Split]) the splits in run order
+    """
+    if isinstance(splits, SplitTable):
+        return
+
+    pb_segment_total = 0
+    gold_segment_total = 0
+
+    for split in splits:
+        pb_segment_total += split.pb_segment_ms
+        gold_segment_total += split.gold_segment_ms
+
+        split.pb_segment_total_ms = pb_segment_total
+        split.gold_segment_total_ms = gold_segment_total
@@ -56,6 +56,10 @@ class AssignButtonsTab(ABCSettingTab):
         self.assignSkipSplit = KeyReassignmentLine(listener=self.listener, event_object=keys[values.index('SKIP')], timer_event='SKIP', label='Skip Split:')
         self.assignLock = KeyReassignmentLine(listener=self.listener, event_object=keys[values.index('LOCK')], timer_event='LOCK', label='Lock:')
 
+        # settings from before the comparison hotkey won't have it mapped yet
+        comparison_key = keys[values.index('COMPARISON')] if 'COMPARISON' in values else None
+        self.assignComparison = KeyReassignmentLine(listener=self.listener, event_object=comparison_key, timer_event='COMPARISON', label='Next Comparison:')
+
         # also save a copy of the widgets so we can reference them by their event
         self.widgets = {
             'PAUSE': self.assignPause,
@@ -65,7 +69,8 @@ class AssignButtonsTab(ABCSettingTab):
             'SKIP': self.assignSkipSplit,
             'UNSPLIT': self.assignUnsplit,
             'STOP': self.assignStop,
-            'LOCK': self.assignLock
+            'LOCK': self.assignLock,
+            'COMPARISON': self.assignComparison
         }
 
         self.scroll_widget_layout.addWidget(self.assignStartSplit)
@@ -76,6 +81,7 @@ class AssignButtonsTab(ABCSettingTab):
         self.scroll_widget_layout.addWidget(self.assignReset)
         self.scroll_widget_layout.addWidget(self.assignSkipSplit)
         self.scroll_widget_layout.addWidget(self.assignLock)
+        self.scroll_widget_layout.addWidget(self.assignComparison)
 
         # add a stretch to keep stuff sized right
         self.scroll_widget_layout.addStretch()
@@ -99,6 +105,7 @@ class AssignButtonsTab(ABCSettingTab):
         self.assignUnsplit.key_assign.connect(self.assign_mapping)
         self.assignStop.key_assign.connect(self.assign_mapping)
         self.assignLock.key_assign.connect(self.assign_mapping)
+        self.assignComparison.key_assign.connect(self.assign_mapping)
 
     @Slot(object, str)
     def assign_mapping(self, key, timer_event):
@@ -116,13 +123,12 @@ class AssignButtonsTab(ABCSettingTab):
 
         else:
             # find what this should be and set it back
-            idx = values.index(timer_event)
-
-            old_key = keys[idx]
-
             widget = self.widgets[timer_event]  # find the widget that gave this event
 
-            widget.assign_key(old_key)
+            if timer_event in values:
+                widget.assign_key(keys[values.index(timer_event)])
+            else:
+                widget.trigger_button.setText(widget.key_str)  # it wasn't mapped to anything before either
 
             dlg = QMessageBox(self)
             dlg.setWindowTitle("Reassignment Failed!")
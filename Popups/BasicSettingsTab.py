@@ -7,7 +7,10 @@ from PySide6.QtWidgets import QVBoxLayout, QScrollArea, QWidget, QFrame, QLabel,
 from PySide6.QtCore import Qt
 from Popups.SettingsWindow import SettingsWindow
 from Styling.Settings import Settings
+from Core.PBChance import DEFAULT_TRIALS, DEFAULT_BUDGET_MS
+from Timer.TickScheduler import DEFAULT_MAX_REFRESH_RATE
 from Widgets.FormWidgets import ColorPicker, FontPicker, FileDialogOpener, LabeledSpinBox, LabeledDoubleSpinBox
+from Widgets.TimeStatsWidget import STATS
 
 
 # checkout QGroupBox for title and then box of settings items
@@ -283,6 +286,22 @@ class _TimerSettings(ABCSettingGroupBox):
         self.pinLastSplit.setFixedHeight(40)  # just to make it look like our QFrames since we didn't need to make a custom for this one
         self.layout.addWidget(self.pinLastSplit)
 
+        self.max_refresh_rate = LabeledSpinBox('Max Refresh Rate: ', 0, self)
+        self.max_refresh_rate.input.setRange(1, 1000)
+        self.max_refresh_rate.input.setSuffix(' Hz')
+        self.max_refresh_rate.setValue(self.settings.settings.get('max_refresh_rate', DEFAULT_MAX_REFRESH_RATE))  # set after the range so it isn't clamped to the default max
+        self.layout.addWidget(self.max_refresh_rate)
+
+        self.precision_timing = QCheckBox('Precision Timing (update every ms)')
+        self.precision_timing.setFixedHeight(40)
+        self.precision_timing.setChecked(self.settings.settings.get('precision_timing', False))
+        self.layout.addWidget(self.precision_timing)
+
+        self.autosave = QCheckBox('Autosave (skips the save prompt on close)')
+        self.autosave.setFixedHeight(40)
+        self.autosave.setChecked(self.settings.settings.get('autosave', True))
+        self.layout.addWidget(self.autosave)
+
         # TODO : need to figure out layouts and stuff along that line
         # self.application_height = LabeledSpinBox('App Height: ', self.settings.settings['visible_splits'], self)
         # self.application_height.input.setMinimum(1)
@@ -300,6 +319,9 @@ class _TimerSettings(ABCSettingGroupBox):
             self.settings_window.set_tab_visibility('Advanced', self.enableAdvancedStyles.isChecked())
 
         self.settings.settings['visible_splits'] = self.splits_on_screen.input.value()
+        self.settings.settings['max_refresh_rate'] = self.max_refresh_rate.value()
+        self.settings.settings['precision_timing'] = self.precision_timing.isChecked()
+        self.settings.settings['autosave'] = self.autosave.isChecked()
 
         # self.settings.game.update_from_file(self.splits_file_chooser.file_path)
         # self.settings.game.GameUpdated.emit(self.settings.game)
@@ -315,12 +337,36 @@ class _StatsSettings(ABCSettingGroupBox):
         self.layout = QVBoxLayout(self)
         self.settings = settings
 
-        self.todo = QLabel('Gotta make the footer first eh?')
+        # a check box to show or hide each stat in the footer
+        self.stat_boxes = {}
+
+        for key, name in STATS.items():
+            box = QCheckBox(f'Show {name}')
+            box.setFixedHeight(40)  # just to make it look like our QFrames since we didn't need to make a custom for this one
 
-        self.layout.addWidget(self.todo)
+            self.stat_boxes[key] = box
+            self.layout.addWidget(box)
+
+        # more trials is a steadier pb chance, the budget caps how long it can take on slow machines or long games
+        self.pb_chance_trials = LabeledSpinBox('PB Chance Trials: ', 0, self)
+        self.pb_chance_trials.input.setRange(100, 1_000_000)
+        self.pb_chance_trials.input.setSingleStep(1000)
+        self.pb_chance_trials.setValue(self.settings.settings.get('pb_chance_trials', DEFAULT_TRIALS))
+        self.layout.addWidget(self.pb_chance_trials)
+
+        self.pb_chance_budget = LabeledSpinBox('PB Chance Budget: ', 0, self)
+        self.pb_chance_budget.input.setRange(1, 5000)
+        self.pb_chance_budget.input.setSuffix(' ms')
+        self.pb_chance_budget.setValue(self.settings.settings.get('pb_chance_budget_ms', DEFAULT_BUDGET_MS))
+        self.layout.addWidget(self.pb_chance_budget)
 
     def apply(self):
-        pass
+        self.settings.settings['stats'] = {key: box.isChecked() for key, box in self.stat_boxes.items()}
+        self.settings.settings['pb_chance_trials'] = self.pb_chance_trials.value()
+        self.settings.settings['pb_chance_budget_ms'] = self.pb_chance_budget.value()
 
     def opened(self):
-        pass
+        shown = self.settings.settings.get('stats', {})
+
+        for key, box in self.stat_boxes.items():
+            box.setChecked(shown.get(key, True))
@@ -3,7 +3,7 @@ from __future__ import annotations
 from PySide6.QtGui import QIcon
 from PySide6.QtWidgets import QVBoxLayout, QHBoxLayout, QFrame, QLineEdit, QTimeEdit, QPushButton, QBoxLayout, \
     QScrollArea, QWidget, QGroupBox, QLabel
-from PySide6.QtCore import Qt, QTime
+from PySide6.QtCore import Qt, QTime, QObject, Slot
 from typing import TYPE_CHECKING
 
 from Popups.ABCSettingTab import ABCSettingTab
@@ -29,6 +29,7 @@ class GameSettingsTab(ABCSettingTab):
 
         # keep a copy of the game settings as our local copy that we can work with without effecting the original
         self.game = settings.game
+        self._applying = False  # set while we're sending our own changes to the game, so we don't patch ourselves with them
 
         self.add_button = QPushButton()
         self.add_button.setIcon(QIcon(':/icons/Static/add.svg'))
@@ -97,6 +98,12 @@ class GameSettingsTab(ABCSettingTab):
         # make our connections now that everything is displayed
         self.add_button.clicked.connect(self.addEmptySplit)
         self.game.GameUpdated.connect(self.update_self)
+        self.game.AttemptsUpdated.connect(self.update_attempts)
+        self.game.MetadataUpdated.connect(self.update_metadata)
+        self.game.SplitsAdded.connect(self.insert_splits)
+        self.game.SplitsRemoved.connect(self.remove_splits)
+        self.game.SplitsEdited.connect(self.update_splits)
+        self.game.TimesUpdated.connect(self.update_splits)
 
     def update_self(self, game: Game):
         """
@@ -116,6 +123,82 @@ class GameSettingsTab(ABCSettingTab):
         self.clear_splits()
         self.import_splits(self.game)
 
+    @Slot(int, int)
+    def update_attempts(self, session_attempts: int, lifetime_attempts: int):
+        """
+        Shows the new attempt counts
+
+        Args:
+            session_attempts: (int) the number of attempts since the app was opened
+            lifetime_attempts: (int) the number of attempts ever
+        """
+        self.session_attempts_input.input.setValue(session_attempts)
+        self.lifetime_attempts_input.input.setValue(lifetime_attempts)
+
+    @Slot(QObject)
+    def update_metadata(self, game: Game):
+        """
+        Shows the new title, sub-title and start delay
+
+        Args:
+            game: (Models.Game) The game object that got updated
+        """
+        if self._applying:
+            return
+
+        self.title_input.input.setText(game.title)
+        self.sub_title_input.input.setText(game.sub_title)
+        self.timer_start_delay_input.input.setValue(game.start_offset)
+
+    @Slot(int, int)
+    def insert_splits(self, first: int, count: int):
+        """
+        Adds lines for the splits that were added to the game
+
+        Args:
+            first: (int) the index of the first new split
+            count: (int) the number of splits that were added
+        """
+        if self._applying:
+            return
+
+        for i in range(first, first + count):
+            self.split_area.insertWidget(i, SplitLine(self.game.splits[i], parent=self))
+
+    @Slot(int, int)
+    def remove_splits(self, first: int, count: int):
+        """
+        Removes the lines for the splits that were removed from the game
+
+        Args:
+            first: (int) the index of the first removed split
+            count: (int) the number of splits that were removed
+        """
+        if self._applying:
+            return
+
+        for i in reversed(range(first, min(first + count, self.split_area.count()))):
+            self.remove_split(self.split_area.itemAt(i).widget())
+
+    @Slot(list)
+    def update_splits(self, indexes: list[int]):
+        """
+        Re-reads the given splits, for when they were renamed or retimed somewhere else, like by finishing a run
+
+        Args:
+            indexes: (list[int]) the indexes of the splits that changed
+        """
+        if self._applying:
+            return
+
+        changed = {id(self.game.splits[i]) for i in indexes}
+
+        for i in range(self.split_area.count()):
+            line = self.split_area.itemAt(i).widget()
+
+            if id(line.split) in changed:
+                line.load_split()
+
     def import_splits(self, game: Game):
         """
         Generates a set of splits from the information in the main window
@@ -164,29 +247,32 @@ class GameSettingsTab(ABCSettingTab):
         Args:
             split: (SplitLine) The actual split that we want to remove from the list
         """
-        self.layout.removeWidget(split)  # removes the widget from the layout so the layout can work around it
+        self.split_area.removeWidget(split)  # removes the widget from the layout so the layout can work around it
         split.deleteLater()  # delete later actually deletes the widget
 
     def apply(self):
         """
         Send the updates to the game object
         """
-        self.game.title = self.title_input.input.text()
-        self.game.sub_title = self.sub_title_input.input.text()
-        self.game.session_attempts = self.session_attempts_input.input.value()
-        self.game.lifetime_attempts = self.lifetime_attempts_input.input.value()
-        self.game.start_offset = self.timer_start_delay_input.input.value()
+        self._applying = True
 
-        self.game.splits = []  # make this into an empty list
+        try:
+            self.game.set_metadata(self.title_input.input.text(), self.sub_title_input.input.text(), self.timer_start_delay_input.input.value())
+            self.game.set_attempts(self.session_attempts_input.input.value(), self.lifetime_attempts_input.input.value())
 
-        # update the splits
-        for i in range(self.split_area.count()):
-            curr = self.split_area.itemAt(i).widget()
+            splits = []
+
+            # update the splits
+            for i in range(self.split_area.count()):
+                curr = self.split_area.itemAt(i).widget()
 
-            curr.update_split()
-            self.game.splits.append(curr.split)
+                curr.update_split()
+                splits.append(curr.split)
 
-        self.game.GameUpdated.emit(self.game)
+            self.game.set_splits(splits)  # the game works out what changed and only tells everyone about that
+
+        finally:
+            self._applying = False  # even if something went wrong, so the tab keeps following changes to the game
 
     def open(self):
         pass
@@ -257,6 +343,19 @@ class SplitLine(QFrame):
             'pb_segment_ms': qtime_to_ms(self.best_segment_input.time())
         }
 
+    def load_split(self):
+        """
+        Shows the current values of the split, for when it was changed somewhere else
+        """
+        self.pb_time_ms = self.split.pb_time_ms
+        self.pb_segment_ms = self.split.pb_segment_ms
+        self.gold_segment_ms = self.split.gold_segment_ms
+
+        self.split_name_input.setText(self.split.split_name)
+        self.best_time_input.setTime(ms_to_qtime(self.pb_time_ms))
+        self.best_segment_input.setTime(ms_to_qtime(self.pb_segment_ms))
+        self.gold_segment_input.setTime(ms_to_qtime(self.gold_segment_ms))
+
     def update_split(self):
         self.split.split_name = self.split_name_input.text()
         self.split.pb_time_ms = qtime_to_ms(self.best_time_input.time())
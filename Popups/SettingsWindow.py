@@ -1,9 +1,71 @@
+from collections.abc import Mapping
+from typing import Callable
+
 from PySide6.QtWidgets import QVBoxLayout, QDialog, QDialogButtonBox, QPushButton, QWidget, QTabWidget
 from PySide6.QtCore import Qt
 
 from Popups.ABCSettingTab import ABCSettingTab
 
 
+class _LazyTab(QWidget):
+    """
+    Stands in for a settings tab in the tab widget until it is shown for the first time, then builds the real tab inside itself
+    """
+    def __init__(self, factory: Callable[[], ABCSettingTab], parent: QWidget = None):
+        super().__init__(parent)
+
+        self.factory = factory
+        self.tab = None
+
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+    def build(self) -> ABCSettingTab:
+        """
+        Builds the tab if it hasn't been yet
+
+        Returns:
+            (ABCSettingTab) the tab
+        """
+        if self.tab is None:
+            self.tab = self.factory()
+            self.factory = None
+            self.layout.addWidget(self.tab)
+
+        return self.tab
+
+    def showEvent(self, event):
+        self.build()
+        super().showEvent(event)
+
+
+class _TabDict(Mapping):
+    """
+    The tabs by name, looking one up builds it if it hasn't been shown yet
+    """
+    def __init__(self):
+        self.pages = {}  # name -> the widget in the tab widget, the tab itself or a _LazyTab
+
+    def __getitem__(self, name: str) -> ABCSettingTab:
+        return _tab_of(self.pages[name])
+
+    def __contains__(self, name) -> bool:
+        return name in self.pages  # without building the tab like Mapping's would
+
+    def __iter__(self):
+        return iter(self.pages)
+
+    def __len__(self) -> int:
+        return len(self.pages)
+
+
+def _tab_of(page: QWidget, build: bool = True):
+    if isinstance(page, _LazyTab):
+        return page.build() if build else page.tab
+
+    return page
+
+
 class SettingsWindow(QDialog):
     def __init__(self, parent: QWidget = None):
         super().__init__(parent)
@@ -24,7 +86,7 @@ class SettingsWindow(QDialog):
 
         self.dialogButtons.clicked.connect(self.button_event)
 
-        self.tab_dict = {}
+        self.tab_dict = _TabDict()  # tabs added with a factory are only built the first time they are shown or looked up
         self.tabs.currentChanged.connect(self.tab_opened)
 
         self.layout.addWidget(self.tabs)
@@ -37,13 +99,24 @@ class SettingsWindow(QDialog):
         """
         Applies the settings to the application, since each page will know what to emit
         """
-        # get the currently open widget
-        currWidget = self.tabs.currentWidget()
+        # get the currently open widget, one that was never built has nothing to apply
+        currWidget = _tab_of(self.tabs.currentWidget(), build=False)
 
-        currWidget.apply()  # and have it apply its changes!
+        if currWidget is not None:
+            currWidget.apply()  # and have it apply its changes!
 
     def tab_opened(self, index: int):
         widget = self.tabs.widget(index)
+
+        if widget is None:
+            return
+
+        # a tab that hasn't been built yet doesn't need syncing, and building it now would undo the point of it being lazy
+        widget = _tab_of(widget, build=self.isVisible())
+
+        if widget is None:
+            return
+
         if hasattr(widget, "opened"):
             widget.opened()
 
@@ -76,19 +149,22 @@ class SettingsWindow(QDialog):
         elif role == QDialogButtonBox.ApplyRole:
             self.apply_settings()
 
-    def add_tab(self, tab_widget: ABCSettingTab, name: str):
+    def add_tab(self, tab_widget: ABCSettingTab | Callable[[], ABCSettingTab], name: str):
         """
         Adds the provided tab to the end of the tab list. Must provide an ABCSettingsTab so that it has the required structure.
         Args:
-            tab_widget: (ABCSettingsTab) the settings popup window to add
+            tab_widget: (ABCSettingsTab | Callable[[], ABCSettingsTab]) the settings popup window to add, or a function
+                that makes it, which is only called the first time the tab is shown
             name: (str) the name of the tab
         """
-        self.tab_dict[name] = tab_widget
+        page = tab_widget if isinstance(tab_widget, QWidget) else _LazyTab(tab_widget)
+
+        self.tab_dict.pages[name] = page
 
-        self.tabs.addTab(tab_widget, name)
+        self.tabs.addTab(page, name)
 
     def get_tab(self, name: str):
         return self.tab_dict[name]
 
     def get_tab_index(self, name: str):
-        return self.tabs.indexOf(self.get_tab(name))
+        return self.tabs.indexOf(self.tab_dict.pages[name])
@@ -0,0 +1,185 @@
+"""
+Saves the game, settings and style in the background a little while after they change, so nothing depends on saving at exit
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+from Core.Journal import RunJournal
+from helpers.FileHelpers import atomic_write
+from Styling.Settings import Settings
+
+DEFAULT_AUTOSAVE_DELAY_MS = 2000  # how long things have to stop changing before we save them
+
+
+class AutoSaver(QObject):
+    """
+    Watches the game, settings and style for changes and writes whichever files actually changed
+
+    Saves are debounced, so a burst of changes turns into one save once things settle, and they never happen while the
+    timer is running, call schedule() again once it stops. The files are put together on the GUI thread, so they are
+    always consistent, and written on a background thread. Files whose contents match what is already on disk are skipped.
+    """
+    SaveFailed = Signal(str, str)  # the path that couldn't be saved and why
+
+    def __init__(self, settings: Settings, journal: RunJournal = None, is_busy: Callable[[], bool] = None, delay_ms: int = DEFAULT_AUTOSAVE_DELAY_MS, parent=None):
+        """
+        Args:
+            settings: (Styling.Settings) the settings, along with the game and style they hold
+            journal: (Core.Journal.RunJournal, optional) the run journal to clear once the game is saved
+            is_busy: (Callable[[], bool], optional) says whether saving should wait, like while the timer is running
+            delay_ms: (int, optional) how long things have to stop changing before we save them
+            parent: (QObject, optional) the parent of the saver
+        """
+        super().__init__(parent)
+
+        self.settings = settings
+        self.journal = journal
+        self.is_busy = is_busy if is_busy is not None else (lambda: False)
+        self.enabled = True
+
+        self._written = {}  # path -> what we know is in the file, so unchanged files are skipped
+        self._failed = set()  # paths that couldn't be written, so they are tried again on the next save
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='AutoSaver')  # one worker so the writes stay in order
+        self._pending = None  # the last save handed to the executor, every one before it is done once it is
+        self._closed = False
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.save)
+
+        game = settings.game
+
+        self._changes = (
+            game.GameUpdated, game.AttemptsUpdated, game.MetadataUpdated, game.SplitsAdded, game.SplitsRemoved, game.SplitsEdited, game.TimesUpdated,
+            settings.SettingsUpdate, settings.InputMapUpdate, settings.style.UpdateStyle
+        )
+
+        for signal in self._changes:
+            signal.connect(self.schedule)
+
+    @Slot()
+    def schedule(self, *args):
+        """
+        Saves once nothing has changed for the delay, every call pushes the save back
+        """
+        if self.enabled and not self._closed:
+            self._timer.start()
+
+    @Slot()
+    def save(self):
+        """
+        Writes anything that changed in the background, unless we are busy
+        """
+        if self._closed or self.is_busy():
+            return  # schedule() gets called again once we aren't busy
+
+        self._submit()
+
+    def flush(self):
+        """
+        Writes anything that changed right now and waits for every save to finish, the saver keeps working after
+        """
+        self._timer.stop()
+
+        if not self._closed:
+            self._submit()
+
+        if self._pending is not None:
+            self._pending.result()
+
+    def close(self):
+        """
+        Stops saving for good, waiting on any save already started, for when the app is closing
+
+        Nothing that changed since the last save is written, call flush() first to keep it.
+        """
+        self.enabled = False
+        self._closed = True
+        self._timer.stop()
+
+        for signal in self._changes:
+            signal.disconnect(self.schedule)
+
+        self._executor.shutdown(wait=True)
+
+    def _submit(self):
+        writes, journal_seq = self._collect()
+
+        if writes or journal_seq is not None:
+            self._pending = self._executor.submit(self._write, writes, journal_seq)
+
+    def _collect(self) -> tuple[list[tuple[str, str]], int | None]:
+        """
+        Puts together the contents of every file that changed, and marks them as saved
+
+        Returns:
+            (tuple[list[tuple[str, str]], int | None]) the (path, contents) to write, and the journal seq the game save covers
+        """
+        settings = self.settings
+        game = settings.game
+        style = settings.style
+
+        files = []
+        journal_seq = None
+
+        if game.dirty or settings.game_path in self._failed:
+            files.append((settings.game_path, game.to_json()))
+            game.mark_clean()
+
+            if self.journal is not None and self.journal.seq:
+                journal_seq = self.journal.seq  # everything logged so far is in this save
+
+        settings_path = str(settings.settings_file_path)
+
+        if settings.dirty or settings_path in self._failed:
+            files.append((settings_path, settings.settings_text()))
+            settings.dirty = False
+
+        if style.dirty or style.style_path in self._failed or style.vars_path in self._failed:
+            files.append((style.style_path, style.raw_style_sheet))
+            files.append((style.vars_path, style.vars_text()))
+            style.dirty = False
+
+        writes = [(path, contents) for path, contents in files if contents != self._on_disk(path)]
+
+        for path, contents in writes:
+            self._written[path] = contents
+
+        return writes, journal_seq
+
+    def _on_disk(self, path: str) -> str | None:
+        if path not in self._written:
+            try:
+                with open(path, 'r', encoding='utf-8', newline='') as f:
+                    self._written[path] = f.read()
+            except OSError:
+                return None
+
+        return self._written[path]
+
+    def _write(self, writes: list[tuple[str, str]], journal_seq: int = None):
+        """
+        Writes the files, this runs on the background thread
+        """
+        for path, contents in writes:
+            try:
+                atomic_write(path, contents)
+                self._failed.discard(path)
+
+            except OSError as e:
+                self._written.pop(path, None)
+                self._failed.add(path)
+                journal_seq = None if path == self.settings.game_path else journal_seq  # keep the journal if the game didn't save
+
+                self.SaveFailed.emit(path, str(e))
+
+        if journal_seq is not None:
+            try:
+                self.journal.clear(journal_seq)
+            except OSError as e:
+                self.SaveFailed.emit(self.journal.path, str(e))
@@ -1,8 +1,10 @@
-from PySide6.QtCore import QObject, Signal
+from PySide6.QtCore import QObject, Signal, Slot
 import json
 from Models.Game import Game
 from pathlib import Path
 from Styling.Style.styleBuilder import StyleBuilder
+from helpers.FileHelpers import atomic_write
+from helpers.StartupProfiler import profiler
 
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
@@ -29,8 +31,16 @@ class Settings(QObject):
         self.game_path = str(PROJECT_ROOT / self.settings['game_path'])
 
         # the configurator has a style builder, since it doesn't need to know how to build the styles, just how configure and pass style updates along to the configured
-        self.style = StyleBuilder(self.style_path, self.var_path)
-        self.game = Game.from_json_file(self.game_path)
+        with profiler.phase('style builder'):
+            self.style = StyleBuilder(self.style_path, self.var_path)
+
+        with profiler.phase('game'):
+            self.game = Game.from_json_file(self.game_path)
+
+        # the settings are changed in place by the settings tabs, so we count them as changed whenever they tell everyone
+        self.dirty = False
+        self.SettingsUpdate.connect(self.mark_dirty)
+        self.InputMapUpdate.connect(self.mark_dirty)
 
     def write_settings(self):
         """
@@ -39,8 +49,21 @@ class Settings(QObject):
         self.style.export_style()
         self.style.export_vars()
 
-        with open(self.settings_file_path, 'w') as f:
-            f.write(json.dumps(self.settings, indent=4))
+        atomic_write(self.settings_file_path, self.settings_text())
+
+        self.dirty = False
+        self.style.dirty = False
+
+    def settings_text(self) -> str:
+        """
+        Returns:
+            (str) the settings as they are saved to the settings file
+        """
+        return json.dumps(self.settings, indent=4)
+
+    @Slot()
+    def mark_dirty(self):
+        self.dirty = True
 
     def set_inputs(self, input_map):
         self.settings['inputs'] = input_map
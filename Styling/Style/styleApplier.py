@@ -0,0 +1,247 @@
+"""
+Applies the formatted stylesheet a piece at a time, so a change only re-polishes the widgets it can affect
+"""
+from __future__ import annotations
+
+import re
+
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+from PySide6.QtWidgets import QWidget
+
+_ID = re.compile(r'#([\w-]+)')
+_ATTRIBUTE = re.compile(r'\[[^\]]*\]')  # [name="value"], taken out before looking for object names and combinators
+_COMBINATOR = re.compile(r'\s*>\s*|\s+')
+
+
+class StyleRule:
+    """
+    One rule of a stylesheet, kept as the exact text it was written as
+    """
+    __slots__ = ('selectors', 'text')
+
+    def __init__(self, selectors: list[str], text: str):
+        """
+        Args:
+            selectors: (list[str]) each comma separated selector of the rule, without comments
+            text: (str) the whole rule as it is in the sheet
+        """
+        self.selectors = selectors
+        self.text = text
+
+
+def parse_rules(style_sheet: str) -> list[StyleRule] | None:
+    """
+    Splits a stylesheet into its rules, QSS can't nest rules so each one is a selector and a block
+
+    Args:
+        style_sheet: (str) the formatted stylesheet
+
+    Returns:
+        (list[StyleRule] | None) the rules in order, or None if the sheet couldn't be split up safely
+    """
+    rules = []
+    selector = []  # the selector text outside of comments
+    start = 0  # where the current rule's text starts
+    i = 0
+    length = len(style_sheet)
+
+    while i < length:
+        char = style_sheet[i]
+
+        if style_sheet.startswith('/*', i):
+            end = style_sheet.find('*/', i + 2)
+
+            if end == -1:
+                return None
+
+            i = end + 2
+            continue
+
+        if char in '"\'':
+            end = style_sheet.find(char, i + 1)
+
+            if end == -1:
+                return None
+
+            selector.append(style_sheet[i:end + 1])
+            i = end + 1
+            continue
+
+        if char == '}':
+            return None
+
+        if char != '{':
+            selector.append(char)
+            i += 1
+            continue
+
+        # find the end of the block, skipping over comments and quoted values that could hold a }
+        i += 1
+
+        while i < length and style_sheet[i] != '}':
+            if style_sheet.startswith('/*', i):
+                end = style_sheet.find('*/', i + 2)
+                i = length if end == -1 else end + 2
+
+            elif style_sheet[i] in '"\'':
+                end = style_sheet.find(style_sheet[i], i + 1)
+                i = length if end == -1 else end + 1
+
+            elif style_sheet[i] == '{':
+                return None
+
+            else:
+                i += 1
+
+        if i >= length:
+            return None
+
+        i += 1
+
+        selectors = [s.strip() for s in ''.join(selector).split(',')]
+
+        if not all(selectors):
+            return None
+
+        rules.append(StyleRule(selectors, style_sheet[start:i]))
+
+        selector = []
+        start = i
+
+    if ''.join(selector).strip():
+        return None  # something left over that isn't a rule
+
+    return rules
+
+
+class StyleApplier(QObject):
+    """
+    Applies the stylesheet to a window, giving the rules for parts of the window to those parts as their own sheet
+
+    Qt re-polishes a widget and everything under it whenever its stylesheet is set, so setting the whole sheet on the
+    window re-polishes every split and label even when one color changed. Rules whose selector starts with the object
+    name of a scope (eg: #SingleSplit QLabel for the splits) are set on that scope's widget instead, and each sheet is
+    only set when its own rules changed. Anything we can't be sure gives the same result is set on the window in one go.
+
+    Updates that come in together are applied once, the next time the event loop runs.
+    """
+    StyleApplied = Signal()  # emitted once the widgets have been re-polished with a new sheet
+
+    def __init__(self, root: QWidget, scopes: dict[QWidget, tuple[str, ...]] = None, parent=None):
+        """
+        Args:
+            root: (QWidget) the window the stylesheet is for
+            scopes: (dict[QWidget, tuple[str, ...]], optional) the widgets that get their own rules, and the object
+                names that rules for them start with
+            parent: (QObject, optional) the parent of the applier
+        """
+        super().__init__(parent)
+
+        self.root = root
+        self.scopes = dict(scopes or {})
+        self.style_sheet = None  # the whole sheet that was last applied
+
+        self._scope_names = {name: widget for widget, names in self.scopes.items() for name in names}
+        self._applied = {}  # widget -> the piece of the sheet it was last given
+        self._pending = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self.flush)
+
+    @Slot(str)
+    def apply(self, style_sheet: str):
+        """
+        Applies the sheet the next time the event loop runs, only the last sheet given before then is applied
+
+        Args:
+            style_sheet: (str) the formatted stylesheet
+        """
+        self._pending = style_sheet
+        self._timer.start()
+
+    @Slot()
+    def flush(self):
+        """
+        Applies the waiting sheet right now
+        """
+        self._timer.stop()
+
+        style_sheet = self._pending
+        self._pending = None
+
+        if style_sheet is None or style_sheet == self.style_sheet:
+            return
+
+        self.style_sheet = style_sheet
+
+        sheets = self.split(style_sheet)
+
+        changed = False
+
+        for widget in [self.root, *self.scopes]:
+            sheet = sheets.get(widget, '')
+
+            if self._applied.get(widget, widget.styleSheet()) != sheet:
+                widget.setStyleSheet(sheet)
+                self._applied[widget] = sheet
+                changed = True
+
+        if changed:
+            self.StyleApplied.emit()
+
+    def split(self, style_sheet: str) -> dict[QWidget, str]:
+        """
+        Works out which sheet each widget gets
+
+        Args:
+            style_sheet: (str) the formatted stylesheet
+
+        Returns:
+            (dict[QWidget, str]) the sheet for the root and for each scope that has rules
+        """
+        rules = parse_rules(style_sheet)
+
+        if rules is None or not self.scopes:
+            return {self.root: style_sheet}
+
+        pieces = {}
+
+        for rule in rules:
+            scopes = {self._scope_of(selector) for selector in rule.selectors}
+            scope = scopes.pop() if len(scopes) == 1 else None
+
+            if scope is None and not all(self._safe_for_root(selector) for selector in rule.selectors):
+                # this rule could fight with a scoped rule, and a widget's own sheet always wins, so don't split at all
+                return {self.root: style_sheet}
+
+            pieces.setdefault(scope if scope is not None else self.root, []).append(rule.text)
+
+        return {widget: ''.join(texts) for widget, texts in pieces.items()}
+
+    def _scope_of(self, selector: str) -> QWidget | None:
+        """
+        Returns:
+            (QWidget | None) the scope the selector starts in, None if it belongs on the root
+        """
+        first = _COMBINATOR.split(_ATTRIBUTE.sub('', selector).strip(), maxsplit=1)[0]
+        ids = _ID.findall(first)
+
+        return self._scope_names.get(ids[0]) if len(ids) == 1 else None
+
+    def _safe_for_root(self, selector: str) -> bool:
+        """
+        Whether a rule left on the root can't beat a scoped rule on its own, which every scoped rule does since they start
+        with an object name
+
+        Returns:
+            (bool) True if the selector has no object names, or is just one for a widget outside of every scope
+        """
+        selector = _ATTRIBUTE.sub('', selector).strip()
+        ids = _ID.findall(selector)
+
+        if not ids:
+            return True
+
+        return len(ids) == 1 and _COMBINATOR.search(selector) is None and ids[0] not in self._scope_names
@@ -1,8 +1,10 @@
-import copy
 import os
 from os import linesep
 from PySide6.QtCore import Signal, QObject
 
+from helpers.FileHelpers import atomic_write
+from Styling.Style.styleTemplate import StyleTemplate
+
 
 class StyleBuilder(QObject):
     UpdateStyle = Signal(str)
@@ -20,9 +22,14 @@ class StyleBuilder(QObject):
 
         self.formatted_style_sheet = ""
 
+        self._template = None  # the raw sheet parsed into its slots, made again whenever the raw sheet changes
+        self._formatted_with = None  # the variables the formatted sheet was last made with
+
         self.load_vars()
         self.load_style()
 
+        self.dirty = False  # whether the style or vars changed since they were last saved
+
     def load_vars(self):
         with open(self.vars_path, 'r') as f:
             raw = f.read()
@@ -44,6 +51,8 @@ class StyleBuilder(QObject):
             self.variable_map[k] = v
 
     def set_vars(self, variable_map):
+        self.dirty = True
+
         #self.variable_map = variable_map
         for k, v in variable_map.items():
             self.variable_map[k] = v
@@ -61,6 +70,7 @@ class StyleBuilder(QObject):
         self.raw_vars = new_raw
 
     def set_vars_raw(self, raw_vars):
+        self.dirty = True
         self.raw_vars = raw_vars
 
         lines = [l for l in raw_vars.split(os.linesep) if l is not None and l != '']
@@ -69,9 +79,10 @@ class StyleBuilder(QObject):
             k, v = line.split(':')
             self.variable_map[k] = v
 
-    def export_vars(self):
+    def vars_text(self) -> str:
         """
-        Build the variable map and save it to the file
+        Returns:
+            (str) the variable map as it is saved to the vars file
         """
         tmp = ''
 
@@ -79,8 +90,13 @@ class StyleBuilder(QObject):
             tmp += f'{k}:{v}'
             tmp += linesep
 
-        with open(self.vars_path, 'w') as f:
-            f.write(tmp)
+        return tmp
+
+    def export_vars(self):
+        """
+        Build the variable map and save it to the file
+        """
+        atomic_write(self.vars_path, self.vars_text())
 
     def load_style(self):
         with open(self.style_path, 'r') as f:
@@ -92,22 +108,30 @@ class StyleBuilder(QObject):
 
     def set_style(self, styleSheet):
         self.formatted_style_sheet = styleSheet
+        self._formatted_with = None  # this didn't come from the variables, so format again next time
 
     def set_raw_style(self, styleSheet):
+        if styleSheet != self.raw_style_sheet:
+            self.dirty = True
+
         self.raw_style_sheet = styleSheet
 
     def format_style(self):
-        tmp = copy.deepcopy(self.raw_style_sheet)
+        if self._template is None or self._template.raw_style_sheet != self.raw_style_sheet:
+            self._template = StyleTemplate(self.raw_style_sheet)
+            self._formatted_with = None
 
-        # replace all the vars
-        for k, v in self.variable_map.items():
-            tmp = tmp.replace('$' + k + ';', v + ';')  # fixed bug where it would replace partial matches
+        variables = tuple(self.variable_map.items())
+
+        # nothing changed since the last format, so the sheet we have is still right
+        if variables == self._formatted_with:
+            return
 
-        self.formatted_style_sheet = tmp
+        self.formatted_style_sheet = self._template.format(self.variable_map)
+        self._formatted_with = variables
 
     def export_style(self):
-        with open(self.style_path, 'w') as f:
-            f.write(self.raw_style_sheet)
+        atomic_write(self.style_path, self.raw_style_sheet)
 
     def update_style(self, style_sheet: str = None, var_map: dict[str: str] = None):
         """
@@ -0,0 +1,81 @@
+"""
+Parses a stylesheet once into its literal text and its $variable; slots, so formatting it is a single join
+"""
+from __future__ import annotations
+
+import re
+
+_SLOT = re.compile(r'\$([^$;]*);')  # $name; where the name can't hold another $ or the ;
+
+
+class StyleTemplate:
+    """
+    A raw stylesheet split into literal pieces and the names of the variables between them
+
+    Formatting looks each slot up in the variable map and joins everything together, which gives the same sheet as
+    replacing every $name; with value; one variable at a time. The rare sheets or maps where the order of those
+    replacements could matter, like a value holding a $, are formatted the old way so the output never changes.
+    """
+    def __init__(self, raw_style_sheet: str):
+        """
+        Args:
+            raw_style_sheet: (str) the stylesheet with $name; wherever a variable goes
+        """
+        self.raw_style_sheet = raw_style_sheet
+
+        self.literals = []  # the text around the slots, always one more of these than there are slots
+        self.slots = []  # the variable name for each slot
+
+        last = 0
+
+        for match in _SLOT.finditer(raw_style_sheet):
+            self.literals.append(raw_style_sheet[last:match.start()])
+            self.slots.append(match.group(1))
+            last = match.end()
+
+        self.literals.append(raw_style_sheet[last:])
+
+        # a $ left dangling right before a slot could join up with that slot's value when replacing one at a time
+        self._dangling = any('$' in literal[literal.rfind(';') + 1:] for literal in self.literals[:-1])
+
+    def format(self, variable_map: dict[str, str]) -> str:
+        """
+        Fills in every variable the map has, any it doesn't have are left as they are
+
+        Args:
+            variable_map: (dict[str, str]) the variable names and their values
+
+        Returns:
+            (str) the formatted stylesheet
+        """
+        if self._dangling or any('$' in k or ';' in k or '$' in v for k, v in variable_map.items()):
+            return format_by_replacing(self.raw_style_sheet, variable_map)
+
+        literals = self.literals
+        pieces = [literals[0]]
+
+        for slot, literal in zip(self.slots, literals[1:]):
+            value = variable_map.get(slot)
+            pieces.append(f'${slot};' if value is None else value + ';')
+            pieces.append(literal)
+
+        return ''.join(pieces)
+
+
+def format_by_replacing(raw_style_sheet: str, variable_map: dict[str, str]) -> str:
+    """
+    Formats the stylesheet by replacing each variable in turn, how it was always done
+
+    Args:
+        raw_style_sheet: (str) the stylesheet with $name; wherever a variable goes
+        variable_map: (dict[str, str]) the variable names and their values
+
+    Returns:
+        (str) the formatted stylesheet
+    """
+    tmp = raw_style_sheet
+
+    for k, v in variable_map.items():
+        tmp = tmp.replace('$' + k + ';', v + ';')  # fixed bug where it would replace partial matches
+
+    return tmp
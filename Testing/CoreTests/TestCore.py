@@ -0,0 +1,522 @@
+import os
+import statistics
+import tempfile
+import unittest
+from random import Random
+
+from Core.AttemptHistory import AttemptHistory
+from Core import PBChance
+from Core.Comparisons import ComparisonEngine, COMPARISONS, PERSONAL_BEST, BEST_SEGMENTS, AVERAGE, MEDIAN, BALANCED, LATEST
+from Core.Journal import RunJournal
+from Core.PBChance import PBChanceEstimator
+from Core.Run import Run, STARTED, SPLIT, FINISHED, UNSPLIT, RESET, STOPPED
+from Core.SegmentStats import RunningStats, P2Quantile, SegmentStatsEngine, GoldSums
+from Core.TimeSource import TimeSource, NS_PER_MS
+from Models.Split import Split
+
+
+def make_splits():
+    return [
+        Split('one', 1000, 1000, 900),
+        Split('two', 2500, 1500, 1200),
+        Split('three', 4000, 1500, 1400)
+    ]
+
+
+class TestTimeSource(unittest.TestCase):
+    def test_stopped_time_source_reads_offset(self):
+        time_source = TimeSource(-2000)
+
+        self.assertFalse(time_source.running)
+        self.assertFalse(time_source.ticking)
+        self.assertEqual(time_source.now(), -2000)
+        self.assertEqual(time_source.sample(), -2000)
+        self.assertEqual(time_source.frame_time, -2000)
+
+    def test_time_at(self):
+        time_source = TimeSource(-500)
+        time_source.start(1000 * NS_PER_MS)
+
+        self.assertTrue(time_source.ticking)
+        self.assertEqual(time_source.time_at(1000 * NS_PER_MS), -500)
+        self.assertEqual(time_source.time_at(2500 * NS_PER_MS), 1000)
+
+    def test_pause_resume(self):
+        time_source = TimeSource()
+        time_source.start(0)
+        time_source.pause(1500 * NS_PER_MS)
+
+        self.assertTrue(time_source.paused)
+        self.assertFalse(time_source.ticking)
+        self.assertEqual(time_source.prev_time, 1500)
+        self.assertEqual(time_source.time_at(9000 * NS_PER_MS), 1500)  # time doesn't move while paused
+
+        time_source.resume(10000 * NS_PER_MS)
+
+        self.assertEqual(time_source.time_at(10250 * NS_PER_MS), 1750)
+
+    def test_stop_holds_time(self):
+        time_source = TimeSource(100)
+        time_source.start(0)
+
+        self.assertEqual(time_source.stop(2000 * NS_PER_MS), 2100)
+        self.assertFalse(time_source.running)
+        self.assertEqual(time_source.now(), 2100)
+
+        time_source.resume(3000 * NS_PER_MS)  # can't resume a stopped clock
+        self.assertFalse(time_source.running)
+
+        time_source.reset()
+        self.assertEqual(time_source.now(), 100)
+
+    def test_set_offset(self):
+        time_source = TimeSource()
+        time_source.start(0)
+        time_source.set_offset(-1000)
+
+        self.assertEqual(time_source.time_at(1000 * NS_PER_MS), 0)
+
+
+class TestRun(unittest.TestCase):
+    def test_start_counts_attempt(self):
+        run = Run(make_splits(), session_attempts=1, lifetime_attempts=10)
+
+        self.assertEqual(run.handle('STARTSPLIT', 0), STARTED)
+        self.assertTrue(run.started)
+        self.assertEqual(run.index, 0)
+        self.assertEqual(run.session_attempts, 2)
+        self.assertEqual(run.lifetime_attempts, 11)
+
+    def test_split_times(self):
+        run = Run(make_splits())
+        run.handle('STARTSPLIT', 0)
+
+        self.assertEqual(run.handle('STARTSPLIT', 1100), SPLIT)
+        self.assertEqual(run.index, 1)
+        self.assertEqual(run.start_times[1], 1100)
+
+        run.update(2000)
+        self.assertEqual(run.split_times[1], 2000)
+        self.assertEqual(run.segment_times[1], 900)
+
+    def test_ignores_splits_before_offset(self):
+        run = Run(make_splits())
+        run.handle('STARTSPLIT', -2000)
+
+        self.assertIsNone(run.handle('STARTSPLIT', -1000))
+        self.assertEqual(run.index, 0)
+
+    def test_finish_saves_pb_and_golds(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        for time in (0, 800, 2300, 3900):
+            result = run.handle('STARTSPLIT', time)
+
+        self.assertEqual(result, FINISHED)
+        self.assertTrue(run.done)
+        self.assertFalse(run.started)
+
+        self.assertEqual([sp.pb_time_ms for sp in splits], [800, 2300, 3900])
+        self.assertEqual([sp.pb_segment_ms for sp in splits], [800, 1500, 1600])
+        self.assertEqual([sp.gold_segment_ms for sp in splits], [800, 1200, 1400])
+        self.assertEqual(splits[-1].gold_segment_total_ms, 3400)
+
+    def test_slower_finish_keeps_pb(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        for time in (0, 950, 2100, 5000):
+            run.handle('STARTSPLIT', time)
+
+        self.assertEqual([sp.pb_time_ms for sp in splits], [1000, 2500, 4000])
+        self.assertEqual(splits[1].gold_segment_ms, 1150)  # still saves the gold
+
+    def test_first_finish_is_pb(self):
+        splits = [Split('one', 0, 0, 0), Split('two', 0, 0, 0)]
+        run = Run(splits)
+
+        for time in (0, 5000, 9000):
+            run.handle('STARTSPLIT', time)
+
+        self.assertEqual([sp.pb_time_ms for sp in splits], [5000, 9000])
+        self.assertEqual([sp.gold_segment_ms for sp in splits], [5000, 4000])
+
+    def test_unsplit(self):
+        run = Run(make_splits())
+        run.handle('STARTSPLIT', 0)
+
+        self.assertIsNone(run.handle('UNSPLIT'))  # nothing to go back to yet
+
+        run.handle('STARTSPLIT', 1000)
+        self.assertEqual(run.handle('UNSPLIT'), UNSPLIT)
+        self.assertEqual(run.index, 0)
+        self.assertEqual(run.split_times[1], 0)
+
+    def test_stop_only_saves_finished_golds(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        run.handle('STARTSPLIT', 0)
+        run.handle('STARTSPLIT', 500)
+        run.update(600)  # a really fast partial segment shouldn't count
+
+        self.assertEqual(run.handle('STOP'), STOPPED)
+        self.assertFalse(run.started)
+        self.assertEqual(splits[0].gold_segment_ms, 500)
+        self.assertEqual(splits[1].gold_segment_ms, 1200)
+        self.assertEqual(splits[0].pb_time_ms, 1000)
+
+    def test_reset_saves_nothing(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        run.handle('STARTSPLIT', 0)
+        run.handle('STARTSPLIT', 500)
+
+        self.assertEqual(run.handle('RESET'), RESET)
+        self.assertEqual(run.index, 0)
+        self.assertEqual(run.split_times, [0, 0, 0])
+        self.assertEqual(splits[0].gold_segment_ms, 900)
+
+    def test_set_same_splits_keeps_run(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        run.handle('STARTSPLIT', 0)
+        run.handle('STARTSPLIT', 500)
+
+        run.set_splits(splits)
+        self.assertTrue(run.started)
+        self.assertEqual(run.index, 1)
+
+        run.set_splits(make_splits())
+        self.assertFalse(run.started)
+        self.assertEqual(run.index, 0)
+
+    def test_many_runs(self):
+        splits = make_splits()
+        run = Run(splits)
+
+        for attempt in range(1000):
+            for time in (0, 1000 + attempt, 2000 + attempt, 3000 + attempt):
+                run.handle('STARTSPLIT', time)
+
+        self.assertEqual(run.session_attempts, 1000)
+        self.assertEqual(splits[-1].pb_time_ms, 3000)
+
+    def test_last_attempt(self):
+        run = Run(make_splits())
+
+        for event, time in (('STARTSPLIT', 0), ('STARTSPLIT', 900), ('PAUSE', 1200), ('RESUME', 1200), ('RESET', None)):
+            run.handle(event, time)
+
+        self.assertEqual(run.last_attempt, {'result': RESET, 'split_times': [900], 'reset_index': 1, 'pauses': [[1200, 1200]]})
+
+        for time in (0, 900, 2000, 3500):
+            run.handle('STARTSPLIT', time)
+
+        self.assertEqual(run.last_attempt, {'result': FINISHED, 'split_times': [900, 2000, 3500], 'reset_index': None, 'pauses': []})
+
+
+class TestAttemptHistory(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, 'game.history.jsonl')
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_append_and_read(self):
+        history = AttemptHistory(self.path)
+
+        for i in range(10):
+            history.append({'game': 'game', 'category': 'any%' if i % 2 else '100%', 'attempt': i})
+
+        self.assertEqual(history.count('game', 'any%'), 5)
+        self.assertEqual([attempt['attempt'] for attempt in history.attempts('game', '100%')], [0, 2, 4, 6, 8])
+
+        # keep appending after the index is loaded
+        history.append({'game': 'game', 'category': 'any%', 'attempt': 10})
+        self.assertEqual([attempt['attempt'] for attempt in history.attempts('game', 'any%', start=-2)], [9, 10])
+
+        # only what was there when the size was taken
+        size = history.size()
+        history.append({'game': 'game', 'category': 'any%', 'attempt': 11})
+        self.assertEqual([attempt['attempt'] for attempt in history.attempts('game', 'any%', start=-2, before=size)], [9, 10])
+
+        history.close()
+
+    def test_index_catches_up(self):
+        history = AttemptHistory(self.path)
+        history.append({'game': 'game', 'category': 'any%', 'attempt': 0})
+        history.count('game', 'any%')
+        history.close()  # saves the index
+
+        # add more without loading the index, and cut the last one off like a crash would
+        history = AttemptHistory(self.path)
+        history.append({'game': 'game', 'category': 'any%', 'attempt': 1})
+        history.close()
+
+        with open(self.path, 'ab') as f:
+            f.write(b'{"game":"game","cat')
+
+        history = AttemptHistory(self.path)
+        self.assertEqual(history.count('game', 'any%'), 2)
+
+        history.append({'game': 'game', 'category': 'any%', 'attempt': 2})
+        self.assertEqual([attempt['attempt'] for attempt in history.attempts('game', 'any%')], [0, 1, 2])
+
+        history.close()
+
+    def test_for_game(self):
+        history = AttemptHistory.for_game(os.path.join('conf', 'testGame.json'))
+
+        self.assertEqual(history.path, os.path.join('conf', 'testGame.history.jsonl'))
+
+
+class TestRunJournal(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.journal = RunJournal(os.path.join(self.dir.name, 'game.journal.jsonl'), flush_interval=0.01)
+
+    def tearDown(self):
+        self.journal.close()
+        self.dir.cleanup()
+
+    def test_replay_saves_pb(self):
+        for event, time in (('STARTSPLIT', None), ('STARTSPLIT', 800), ('STARTSPLIT', 2000), ('STARTSPLIT', 3300), ('STARTSPLIT', None), ('STARTSPLIT', 700)):
+            self.journal.log(event, time)
+
+        self.journal.wait()
+
+        # a crash cut the last line off part way
+        with open(self.journal.path, 'ab') as f:
+            f.write(b'{"event":"STARTSP')
+
+        splits = make_splits()
+        run = Run(splits, 0, 10)
+
+        self.assertEqual(self.journal.replay(run), 6)
+        self.assertEqual([split.pb_time_ms for split in splits], [800, 2000, 3300])
+        self.assertEqual(splits[0].gold_segment_ms, 700, 'The unfinished attempt should still keep its golds')
+        self.assertEqual(run.lifetime_attempts, 12)
+
+    def test_clear(self):
+        self.journal.log('STARTSPLIT')
+        self.journal.clear()
+        self.journal.log('RESET')
+        self.journal.wait()
+
+        self.assertEqual(self.journal.read(), [{'seq': 2, 'event': 'RESET', 'time': None}])
+
+        # only clear what a save covered
+        self.journal.log('STARTSPLIT', 100)
+        self.journal.clear(through=2)
+
+        self.assertEqual([entry['seq'] for entry in self.journal.read()], [3])
+
+    def test_unwritable_path(self):
+        journal = RunJournal(os.path.join(self.dir.name, 'missing', 'game.journal.jsonl'), flush_interval=0.01)
+        journal.log('STARTSPLIT', 100)
+
+        with self.assertRaises(OSError):
+            journal.clear()  # should report the error rather than wait forever on a writer that can't write
+
+        with self.assertRaises(OSError):
+            journal.wait()
+
+        # once the directory is there the writer picks back up
+        os.mkdir(os.path.join(self.dir.name, 'missing'))
+        journal.log('RESET')
+        journal.wait()
+
+        self.assertIsNone(journal.error)
+        self.assertEqual([entry['event'] for entry in journal.read()], ['RESET'])
+        journal.close()
+
+
+class TestSegmentStats(unittest.TestCase):
+    def test_running_stats(self):
+        values = [Random(1).gauss(60_000, 5000) for _ in range(1000)]
+        stats = RunningStats()
+
+        for value in values:
+            stats.add(value)
+
+        self.assertEqual(stats.count, 1000)
+        self.assertAlmostEqual(stats.mean, statistics.mean(values), places=6)
+        self.assertAlmostEqual(stats.stdev, statistics.stdev(values), places=6)
+        self.assertEqual((stats.min, stats.max), (min(values), max(values)))
+
+    def test_p2_median(self):
+        rng = Random(2)
+        values = [rng.lognormvariate(11, 0.3) for _ in range(5000)]
+        median = P2Quantile(0.5)
+
+        for value in values:
+            median.add(value)
+
+        self.assertAlmostEqual(median.value / statistics.median(values), 1, delta=0.02)
+
+        # exact until there's enough values to estimate from
+        few = P2Quantile(0.5)
+        for value in (5, 1, 3):
+            few.add(value)
+
+        self.assertEqual(few.value, 3)
+
+    def test_engine_from_attempts(self):
+        attempts = [
+            {'split_times': [1000, 3000, 6000], 'result': 'FINISHED'},
+            {'split_times': [1200, 2800, 5000], 'result': 'FINISHED'},
+            {'split_times': [900], 'result': 'RESET'}
+        ]
+
+        engine = SegmentStatsEngine.from_attempts(3, attempts)
+
+        self.assertEqual(engine.attempts, 3)
+        self.assertEqual([segment.count for segment in engine.segments], [3, 2, 2])
+        self.assertEqual(engine.sum_of_best(), 900 + 1600 + 2200)
+        self.assertEqual(engine.sum_of_best(1), 900 + 1600)
+        self.assertEqual(engine.average_time(0), round((1000 + 1200 + 900) / 3))
+        self.assertEqual(engine.median_time(), 1000 + 1800 + 2600)
+
+    def test_offer_best(self):
+        engine = SegmentStatsEngine.from_attempts(2, [{'split_times': [1000, 3000]}], golds=[800, 0])
+
+        self.assertEqual(engine.sum_of_best(), 800 + 2000)
+        self.assertEqual(engine.average_time(), 3000, 'A gold without an attempt should only count towards the best')
+
+        engine.offer_best(1, 2500)
+        self.assertEqual(engine.sum_of_best(), 800 + 2000, 'A slower time should not replace the best')
+
+        engine.offer_best(1, 1500)
+        self.assertEqual(engine.sum_of_best(), 800 + 1500)
+
+    def test_insert_and_remove_segments(self):
+        attempts = [{'split_times': [1000, 3000, 6000]}, {'split_times': [1200, 2800, 5000]}]
+        engine = SegmentStatsEngine.from_attempts(3, attempts)
+
+        engine.insert_segments(1, 2)
+        self.assertEqual([segment.count for segment in engine.segments], [2, 0, 0, 2, 2])
+        self.assertEqual(engine.sum_of_best(), 1000 + 1600 + 2200, 'The new splits have no best to add')
+        self.assertEqual(engine.average_time(0), 1100)
+
+        engine.offer_best(1, 500)
+        engine.offer_best(2, 700)
+        self.assertEqual(engine.sum_of_best(), 1000 + 500 + 700 + 1600 + 2200)
+
+        # back to the same splits as the history, the same as building it from scratch
+        engine.remove_segments(1, 2)
+        rebuilt = SegmentStatsEngine.from_attempts(3, attempts)
+
+        self.assertEqual(engine.sum_of_best(), rebuilt.sum_of_best())
+        self.assertEqual(engine.average_time(), rebuilt.average_time())
+        self.assertEqual(engine.median_time(), rebuilt.median_time())
+
+    def test_gold_sums(self):
+        golds = GoldSums([1000, 2000, 3000], pb_time_ms=7000)
+
+        self.assertEqual(golds.sum_of_best(), 6000)
+        self.assertEqual(golds.possible_time_save(golds.sum_of_best()), 1000)
+
+        # ahead of the gold on the second split, then losing time once it's slower than the gold
+        self.assertEqual(golds.best_possible_time(1, 1100, 2500), 1100 + 2000 + 3000)
+        self.assertEqual(golds.best_possible_time(1, 1100, 3600), 3600 + 3000)
+        self.assertEqual(golds.possible_time_save(golds.best_possible_time(1, 1100, 5000)), 0)
+
+        self.assertFalse(golds.set_golds([1000, 2000, 3000]), 'The same golds should not be summed again')
+        self.assertTrue(golds.set_golds([1000, 1500, 3000]))
+        self.assertEqual(golds.sum_of_best(), 5500)
+
+    def test_gold_sums_missing_gold(self):
+        golds = GoldSums([1000, 0, 3000])
+
+        self.assertEqual(golds.sum_of_best(), 0)
+        self.assertEqual(golds.best_possible_time(0, 0, 500), 0, 'A split still to come has never been done')
+        self.assertEqual(golds.best_possible_time(1, 1000, 2500), 2500 + 3000)
+
+
+@unittest.skipUnless(PBChance.available(), 'the pb chance needs numpy')
+class TestPBChance(unittest.TestCase):
+    def test_certain_chances(self):
+        attempts = [{'split_times': [1000, 2000, 3000]}, {'split_times': [1100, 2300, 3500]}]
+        estimator = PBChanceEstimator.from_attempts(3, attempts, pb_time_ms=4000, seed=1)
+
+        self.assertEqual(estimator.estimate(0, 0), (1.0, 10_000), 'Every way of playing it out beats the pb')
+        self.assertEqual(estimator.estimate(2, 3500)[0], 0.0, 'Nothing left can make up the time')
+        self.assertEqual(estimator.estimate(1, 1000, elapsed_ms=3500)[0], 0.0, 'The current segment has already taken too long')
+
+    def test_chance(self):
+        # each segment is 1000 or 2000 half the time, so the pb of 4500 is beaten when at most one of three is slow
+        attempts = [{'split_times': [1000, 2000, 3000]}, {'split_times': [2000, 4000, 6000]}]
+        estimator = PBChanceEstimator.from_attempts(3, attempts, pb_time_ms=4500, seed=2)
+
+        chance, trials = estimator.estimate(0, 0, trials=20_000, budget_ms=10_000)
+
+        self.assertEqual(trials, 20_000)
+        self.assertAlmostEqual(chance, 0.5, delta=0.02)
+
+    def test_no_estimate(self):
+        estimator = PBChanceEstimator.from_attempts(2, [{'split_times': [1000]}], golds=[900, 0], pb_time_ms=5000)
+        self.assertEqual(estimator.estimate(0, 0), (None, 0), 'The second split has never been done')
+
+        estimator.set_golds([900, 1500], 5000)
+        self.assertEqual(estimator.estimate(0, 0)[0], 1.0, 'The gold should stand in for a split without history')
+
+        estimator.set_golds([900, 1500], 0)
+        self.assertEqual(estimator.estimate(0, 0), (None, 0), 'There is no pb to beat')
+
+    def test_insert_and_remove_segments(self):
+        estimator = PBChanceEstimator.from_attempts(2, [{'split_times': [1000, 2000]}], pb_time_ms=5000)
+
+        estimator.insert_segments(1, 1)
+        self.assertEqual(estimator.estimate(0, 0), (None, 0), 'The new split has never been done')
+
+        estimator.remove_segments(1, 1)
+        self.assertEqual(estimator.estimate(0, 0)[0], 1.0)
+
+
+class TestComparisons(unittest.TestCase):
+    def setUp(self):
+        self.splits = [Split('a', 1000, 1000, 800), Split('b', 3000, 2000, 1500), Split('c', 6000, 3000, 2500)]
+        self.attempts = [{'split_times': [900, 2900, 6100]}, {'split_times': [1100, 3300, 6300]}, {'split_times': [1000, 3000]}]
+
+        self.stats = SegmentStatsEngine.from_attempts(3, self.attempts)
+        self.comparisons = ComparisonEngine(self.splits, self.stats)
+
+    def test_comparisons(self):
+        self.assertEqual(self.comparisons.name, PERSONAL_BEST)
+        self.assertEqual(list(self.comparisons.current), [1000, 3000, 6000])
+        self.assertEqual(list(self.comparisons.times(BEST_SEGMENTS)), [800, 2300, 4800])
+        self.assertEqual(list(self.comparisons.times(AVERAGE)), [1000, 1000 + 2067, 1000 + 2067 + 3100])
+        self.assertEqual(list(self.comparisons.times(MEDIAN)), [1000, 3000, 6100])
+
+        self.comparisons.add_attempt(self.attempts[-1])
+        self.assertEqual(list(self.comparisons.times(LATEST)), [1000, 3000, 0], 'The splits it never got to have no time')
+
+    def test_balanced_adds_up_to_pb(self):
+        balanced = self.comparisons.times(BALANCED)
+
+        self.assertAlmostEqual(balanced[-1], 6000, delta=1)
+        self.assertTrue(balanced[0] < balanced[1] < balanced[2])
+
+    def test_switching(self):
+        pb = self.comparisons.current
+
+        for name in COMPARISONS[1:] + COMPARISONS[:1]:
+            self.assertEqual(self.comparisons.next_comparison(), name)
+
+        self.assertIs(self.comparisons.current, pb, 'Coming back to a comparison should not build it again')
+        self.assertEqual(self.comparisons.segment(1), 2000)
+
+        self.assertRaises(ValueError, self.comparisons.set_comparison, 'Sum of Worst')
+
+    def test_unknown_segment(self):
+        self.splits[1].gold_segment_ms = 0
+        self.comparisons.set_comparison(BEST_SEGMENTS)
+        self.assertTrue(self.comparisons.set_splits(self.splits))
+
+        self.assertEqual(list(self.comparisons.current), [800, 0, 0], 'Nothing after a segment without a time has one')
+        self.assertEqual(self.comparisons.segment(2), 0)
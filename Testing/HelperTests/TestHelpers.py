@@ -1,7 +1,24 @@
+import json
+import os
+import sys
+import tempfile
 import unittest
+from pathlib import Path
+from unittest.mock import patch
 from sys import intern
 
 from helpers.TimerFormat import *
+from helpers.FenwickTree import FenwickTree
+from helpers.FileHelpers import atomic_write
+from helpers.StartupProfiler import StartupProfiler, DEFAULT_REPORT_PATH
+from helpers.SyntheticGame import generate_game, generate_attempts, attempt_events, write_game
+from helpers import LiveSplit
+from helpers.LiveSplit import parse_time, format_time, read_lss, write_lss, import_lss, export_lss
+from Core.AttemptHistory import AttemptHistory
+from Core.Run import Run
+from Models.Game import Game
+
+LSS_PATH = Path(__file__).resolve().parents[1] / "conf" / "test_run.lss"
 
 
 class TestHelpers(unittest.TestCase):
@@ -52,6 +69,18 @@ class TestHelpers(unittest.TestCase):
         self.assertEqual(format_wall_clock_from_ms(-360000000), "-100:00:00.000")
         self.assertEqual(format_wall_clock_from_ms(-3600000000), "-1000:00:00.000")
 
+    def test_wall_clock_formatter_matches(self):
+        for full_length in (False, True):
+            formatter = WallClockFormatter(full_length)
+
+            # walk the time forwards like the timer would, across the sign change and a few rollovers
+            for millis in range(-61000, 61000, 7):
+                self.assertEqual(formatter(millis), format_wall_clock_from_ms(millis, full_length))
+
+            # and jump around so the cached prefix has to be thrown out
+            for millis in (3600000, -500, 500, -3600000000, 3599999, 0, -1, 360000000):
+                self.assertEqual(formatter(millis), format_wall_clock_from_ms(millis, full_length))
+
     def test_millis_to_wallclock_components(self):
         self.assertEqual(millis_to_wallclock_components(0), (0, 0, 0, 0))
         self.assertEqual(millis_to_wallclock_components(5), (0, 0, 0, 5))
@@ -92,3 +121,231 @@ class TestHelpers(unittest.TestCase):
             interesting_ms = qtime_to_ms(interesting_time)
 
             self.assertEqual(interesting_ms, i)
+
+    def test_fenwick_tree_prefix_sums(self):
+        values = [(i * 37) % 101 for i in range(200)]
+        tree = FenwickTree(values)
+
+        # change some values in the middle and make sure every prefix sum still matches adding them up by hand
+        for i in range(0, 200, 7):
+            tree.add(i, 5 - values[i])
+            values[i] = 5
+
+        for i in range(-1, 200):
+            self.assertEqual(tree.prefix_sum(i), sum(values[:i + 1]))
+
+        self.assertEqual(tree.total(), sum(values))
+
+    def test_atomic_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.json')
+
+            atomic_write(path, 'old')
+            atomic_write(path, 'new')
+
+            with open(path, 'r') as f:
+                self.assertEqual(f.read(), 'new')
+
+            self.assertEqual(os.listdir(directory), ['game.json'], 'The temporary file should have been renamed over the file')
+
+    def test_startup_profiler_from_environment(self):
+        self.assertFalse(StartupProfiler.from_environment(['Main.py'], {}).enabled)
+        self.assertFalse(StartupProfiler.from_environment(['Main.py'], {'PYSPLIT_PROFILE_STARTUP': '0'}).enabled)
+
+        profiler = StartupProfiler.from_environment(['Main.py'], {'PYSPLIT_PROFILE_STARTUP': '1'})
+        profiler.stop_import_hook()
+        self.assertTrue(profiler.enabled)
+        self.assertEqual(profiler.report_path, DEFAULT_REPORT_PATH)
+
+        profiler = StartupProfiler.from_environment(['Main.py', '--profile-startup=startup.json'], {})
+        profiler.stop_import_hook()
+        self.assertTrue(profiler.enabled)
+        self.assertEqual(profiler.report_path, 'startup.json')
+
+    def test_startup_profiler_phases(self):
+        profiler = StartupProfiler(enabled=False)
+        profiler.checkpoint('ignored')
+
+        with profiler.phase('ignored'):
+            pass
+
+        self.assertEqual(profiler.phases, [], 'A profiler that is off should record nothing')
+
+        profiler.enabled = True
+
+        with profiler.phase('Main'):
+            profiler.checkpoint('settings')
+
+            with profiler.phase('game'):
+                pass
+
+            profiler.checkpoint('widgets')
+
+        with profiler.phase('show'):
+            pass
+
+        phases = [(phase['name'], phase['depth']) for phase in profiler.report()['phases']]
+        self.assertEqual(phases, [('Main', 0), ('settings', 1), ('game', 2), ('widgets', 1), ('show', 0)])
+
+        self.assertTrue(all(end is not None for _, _, _, end, _ in profiler.phases), 'Every phase should be closed by the end of its with block')
+
+    def test_startup_profiler_imports(self):
+        with tempfile.TemporaryDirectory() as directory:
+            with open(os.path.join(directory, 'pysplit_profiled_outer.py'), 'w') as f:
+                f.write('import pysplit_profiled_inner\n')
+
+            with open(os.path.join(directory, 'pysplit_profiled_inner.py'), 'w') as f:
+                f.write('')
+
+            sys.path.insert(0, directory)
+            profiler = StartupProfiler(enabled=True, report_path=os.path.join(directory, 'report.json'))
+
+            try:
+                import pysplit_profiled_outer  # noqa: F401
+                import pysplit_profiled_outer  # noqa: F401, already loaded so it shouldn't be counted again
+
+            finally:
+                profiler.stop_import_hook()
+                sys.path.remove(directory)
+                sys.modules.pop('pysplit_profiled_outer', None)
+                sys.modules.pop('pysplit_profiled_inner', None)
+
+            outer_total, outer_self = profiler.imports['pysplit_profiled_outer']
+            inner_total, inner_self = profiler.imports['pysplit_profiled_inner']
+
+            self.assertEqual(outer_total - outer_self, inner_total, 'The inner import should not count towards the outer one\'s self time')
+            self.assertEqual(profiler.import_ns, outer_total)
+
+            profiler.finish()
+
+            with open(profiler.report_path, 'r') as f:
+                report = json.load(f)
+
+            self.assertEqual({entry['module'] for entry in report['imports']}, {'pysplit_profiled_outer', 'pysplit_profiled_inner'})
+
+    def test_synthetic_game(self):
+        game_json = generate_game(1000, seed=7)
+
+        self.assertEqual(game_json, generate_game(1000, seed=7), 'The same seed should make the same game')
+
+        game = Game.from_json(game_json)
+        self.assertEqual(len(game.splits), 1000)
+
+        pb_time = 0
+        for split in game.splits:
+            pb_time += split.pb_segment_ms
+
+            self.assertEqual(split.pb_time_ms, pb_time)
+            self.assertLessEqual(split.gold_segment_ms, split.pb_segment_ms)
+            self.assertGreater(split.gold_segment_ms, 0)
+
+    def test_synthetic_attempts_replay(self):
+        game_json = generate_game(200, seed=3)
+        attempts = list(generate_attempts(game_json, 50, seed=3, pause_chance=0.5))
+
+        self.assertIn('FINISHED', [attempt['result'] for attempt in attempts])
+        self.assertIn('RESET', [attempt['result'] for attempt in attempts])
+
+        # playing the events back through a run should give back the exact attempt the run would have recorded
+        for attempt in attempts:
+            run = Run(Game.from_json(game_json).splits)
+
+            for event in attempt_events(attempt):
+                run.handle(event['event'], event['time'])
+
+            self.assertEqual(run.last_attempt, {key: attempt[key] for key in run.last_attempt})
+
+    def test_write_synthetic_game(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'game.json')
+            write_game(path, 100, attempts=10, events=True, seed=1)
+
+            game = Game.from_json_file(path)
+            history = AttemptHistory.for_game(path)
+
+            self.assertEqual(history.count(game.title, game.sub_title), 10)
+            history.close()
+
+            with open(os.path.join(directory, 'game.events.jsonl'), 'r') as f:
+                self.assertEqual(len(f.readlines()), 10)
+
+    def test_lss_times(self):
+        self.assertEqual(parse_time('00:00:05.5000000'), 5500)
+        self.assertEqual(parse_time('01:02:03.4560000'), 3_723_456)
+        self.assertEqual(parse_time('-00:00:05'), -5000)
+        self.assertEqual(parse_time('1.02:03:04.5'), 93_784_500)
+        self.assertIsNone(parse_time(''))
+        self.assertIsNone(parse_time(None))
+
+        for ms in (0, 999, 3_723_456, -5000, 100 * 3_600_000):
+            self.assertEqual(parse_time(format_time(ms)), ms)
+
+    def test_lss_round_trip(self):
+        game = generate_game(30, seed=1, attempts=200)
+        attempts = list(generate_attempts(game, 200, seed=1, reset_chance=0.3))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'run.lss')
+            write_lss(path, game, attempts)
+            read_game, read_attempts = read_lss(path)
+
+            # a history too long to hold at once is written a few segments at a time, which shouldn't change the file
+            chunked_path = os.path.join(directory, 'chunked.lss')
+
+            with patch.object(LiveSplit, 'MAX_HISTORY_CELLS', 1000):
+                write_lss(chunked_path, game, lambda: iter(attempts))
+
+            with open(path, 'rb') as f, open(chunked_path, 'rb') as chunked:
+                self.assertEqual(f.read(), chunked.read())
+
+            with self.assertRaises(TypeError):
+                write_lss(chunked_path, game, iter(attempts))  # can only be gone through once
+
+        self.assertEqual(read_game['splits'], game['splits'])
+        self.assertEqual((read_game['title'], read_game['sub_title']), (game['title'], game['sub_title']))
+        self.assertEqual(len(read_attempts), len(attempts))
+
+        for read, attempt in zip(read_attempts, attempts):
+            for key in ('attempt', 'result', 'split_times', 'reset_index'):
+                self.assertEqual(read[key], attempt[key])
+
+            self.assertEqual(read['started_at'], attempt['started_at'] // 1000 * 1000, 'LiveSplit dates are to the second')
+
+    def test_lss_read_livesplit_file(self):
+        game, attempts = read_lss(LSS_PATH)
+
+        self.assertEqual((game['title'], game['sub_title'], game['lifetime_attempts'], game['start_offset']), ('Test Game', 'Any%', 7, -1.5))
+        self.assertEqual([(split['pb_time_ms'], split['pb_segment_ms'], split['gold_segment_ms']) for split in game['splits']],
+                         [(1000, 1000, 900), (3500, 2500, 2500), (6000, 2500, 2500)], 'Only the Personal Best real times should be read')
+
+        self.assertEqual([attempt['attempt'] for attempt in attempts], [1, 2, 3], 'History from before attempts were kept has no attempt')
+
+        first, second, third = attempts
+        self.assertEqual((first['result'], first['split_times'], first['reset_index']), ('FINISHED', [1000, 3500, 6000], None))
+        self.assertEqual(first['pauses'], [], 'LiveSplit only keeps the total pause time, not when')
+        self.assertEqual(first['started_at'], 1704189600000)
+        self.assertEqual((second['result'], second['split_times'], second['reset_index']), ('RESET', [1200], 1), 'An attempt without a time is a reset')
+        self.assertEqual((third['result'], third['split_times'], third['reset_index']), ('RESET', [1100], 1), 'A skipped split should reset the attempt there')
+
+    def test_lss_import(self):
+        game = generate_game(10, seed=2, attempts=20)
+        attempts = list(generate_attempts(game, 20, seed=2))
+
+        with tempfile.TemporaryDirectory() as directory:
+            lss_path = os.path.join(directory, 'run.lss')
+            game_path = os.path.join(directory, 'game.json')
+            write_lss(lss_path, game, attempts)
+            import_lss(lss_path, game_path)
+
+            imported = Game.from_json_file(game_path)
+            self.assertEqual([split.split_name for split in imported.splits], [split['split_name'] for split in game['splits']])
+
+            history = AttemptHistory.for_game(game_path)
+            self.assertEqual(history.count(imported.title, imported.sub_title), 20)
+            history.close()
+
+            # and back out again, reading the attempts from the history
+            export_path = os.path.join(directory, 'exported.lss')
+            export_lss(game_path, export_path)
+
+            self.assertEqual(read_lss(export_path)[1], read_lss(lss_path)[1])
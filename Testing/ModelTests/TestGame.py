@@ -177,6 +177,84 @@ class TestGame(unittest.TestCase):
         self.assertEqual(str(game), tmp_string)
 
 
+class TestGameUpdates(unittest.TestCase):
+    def setUp(self):
+        self.game = Models.Game.Game.from_json_str(TEST_GAME_JSON_STRING)
+        self.events = []
+
+        self.game.GameUpdated.connect(lambda game: self.events.append(('game',)))
+        self.game.AttemptsUpdated.connect(lambda session, lifetime: self.events.append(('attempts', session, lifetime)))
+        self.game.MetadataUpdated.connect(lambda game: self.events.append(('metadata',)))
+        self.game.SplitsAdded.connect(lambda first, count: self.events.append(('added', first, count)))
+        self.game.SplitsRemoved.connect(lambda first, count: self.events.append(('removed', first, count)))
+        self.game.SplitsEdited.connect(lambda indexes: self.events.append(('edited', indexes)))
+        self.game.TimesUpdated.connect(lambda indexes: self.events.append(('times', indexes)))
+
+    def test_no_changes_sends_nothing(self):
+        splits = self.game.splits
+
+        self.game.set_splits(list(splits))
+        self.game.set_attempts(self.game.session_attempts, self.game.lifetime_attempts)
+        self.game.set_metadata('TEST', 'SUBTEST', 0.0)
+
+        self.assertEqual(self.events, [])
+        self.assertIs(self.game.splits, splits, 'The same splits should keep the same list so a run in progress carries on')
+
+    def test_edits_and_times(self):
+        self.game.splits[1].split_name = 'renamed'
+        self.game.splits[2].gold_segment_ms = 1
+
+        self.game.set_splits()
+
+        self.assertEqual(self.events, [('edited', [1]), ('times', [2])])
+        self.assertEqual(self.game.splits[2].gold_segment_total_ms, 5)
+
+    def test_add_and_remove(self):
+        first, middle, last = self.game.splits
+        new = Models.Game.Split('new', 0, 0, 0)
+
+        self.game.set_splits([first, new, last])
+
+        self.assertEqual(self.events, [('removed', 1, 1), ('added', 1, 1)])
+        self.assertEqual([split.split_name for split in self.game.splits], ['test_0', 'new', 'test_2'])
+
+        self.events.clear()
+        self.game.set_splits([first, new, last, middle])
+
+        self.assertEqual(self.events, [('added', 3, 1)])
+
+    def test_attempts_and_metadata(self):
+        self.game.add_attempt()
+        self.game.set_metadata(title='NEW TITLE')
+
+        self.assertEqual(self.events, [('attempts', 1, 1), ('metadata',)])
+        self.assertEqual(self.game.title, 'NEW TITLE')
+
+
+class TestSplitTable(unittest.TestCase):
+    def test_totals_follow_edits(self):
+        game = Models.Game.Game.from_json_str(TEST_GAME_JSON_STRING)
+        split = game.splits[0]
+
+        split.gold_segment_ms = 10
+        split.pb_segment_ms = 4
+
+        self.assertIs(game.splits[0], split, 'The table should hand back the same split object every time')
+        self.assertEqual([s.gold_segment_total_ms for s in game.splits], [10, 12, 14])
+        self.assertEqual([s.pb_segment_total_ms for s in game.splits], [4, 5, 6])
+        self.assertEqual(game.splits.sum_of_best(), 14)
+
+    def test_splits_keep_values_between_tables(self):
+        split = Models.Game.Split('loose', 100, 50, 40)
+
+        game = Models.Game.Game.from_json_str(TEST_GAME_JSON_STRING)
+        game.set_splits(list(game.splits) + [split])
+
+        self.assertIs(game.splits[3], split)
+        self.assertEqual(split.to_dict(), {'split_name': 'loose', 'pb_time_ms': 100, 'pb_segment_ms': 50, 'gold_segment_ms': 40})
+        self.assertEqual(split.gold_segment_total_ms, 46)
+
+
 TEST_SINGLE_SPLIT_DICT = {
     "split_name": "test_0",
     "pb_time_ms": 0,
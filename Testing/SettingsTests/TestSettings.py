@@ -1,9 +1,18 @@
 from helpers.TimerFormat import format_wall_clock_from_ms
 from Main import Main
+from Core.Journal import RunJournal
+from Models.Game import Game
+from Styling.AutoSaver import AutoSaver
+from Styling.Settings import Settings
+from Styling.Style.styleApplier import StyleApplier, parse_rules
+from Styling.Style.styleTemplate import StyleTemplate, format_by_replacing
 from pathlib import Path
 from PySide6.QtGui import QFontDatabase, QColor
-from PySide6.QtWidgets import QApplication, QMessageBox
+from PySide6.QtWidgets import QApplication, QMessageBox, QWidget
+import os
+import shutil
 import sys
+import tempfile
 import unittest
 from unittest.mock import patch
 
@@ -60,6 +69,23 @@ class TestSettings(unittest.TestCase):
 
             self.assertEqual(game_split, widget_split.split)
 
+    def test_settings_tabs_are_built_when_opened(self):
+        settings_window = self.main.settings_window
+        pages = settings_window.tab_dict.pages
+
+        self.assertTrue(all(page.tab is None for page in pages.values()), 'No tab should be built before settings are opened')
+        self.assertIn('Advanced', settings_window.tab_dict)
+        self.assertIsNone(pages['Advanced'].tab, 'Checking for a tab should not build it')
+
+        settings_window.show()
+        settings_window.tabs.setCurrentIndex(settings_window.get_tab_index('Settings'))
+
+        self.assertIsNotNone(pages['Key Bindings'].tab)
+        self.assertIsNotNone(pages['Settings'].tab)
+        self.assertIsNone(pages['Splits'].tab)
+
+        settings_window.hide()
+
     def test_game_settings_update(self):
         settings = self.main.settings
         game = settings.game
@@ -307,3 +333,154 @@ class TestSettings(unittest.TestCase):
         self.assertEqual(text_settings.lifetime_attempts_color_picker.get_color(), QColor(var_map['lifetime-attempts-color']))
         self.assertEqual(text_settings.split_color_picker.get_color(), QColor(var_map['split-color']))
         self.assertEqual(text_settings.timer_color_picker.get_color(), QColor(var_map['timer-color']))
+
+
+class TestStyleTemplate(unittest.TestCase):
+    def test_matches_replacing(self):
+        style_path = Path(__file__).resolve().parents[1] / "conf" / "test_style.qss"
+        raw = style_path.read_text()
+        var_map = {'primary-background': '#000000', 'border-color': 'red', 'unused': 'blue', 'split-color': 'a;b'}
+
+        cases = [
+            (raw, var_map),
+            ('a { color: $x; } b { color: $xy; } $missing; $$x; $;', {'x': '1', 'xy': '2', '': 'empty'}),
+            ('$a$b;', {'b': 'x', 'ax': 'chained'}),  # the dangling $ joins up with b's value
+            ('$a; $b;', {'a': '$b', 'b': 'value'}),  # a value holding another variable
+            ('no variables at all', var_map),
+            ('', var_map),
+        ]
+
+        for sheet, variables in cases:
+            self.assertEqual(StyleTemplate(sheet).format(variables), format_by_replacing(sheet, variables), sheet)
+
+    def test_format_style_only_changes_with_the_vars(self):
+        settings = Settings(Path(__file__).resolve().parents[1] / "conf" / "test_settings.json")
+        style = settings.style
+
+        style.set_raw_style('a { color: $x; }')
+        style.variable_map['x'] = 'red'
+        style.format_style()
+        formatted = style.formatted_style_sheet
+        self.assertEqual(formatted, 'a { color: red; }')
+
+        style.format_style()
+        self.assertIs(style.formatted_style_sheet, formatted, 'Nothing changed so the last sheet should be reused')
+
+        style.variable_map['x'] = 'blue'
+        style.format_style()
+        self.assertEqual(style.formatted_style_sheet, 'a { color: blue; }')
+
+
+class TestStyleApplier(unittest.TestCase):
+    def setUp(self):
+        self._app = QApplication.instance()
+        if self._app is None:
+            self._app = QApplication(sys.argv)
+
+        self.root = QWidget()
+        self.scope = QWidget(self.root)
+        self.applier = StyleApplier(self.root, {self.scope: ('Scope',)})
+
+    def test_parse_rules(self):
+        sheet = 'QWidget { color: red; } /* a } comment */ #Scope QLabel[segment="gold"], #Scope { border-image: url("a{b}.png"); }'
+        rules = parse_rules(sheet)
+
+        self.assertEqual([rule.selectors for rule in rules], [['QWidget'], ['#Scope QLabel[segment="gold"]', '#Scope']])
+        self.assertEqual(''.join(rule.text for rule in rules), sheet)
+        self.assertIsNone(parse_rules('QWidget { color: red; '))
+
+    def test_only_changed_scopes_are_set(self):
+        self.applier.apply('QWidget { color: red; } #Scope QLabel { color: blue; }')
+        self.applier.flush()
+
+        self.assertEqual(self.root.styleSheet(), 'QWidget { color: red; }')
+        self.assertEqual(self.scope.styleSheet(), ' #Scope QLabel { color: blue; }')
+
+        self.root.setStyleSheet('untouched')
+        self.applier.apply('QWidget { color: red; } #Scope QLabel { color: green; }')
+        self.applier.flush()
+
+        self.assertEqual(self.root.styleSheet(), 'untouched', 'Only the scope changed so the root should be left alone')
+        self.assertEqual(self.scope.styleSheet(), ' #Scope QLabel { color: green; }')
+
+    def test_unsafe_sheets_are_not_split(self):
+        sheet = '#Other QLabel { color: red; } #Scope QLabel { color: blue; }'  # the first rule could fight the scoped one
+        self.applier.apply(sheet)
+        self.applier.flush()
+
+        self.assertEqual(self.root.styleSheet(), sheet)
+        self.assertEqual(self.scope.styleSheet(), '')
+
+
+class TestAutoSaver(unittest.TestCase):
+    def setUp(self):
+        self._app = QApplication.instance()
+        if self._app is None:
+            self._app = QApplication(sys.argv)
+
+        self.dir = tempfile.TemporaryDirectory()
+        self.settings = Settings(Path(__file__).resolve().parents[1] / "conf" / "test_settings.json")
+
+        # work on copies so the test files are left alone
+        def copy(path):
+            new_path = os.path.join(self.dir.name, os.path.basename(path))
+            shutil.copy(path, new_path)
+            return new_path
+
+        self.settings.game_path = copy(self.settings.game_path)
+        self.settings.settings_file_path = copy(self.settings.settings_file_path)
+        self.settings.style.style_path = copy(self.settings.style.style_path)
+        self.settings.style.vars_path = copy(self.settings.style.vars_path)
+
+        self.journal = RunJournal(os.path.join(self.dir.name, 'game.journal.jsonl'), flush_interval=0.01)
+
+    def tearDown(self):
+        self.journal.close()
+        self.dir.cleanup()
+
+    def test_only_changed_files_are_saved(self):
+        saver = AutoSaver(self.settings, self.journal)
+        style_mtime = os.stat(self.settings.style.vars_path).st_mtime_ns
+
+        self.journal.log('STARTSPLIT')
+        self.settings.style.update_style(var_map=dict(self.settings.style.variable_map))  # counts as a change, but nothing is different
+        self.settings.game.set_metadata(title='Saved Title')
+
+        saver.flush()
+
+        self.assertEqual(Game.from_json_file(self.settings.game_path).title, 'Saved Title')
+        self.assertEqual(os.stat(self.settings.style.vars_path).st_mtime_ns, style_mtime, 'The vars file did not change so it should not have been written')
+        self.assertEqual(self.journal.read(), [], 'The journal should be cleared once the game is saved')
+        self.assertFalse(self.settings.game.dirty)
+
+    def test_waits_while_busy(self):
+        busy = True
+        saver = AutoSaver(self.settings, self.journal, is_busy=lambda: busy)
+
+        self.settings.game.set_metadata(title='Saved Title')
+        saver.save()
+        self.assertTrue(self.settings.game.dirty, 'Nothing should be saved while the timer is running')
+
+        busy = False
+        saver.save()
+        saver.flush()
+
+        self.assertEqual(Game.from_json_file(self.settings.game_path).title, 'Saved Title')
+
+    def test_saves_after_flush(self):
+        saver = AutoSaver(self.settings, self.journal)
+        saver.flush()
+
+        # flushing shouldn't stop later changes from being saved
+        self.settings.game.set_metadata(title='Saved Title')
+        saver.save()
+        saver.flush()
+
+        self.assertEqual(Game.from_json_file(self.settings.game_path).title, 'Saved Title')
+
+        saver.close()
+        self.settings.game.set_metadata(title='Not Saved')
+        saver.save()  # shouldn't do anything, or raise, once it is closed
+
+        self.assertFalse(saver._timer.isActive(), 'Changes after closing should not schedule a save')
+        self.assertEqual(Game.from_json_file(self.settings.game_path).title, 'Saved Title')
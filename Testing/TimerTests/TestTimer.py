@@ -0,0 +1,67 @@
+import sys
+import unittest
+
+from PySide6.QtWidgets import QApplication, QFrame, QVBoxLayout
+
+from Widgets.GlyphTimerLabel import GlyphTimerLabel
+from Timer.TickScheduler import tick_interval_ms, DEFAULT_REFRESH_RATE, PRECISION_INTERVAL_MS
+
+
+class TestTickScheduler(unittest.TestCase):
+    def test_tick_interval_follows_refresh_rate(self):
+        self.assertEqual(tick_interval_ms(60, 240), 16)
+        self.assertEqual(tick_interval_ms(144, 240), 6)
+        self.assertEqual(tick_interval_ms(240, 240), 4)
+
+    def test_tick_interval_is_capped(self):
+        self.assertEqual(tick_interval_ms(240, 60), 16)
+        self.assertEqual(tick_interval_ms(360, 120), 8)
+
+        # no cap means we just follow the screen
+        self.assertEqual(tick_interval_ms(120, 0), 8)
+        self.assertEqual(tick_interval_ms(120, None), 8)
+
+    def test_tick_interval_precision(self):
+        self.assertEqual(tick_interval_ms(60, 240, precision=True), PRECISION_INTERVAL_MS)
+        self.assertEqual(tick_interval_ms(60, 1, precision=True), PRECISION_INTERVAL_MS)
+
+    def test_tick_interval_bad_refresh_rate(self):
+        self.assertEqual(tick_interval_ms(0, 240), int(1000 // DEFAULT_REFRESH_RATE))
+        self.assertEqual(tick_interval_ms(-1, 240), int(1000 // DEFAULT_REFRESH_RATE))
+
+        # never tick faster than every millisecond
+        self.assertEqual(tick_interval_ms(5000, 10000), PRECISION_INTERVAL_MS)
+
+
+class TestGlyphTimerLabel(unittest.TestCase):
+    def setUp(self):
+        self._app = QApplication.instance()
+        if self._app is None:
+            self._app = QApplication(sys.argv)
+
+        self.frame = QFrame()
+        layout = QVBoxLayout(self.frame)
+
+        self.label = GlyphTimerLabel('00.000')
+        self.label.setObjectName('TimerLabel')
+        layout.addWidget(self.label)
+
+    def tearDown(self):
+        self.frame.deleteLater()
+
+    def test_set_text(self):
+        self.label.setText('01.234')
+        self.assertEqual(self.label.text(), '01.234')
+
+    def test_glyphs_follow_stylesheet(self):
+        self.frame.setStyleSheet('#TimerLabel { font-size: 40px; color: #ff0000; }')
+        self.frame.grab()  # paint so the cache gets built
+
+        self.assertFalse(self.label._dirty)
+        big_height = self.label.sizeHint().height()
+
+        self.frame.setStyleSheet('#TimerLabel { font-size: 20px; color: #00ff00; }')
+        self.assertTrue(self.label._dirty)  # the style change should throw out the old glyphs
+
+        self.frame.grab()
+        self.assertLess(self.label.sizeHint().height(), big_height)
@@ -0,0 +1,105 @@
+import sys
+import unittest
+from pathlib import Path
+
+from PySide6.QtWidgets import QApplication
+
+from Core.Comparisons import BEST_SEGMENTS, PERSONAL_BEST
+from Models.Split import Split
+from Styling.Settings import Settings
+from Widgets.SingleSplitWidget import SingleSplitWidget
+from Widgets.SplitListView import SplitRow, ROW_PITCH
+from Widgets.SplitsWidget import SplitsWidget
+
+
+def _get_settings():
+    BASE_DIR = Path(__file__).resolve().parents[1]  # Testing/
+    CONFIG_PATH = BASE_DIR / "conf" / "test_settings.json"
+
+    return Settings(CONFIG_PATH)
+
+
+class TestSplitsWidget(unittest.TestCase):
+    def setUp(self):
+        self._app = QApplication.instance()
+        if self._app is None:
+            self._app = QApplication(sys.argv)
+
+        self.settings = _get_settings()
+        self.splits_widget = SplitsWidget(self.settings, parent=None)
+        self.splits_widget.show()
+
+    def tearDown(self):
+        self.splits_widget.deleteLater()
+
+    def load_long_game(self, count: int = 3000):
+        self.settings.game.splits = [Split(f'split {i}', (i + 1) * 1000, 1000, 900) for i in range(count)]
+        self.splits_widget.load_splits_from_game(self.settings.game)
+
+    def test_short_game_uses_widgets(self):
+        self.assertFalse(self.splits_widget.virtual)
+
+        for split in self.splits_widget.splits:
+            self.assertIsInstance(split, SingleSplitWidget)
+
+    def test_long_game_uses_list_view(self):
+        self.load_long_game()
+
+        self.assertTrue(self.splits_widget.virtual)
+        self.assertEqual(self.splits_widget.split_model.rowCount(), 3000)
+        self.assertIsInstance(self.splits_widget.splits[2999], SplitRow)
+        self.assertEqual(self.splits_widget.splits[2999].time_label.text(), '50:00.000')
+
+    def test_long_game_splits(self):
+        self.load_long_game()
+        splits_widget = self.splits_widget
+
+        splits_widget.handle_control('STARTSPLIT')
+
+        for time in (500, 1400, 2300, 3200):
+            splits_widget.time_source.now = lambda: time
+            splits_widget.handle_control('STARTSPLIT')
+
+        self.assertEqual(splits_widget.index, 4)
+        self.assertTrue(splits_widget.splits[4].is_selected())
+        self.assertFalse(splits_widget.splits[3].is_selected())
+        self.assertEqual(splits_widget.split_view.verticalScrollBar().value(), 4 * ROW_PITCH)
+
+        # the finished split shows its time and is colored by the stylesheet state
+        self.assertEqual(splits_widget.splits[3].time_label.text(), '03.200')
+        self.assertEqual(splits_widget.splits[3].time_label.segment, 'saved')
+        self.assertTrue(splits_widget.splits[3].time_label.ahead)
+
+        splits_widget.handle_control('RESET')
+
+        self.assertEqual(splits_widget.index, 0)
+        self.assertEqual(splits_widget.splits[3].time_label.text(), '04.000')
+        self.assertEqual(splits_widget.splits[3].time_label.segment, '')
+
+    def test_switch_comparison(self):
+        self.load_long_game()
+        splits_widget = self.splits_widget
+
+        changed = []
+        splits_widget.ComparisonChanged.connect(changed.append)
+
+        splits_widget.handle_control('STARTSPLIT')
+        splits_widget.time_source.now = lambda: 950
+        splits_widget.handle_control('STARTSPLIT')
+
+        self.assertEqual(splits_widget.splits[0].delta_label.text(), '-00.050')
+
+        splits_widget.set_comparison(BEST_SEGMENTS)
+
+        # the finished split is compared again, the ones to come show the new comparison's times
+        self.assertEqual(changed, [BEST_SEGMENTS])
+        self.assertEqual(splits_widget.splits[0].time_label.text(), '00.950')
+        self.assertEqual(splits_widget.splits[0].delta_label.text(), '+00.050')
+        self.assertEqual(splits_widget.splits[2999].time_label.text(), '45:00.000')
+
+        splits_widget.handle_control('COMPARISON')
+        self.assertEqual(len(changed), 2)
+
+        splits_widget.set_comparison(PERSONAL_BEST)
+        splits_widget.handle_control('RESET')
+        self.assertEqual(splits_widget.splits[2999].time_label.text(), '50:00.000')
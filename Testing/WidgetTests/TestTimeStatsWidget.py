@@ -0,0 +1,203 @@
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from time import monotonic
+
+from PySide6.QtWidgets import QApplication
+
+from Core import PBChance
+from Core.AttemptHistory import AttemptHistory
+from Styling.Settings import Settings
+from Widgets.SplitsWidget import SplitsWidget
+from Widgets.TimeStatsWidget import TimeStatsWidget
+
+
+def _get_settings():
+    BASE_DIR = Path(__file__).resolve().parents[1]  # Testing/
+    CONFIG_PATH = BASE_DIR / "conf" / "test_settings.json"
+
+    return Settings(CONFIG_PATH)
+
+
+# every one of these finishes well under the test game's pb of 10.080, so a run going at their pace always pbs
+HISTORY = [
+    {'split_times': [1500, 3000, 4500, 6000, 7500]},
+    {'split_times': [1600, 3100, 4700, 6300, 7900]}
+]
+
+
+class TestTimeStatsWidget(unittest.TestCase):
+    def setUp(self):
+        self._app = QApplication.instance()
+        if self._app is None:
+            self._app = QApplication(sys.argv)
+
+        self.settings = _get_settings()
+        game = self.settings.game
+
+        # a history of our own, so the one next to the test game is left alone
+        self.dir = tempfile.TemporaryDirectory()
+        self.history = AttemptHistory(os.path.join(self.dir.name, 'game.history.jsonl'))
+
+        for attempt in HISTORY:
+            self.history.append({'game': game.title, 'category': game.sub_title, **attempt})
+
+        self.splits_widget = SplitsWidget(self.settings, parent=None)
+        self.stats_widget = TimeStatsWidget(
+            self.settings,
+            self.history,
+            run=self.splits_widget.run,
+            time_source=self.splits_widget.time_source
+        )
+
+        # hooked up the same way the main window does it
+        self.splits_widget.AttemptEnded.connect(self.stats_widget.add_attempt)
+        self.splits_widget.RunEvent.connect(self.stats_widget.handle_run_event)
+        game.TimesUpdated.connect(self.stats_widget.update_golds)
+
+        self.estimated = []  # every (request, chance) the worker answered
+        self.stats_widget.stats_worker.Estimated.connect(lambda request, chance: self.estimated.append((request, chance)))
+
+        self.wait_for_stats()
+
+    def tearDown(self):
+        self.stats_widget.stop_worker()
+        self.stats_widget.deleteLater()
+        self.splits_widget.deleteLater()
+
+        self.history.close()
+        self.dir.cleanup()
+
+    def split_at(self, time: int):
+        self.splits_widget.time_source.now = lambda: time
+        self.splits_widget.handle_control('STARTSPLIT')
+
+    def wait_for_stats(self, timeout: float = 5):
+        deadline = monotonic() + timeout
+
+        while monotonic() < deadline:
+            self._app.processEvents()
+
+            if not self.stats_widget.loading:
+                return
+
+        self.fail('The worker never loaded the stats')
+
+    def wait_for_latest_estimate(self, timeout: float = 5):
+        deadline = monotonic() + timeout
+
+        while monotonic() < deadline:
+            self._app.processEvents()
+
+            # the answers can be recorded here before the widget's queued copy of them gets to it, so wait for both
+            if self.estimated and self.estimated[-1][0] == self.stats_widget._request:
+                chance = self.estimated[-1][1]
+
+                if self.stats_widget.lines['pb_chance'].value_label.text() == ('-' if chance is None else f'{chance:.1%}'):
+                    return
+
+        self.fail('The worker never answered the latest request')
+
+    @unittest.skipUnless(PBChance.available(), 'NumPy is not installed')
+    def test_only_latest_pb_chance_is_shown(self):
+        line = self.stats_widget.lines['pb_chance'].value_label
+
+        self.splits_widget.handle_control('STARTSPLIT')
+        self.split_at(500)
+        self.split_at(30000)  # far past the pb, it can't be beaten anymore
+        self.splits_widget.handle_control('UNSPLIT')  # still just as far into the split
+
+        self.wait_for_latest_estimate()
+
+        requests = [request for request, _ in self.estimated]
+        self.assertEqual(requests, sorted(set(requests)), 'Each request should be answered at most once, in order')
+        self.assertEqual(line.text(), '0.0%')
+
+        # an answer to an older request that turns up late is dropped
+        self.stats_widget.show_pb_chance(requests[-1] - 1, 1.0)
+        self.assertEqual(line.text(), '0.0%')
+
+        self.splits_widget.handle_control('RESET')
+        self.wait_for_latest_estimate()
+
+        self.assertEqual(line.text(), '100.0%', 'A new attempt from the top should pb at the history\'s pace')
+
+    @unittest.skipUnless(PBChance.available(), 'NumPy is not installed')
+    def test_pb_chance_after_new_pb(self):
+        self.splits_widget.handle_control('STARTSPLIT')
+
+        for time in (100, 200, 300, 400, 500):
+            self.split_at(time)
+
+        self.assertTrue(self.splits_widget.done)
+        self.wait_for_latest_estimate()
+
+        # the finished attempt and the new pb both reached the worker before the last request, nothing is under 0.500
+        self.assertEqual(self.settings.game.splits[-1].pb_time_ms, 500)
+        self.assertEqual(self.stats_widget.lines['pb_chance'].value_label.text(), '0.0%')
+
+    def test_golds_update_best_possible(self):
+        lines = self.stats_widget.lines
+        time_source = self.splits_widget.time_source
+
+        self.assertEqual(lines['sum_of_best'].value_label.text(), '11.210')
+
+        self.splits_widget.handle_control('STARTSPLIT')
+        self.split_at(1000)
+
+        # under the gold, the best possible time is the golds from here on
+        time_source.frame_time = 1500
+        self.stats_widget.refresh()
+        self.assertEqual(lines['best_possible'].value_label.text(), '10.980')
+        self.assertEqual(lines['time_save'].value_label.text(), '-')
+
+        # past the gold, every ms spent comes off it
+        time_source.frame_time = 5000
+        self.stats_widget.refresh()
+        self.assertEqual(lines['best_possible'].value_label.text(), '13.880')
+
+        # finish with golds on every segment but the fourth, the game's TimesUpdated should bring in the new golds
+        for time in (2000, 3000, 6500, 9500):
+            self.split_at(time)
+
+        self.assertTrue(self.splits_widget.done)
+        self.assertEqual(lines['sum_of_best'].value_label.text(), '09.330')
+        self.assertEqual(lines['best_possible'].value_label.text(), '09.330')
+        self.assertEqual(lines['time_save'].value_label.text(), '00.170')
+
+    def test_stats_load_off_the_gui_thread(self):
+        widget = self.stats_widget
+        loaded = []
+        widget.StatsChanged.connect(loaded.append)
+
+        self.assertEqual(widget.stats.attempts, 2)
+        self.assertEqual(widget.lines['average'].value_label.text(), '07.700')
+
+        # an attempt that ends while the worker is building is done to what it builds too, and only once
+        widget.load_stats()
+        self.assertTrue(widget.loading)
+        widget.add_attempt({'split_times': [1700, 3200, 4900, 6600, 8300]})
+        self.wait_for_stats()
+
+        self.assertEqual(len(loaded), 1)
+        self.assertIs(loaded[0], widget.stats)
+        self.assertEqual(widget.stats.attempts, 3)
+        self.assertEqual(widget.lines['average'].value_label.text(), '07.900')
+
+    def test_splits_moved_keep_their_stats(self):
+        widget = self.stats_widget
+        game = self.settings.game
+        average = [segment.mean for segment in widget.stats.segments]
+
+        # the same as the game does when a split is taken out and another put in its place
+        widget.remove_splits(1, 1)
+        self.assertEqual(len(widget.stats), len(game.splits) - 1)
+
+        widget.insert_splits(1, 1)
+        self.assertEqual(len(widget.stats), len(game.splits))
+
+        moved = [segment.mean for segment in widget.stats.segments]
+        self.assertEqual(moved[:1] + moved[2:], average[:1] + average[2:])
+        self.assertEqual(widget.stats.segments[1].count, 0)
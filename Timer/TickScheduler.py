@@ -0,0 +1,87 @@
+"""
+A timer that ticks as fast as the screen can actually show the updates instead of as fast as the event loop will let it
+"""
+from PySide6.QtCore import QTimer, Qt
+from PySide6.QtGui import QGuiApplication
+
+DEFAULT_REFRESH_RATE = 60.0  # what we fall back to when Qt can't tell us about the screen
+DEFAULT_MAX_REFRESH_RATE = 240  # the default cap on how often we will tick, even on really fast monitors
+PRECISION_INTERVAL_MS = 1  # the old behavior, tick every millisecond
+
+
+def screen_refresh_rate(screen=None) -> float:
+    """
+    Gets the refresh rate of the given screen, or the primary screen if one isn't given
+
+    Args:
+        screen: (QScreen, optional) the screen we want to know the refresh rate of
+
+    Returns:
+        (float) The refresh rate of the screen in Hz, or the default rate if it can't be found
+    """
+    if screen is None and QGuiApplication.instance() is not None:
+        screen = QGuiApplication.primaryScreen()
+
+    if screen is None or screen.refreshRate() <= 0:
+        return DEFAULT_REFRESH_RATE
+
+    return screen.refreshRate()
+
+
+def tick_interval_ms(refresh_rate: float, max_rate: int, precision: bool = False) -> int:
+    """
+    Works out how many milliseconds should be between each tick so that we only do as much work as the screen can show
+
+    Args:
+        refresh_rate: (float) the refresh rate of the screen in Hz
+        max_rate: (int) the highest rate we will tick at, regardless of the screen
+        precision: (bool) whether we should ignore the screen and tick every millisecond
+
+    Returns:
+        (int) The number of milliseconds between each tick
+    """
+    if precision:
+        return PRECISION_INTERVAL_MS
+
+    rate = refresh_rate if refresh_rate > 0 else DEFAULT_REFRESH_RATE
+
+    if max_rate is not None and max_rate > 0:
+        rate = min(rate, max_rate)
+
+    return max(PRECISION_INTERVAL_MS, int(1000 // rate))
+
+
+class TickScheduler(QTimer):
+    """
+    A QTimer that ticks in time with the refresh rate of the screen, with a cap and an opt-in precision mode
+    """
+    def __init__(self, refresh_rate: float = DEFAULT_REFRESH_RATE, max_rate: int = DEFAULT_MAX_REFRESH_RATE, precision: bool = False, parent=None):
+        super().__init__(parent)
+
+        self.refresh_rate = refresh_rate
+        self.max_rate = max_rate
+        self.precision = precision
+
+        self.configure()
+
+    def configure(self, refresh_rate: float = None, max_rate: int = None, precision: bool = None):
+        """
+        Updates any of the given tick settings and resets the interval to match them
+
+        Args:
+            refresh_rate: (float, optional) the refresh rate of the screen we are drawing on in Hz
+            max_rate: (int, optional) the highest rate we will tick at
+            precision: (bool, optional) whether we should tick every millisecond no matter the screen
+        """
+        if refresh_rate is not None:
+            self.refresh_rate = refresh_rate
+
+        if max_rate is not None:
+            self.max_rate = max_rate
+
+        if precision is not None:
+            self.precision = precision
+
+        # a coarse timer is fine when we are only trying to keep up with the screen, it lets the OS batch our wakeups
+        self.setTimerType(Qt.PreciseTimer if self.precision else Qt.CoarseTimer)
+        self.setInterval(tick_interval_ms(self.refresh_rate, self.max_rate, self.precision))
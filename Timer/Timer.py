@@ -1,23 +1,30 @@
-from PySide6.QtCore import QElapsedTimer, QObject, QTimer, Slot, Signal
+from PySide6.QtCore import QObject, Slot, Signal
 
 from Styling.Settings import Settings
+from Core.TimeSource import TimeSource
 
 
 class Timer(QObject):
-    update = Signal(int)
+    """
+    Controls the state of the shared time source, widgets read the time from the time source themselves when they draw
+    """
+    update = Signal(int)  # only emitted when the state of the timer changes, not on every tick
 
     paused = False
     running = False
     prevTime = 0
 
-    def __init__(self, settings: Settings):
+    def __init__(self, settings: Settings, time_source: TimeSource = None):
         super().__init__()
         self.settings = settings
 
-        self.timer = None
-        self.update_timer = None
-        self.prevTime = 0
-        self.offset = settings.game.start_offset * 1000
+        self.offset = round(settings.game.start_offset * 1000)
+
+        if time_source is None:
+            time_source = TimeSource(self.offset)
+
+        self.time_source = time_source
+        self.time_source.set_offset(self.offset)
 
         # set up the function map so we can take in inputs
         self.event_map = {  # mapping is constant for now, we don't want them to remap these on the fly
@@ -28,40 +35,35 @@ class Timer(QObject):
             'RESET': self.reset_timer,
             'SKIP': self.doNothing,
             'RESUME': self.resume_timer,
-            'LOCK': self.doNothing
+            'LOCK': self.doNothing,
+            'COMPARISON': self.doNothing
         }
 
     def run(self):
-        self.timer = QElapsedTimer()
-        self.timer.start()
-
-        self.update_timer = QTimer()
-        self.update_timer.setInterval(1)
-        self.update_timer.timeout.connect(self.read)
-
         self.update.emit(self.offset)
 
-    @Slot(str)
-    def handle_control(self, control_message: str):
+    @Slot(str, object)
+    def handle_control(self, control_message: str, timestamp_ns: int = None):
+        """
+        Handles a control event from the timer controller
+
+        Args:
+            control_message: (str) the control event to handle
+            timestamp_ns: (int, optional) the perf_counter_ns() stamp of when the input was captured, so the timer acts at the keypress and not when the event got here
+        """
         if control_message in self.event_map:  # if the message is handleable
-            self.event_map[control_message]()  # handle it according to the mapping
+            self.event_map[control_message](timestamp_ns)  # handle it according to the mapping
 
-    def doNothing(self):
+    def doNothing(self, timestamp_ns: int = None):
         """
         A simple method that does nothing to fill in slots in the timer that shouldn't do anything
         """
         pass
 
-    @Slot()
-    def startsplit_timer(self):
+    @Slot(object)
+    def startsplit_timer(self, timestamp_ns: int = None):
         if not self.running:
-            if self.timer.isValid():
-                self.timer.restart()
-
-            else:
-                self.timer.start()
-
-            self.update_timer.start()
+            self.time_source.start(timestamp_ns)
             self.prevTime = 0
 
             # manage state
@@ -71,8 +73,8 @@ class Timer(QObject):
             self.update.emit(self.offset)  # just started so it should be 0
 
     @Slot()
-    def reset_timer(self):
-        self.update_timer.stop()
+    def reset_timer(self, timestamp_ns: int = None):
+        self.time_source.reset()
 
         # manage state, not running and not paused, since a stopped timer cannot be resumed
         self.running = False
@@ -81,11 +83,10 @@ class Timer(QObject):
 
         self.update.emit(self.offset)  # reset to 0, since the timer was stopped
 
-    @Slot()
-    def stop_timer(self):
+    @Slot(object)
+    def stop_timer(self, timestamp_ns: int = None):
         if self.running:  # only need to stop the timer if it is already on
-            curr = self.timer.elapsed()
-            self.update_timer.stop()
+            curr = self.time_source.stop(timestamp_ns)  # the time source holds onto the final time so it stays on the screen
 
             # manage state, not running and not paused, since a stopped timer cannot be resumed
             self.running = False
@@ -94,26 +95,24 @@ class Timer(QObject):
 
             self.update.emit(curr)  # output the last value so it shows on the screen
 
-    @Slot()
-    def pause_timer(self):
+    @Slot(object)
+    def pause_timer(self, timestamp_ns: int = None):
         if not self.paused and self.running:
-            curr = self.timer.elapsed()
-            self.prevTime += curr  # save the curr to prev
+            self.time_source.pause(timestamp_ns)
+            self.prevTime = self.time_source.prev_time  # save the curr to prev
 
-            self.update_timer.stop()  # stop the update timer
-            self.update.emit(self.prevTime)
+            self.update.emit(self.prevTime + self.offset)
 
             # manage state, a paused timer is still running, just also paused
             self.paused = True
             self.running = True
 
-    @Slot()
-    def resume_timer(self):
+    @Slot(object)
+    def resume_timer(self, timestamp_ns: int = None):
         if self.paused and self.running:
-            self.timer.restart()
-            self.update_timer.start()
+            self.time_source.resume(timestamp_ns)
 
-            self.update.emit(self.prevTime)
+            self.update.emit(self.prevTime + self.offset)
 
             # manage state
             self.paused = False
@@ -121,10 +120,7 @@ class Timer(QObject):
 
     @Slot(str)
     def read_str(self):
-        if self.timer is not None and self.timer.isActive():
-            curr = self.timer.elapsed() + self.prevTime + self.offset
-        else:
-            curr = self.prevTime + self.offset
+        curr = self.time_source.now()
 
         s, ms = divmod(curr, 1000)
 
@@ -136,18 +132,15 @@ class Timer(QObject):
         Returns:
             (int) The current time on the timer in milliseconds
         """
-        if self.update_timer is not None and self.update_timer.isActive():
-            curr = self.timer.elapsed()
-            self.update.emit(curr + self.prevTime + self.offset)
-
-        else:
-            self.update.emit(self.prevTime + self.offset)
+        self.update.emit(self.time_source.now())
 
     @Slot()
     def quit(self):
-        if self.update_timer.isActive():
-            self.update_timer.stop()
+        if self.running:
+            self.time_source.stop()
 
     def update_settings(self):
-        self.offset = self.settings.game.start_offset * 1000
+        self.offset = round(self.settings.game.start_offset * 1000)
+        self.time_source.set_offset(self.offset)
+
         self.update.emit(self.offset)
@@ -12,7 +12,7 @@ class TimerController(QObject):
     """
     A class that takes in input events and output timer control events
     """
-    ControlEvent = Signal(str)
+    ControlEvent = Signal(str, object)  # the event, and the perf_counter_ns() stamp of when the input that caused it was captured
 
     def __init__(self, listener: ABCListener, settings: Settings):
         super().__init__()  # do the basic init
@@ -44,7 +44,7 @@ class TimerController(QObject):
             if event == 'LOCK':  # the lock event is local and should be pressable w/o the listening turned on
                 self.toggle_listening()
             elif self.listening:  # as long as we're listening, then we should do this (and if it is not the lock command as that is local to the controller)
-                self.ControlEvent.emit(event)
+                self.ControlEvent.emit(event, event_obj.timestamp_ns)
 
     @Slot()
     def settings_update(self):
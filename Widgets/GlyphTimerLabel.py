@@ -0,0 +1,152 @@
+"""
+A label for the main timer that draws each character from a cache of pre-rendered glyphs, instead of laying out the text again every frame
+"""
+from PySide6.QtWidgets import QWidget, QSizePolicy
+from PySide6.QtGui import QPainter, QPixmap, QFontMetrics
+from PySide6.QtCore import Qt, QEvent, QRect, QSize, Slot
+
+GLYPHS = '0123456789:.-+'  # everything the wall clock format can output
+
+
+class GlyphTimerLabel(QWidget):
+    """
+    Draws the timer text from a pixmap per glyph rendered with the font and color the stylesheet gives us
+
+    The digits all share one cell width so the text doesn't jitter, and only the cells that changed between two texts are
+    repainted. The cache is thrown out whenever the font, palette or style changes and rebuilt on the next paint.
+    """
+    def __init__(self, text: str = '', parent=None):
+        super().__init__(parent)
+
+        self._text = text
+        self._glyphs = {}  # char -> QPixmap
+        self._widths = {}  # char -> width of the cell in pixels
+        self._glyph_height = 0
+        self._dirty = True
+
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+
+    def text(self) -> str:
+        return self._text
+
+    @Slot(str)
+    def setText(self, text: str):
+        """
+        Sets the text on the label, repainting only the cells that are different from the last text
+
+        Args:
+            text: (str) the new text to show
+        """
+        old = self._text
+
+        if text == old:
+            return
+
+        self._text = text
+
+        if self._dirty:
+            self.update()
+
+        elif len(text) != len(old):  # everything could have moved over, so redraw it all
+            self.updateGeometry()
+            self.update()
+
+        else:
+            changed = None
+
+            for i, rect in enumerate(self._cell_rects(text)):
+                if text[i] != old[i]:
+                    changed = rect if changed is None else changed.united(rect)
+
+            if changed is not None:
+                self.update(changed)
+
+    @Slot()
+    def invalidate_glyphs(self):
+        """
+        Throws out the glyph cache so it gets rebuilt with the current font and color the next time we paint
+        """
+        self._dirty = True
+        self.updateGeometry()
+        self.update()
+
+    def rebuild_glyphs(self):
+        """
+        Renders every glyph we can show with the current font and foreground color
+        """
+        font = self.font()
+        metrics = QFontMetrics(font)
+        color = self.palette().color(self.foregroundRole())
+        ratio = self.devicePixelRatioF()
+
+        digit_width = max(metrics.horizontalAdvance(c) for c in '0123456789')  # tabular digits so the time doesn't wobble
+        self._glyph_height = metrics.height()
+
+        self._glyphs = {}
+        self._widths = {}
+
+        for c in GLYPHS:
+            width = digit_width if c.isdigit() else metrics.horizontalAdvance(c)
+
+            pixmap = QPixmap(round(width * ratio), round(self._glyph_height * ratio))
+            pixmap.setDevicePixelRatio(ratio)
+            pixmap.fill(Qt.transparent)
+
+            painter = QPainter(pixmap)
+            painter.setFont(font)
+            painter.setPen(color)
+            painter.drawText(QRect(0, 0, width, self._glyph_height), Qt.AlignCenter, c)
+            painter.end()
+
+            self._glyphs[c] = pixmap
+            self._widths[c] = width
+
+        self._dirty = False
+
+    def _text_width(self, text: str) -> int:
+        return sum(self._widths.get(c, 0) for c in text)
+
+    def _cell_rects(self, text: str) -> list[QRect]:
+        """
+        Lays the text out right aligned, with one rect for each character
+        """
+        area = self.contentsRect()
+        top = area.top() + (area.height() - self._glyph_height) // 2
+        x = area.right() + 1 - self._text_width(text)
+
+        rects = []
+        for c in text:
+            width = self._widths.get(c, 0)
+            rects.append(QRect(x, top, width, self._glyph_height))
+            x += width
+
+        return rects
+
+    def paintEvent(self, event):
+        if self._dirty:
+            self.rebuild_glyphs()
+
+        painter = QPainter(self)
+        dirty_rect = event.rect()
+
+        for c, rect in zip(self._text, self._cell_rects(self._text)):
+            if c in self._glyphs and rect.intersects(dirty_rect):
+                painter.drawPixmap(rect.topLeft(), self._glyphs[c])
+
+        painter.end()
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.FontChange, QEvent.PaletteChange, QEvent.StyleChange):
+            self.invalidate_glyphs()
+
+        super().changeEvent(event)
+
+    def sizeHint(self) -> QSize:
+        if self._dirty:
+            self.rebuild_glyphs()
+
+        margins = self.contentsMargins()
+        return QSize(self._text_width(self._text) + margins.left() + margins.right(), self._glyph_height + margins.top() + margins.bottom())
+
+    def minimumSizeHint(self) -> QSize:
+        return self.sizeHint()
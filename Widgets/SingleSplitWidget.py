@@ -6,96 +6,76 @@ from __future__ import annotations
 from PySide6.QtWidgets import QWidget, QFrame, QLabel, QHBoxLayout
 from PySide6.QtCore import Qt, Property
 from PySide6.QtCore import Slot, Signal
-from typing import Callable
 
-from helpers.TimerFormat import format_wall_clock_from_ms
-from Models.Game import Split
+from helpers.TimerFormat import format_wall_clock_from_ms, WallClockFormatter
+from Models.Split import Split
 
+SPLIT_HEIGHT = 30  # every split is the same height, so the splits list can work out where any of them are
 
-class SingleSplitWidget(QFrame):
-    def is_selected(self):
-        return self._selected
 
-    def set_selected(self, state: bool):
-        if self._selected != state:
-            self._selected = state
-            self.setProperty("selected", state)
-            self.style().polish(self)
-            self.update()
+class SplitPresenter:
+    """
+    Works out what a split should show, without caring what it is being drawn on
 
-    selected = Property(bool, is_selected, set_selected)  # hate the formatting here
-
-    def __init__(self, split: Split, comparison_strategy: Callable[[Split], int], parent):
+    Whatever uses this needs split_name_label, delta_label and time_label objects that have setText(), and an
+    apply_time_state(label, segment, ahead) that colors one of them, set_time_state() calls it only when a label's
+    state actually changes
+    """
+    def setup_presenter(self, split: Split, parent, index: int):
         """
-        An individual split that can display the times from the PB and the comparison time
         Args:
             split: (Split) The split object that contains the information for the split itself
-            comparison_strategy: (Callable[[Split], int]) a strategy function that extracts the value we display and compare against from the Split object
-            parent: (Main) a reference to the parent widget that we can use to get colors and other settings from
+            parent: (SplitsWidget) a reference to the parent widget that we can use to get settings, the run and the comparison from
+            index: (int) where this split is in the run
         """
-        super().__init__()
-
         self.parent = parent
-
-        # create these so they can be set later
-        self.best_time_color_ahead = None  # TODO : Finish the better Palette color conversion
-        self.best_time_color_behind = None
-        self.saved_time_color_ahead = None
-        self.saved_time_color_behind = None
-        self.lost_time_color_ahead = None
-        self.lost_time_color_behind = None
-
-        self.get_colors_from_style()
-
-        self._selected = False
+        self.index = index
 
         self.split = split
-        self.comparison_strategy = comparison_strategy
 
-        # setup values for the current state of the split
-        self.current_time_ms = 0
-        self.current_segment_ms = 0
-        self.current_start_time = 0
+        self._delta_formatter = WallClockFormatter()  # the live delta is formatted every frame
+        self._delta_centis = None  # the centisecond the delta label is showing
+        self._label_states = {}  # label -> (segment, ahead) so we only restyle on changes
 
-        self.layout = QHBoxLayout()
+    # the times themselves are kept by the run, the widget only draws them
+    @property
+    def current_time_ms(self) -> int:
+        return self.parent.run.split_times[self.index]
 
-        # create the labels we need
-        self.split_name_label = QLabel(self.split.split_name, self)
-        self.time_label = QLabel(format_wall_clock_from_ms(self.get_comparison_time()), self)
-        self.delta_label = QLabel('', self)
+    @property
+    def current_segment_ms(self) -> int:
+        return self.parent.run.segment_times[self.index]
 
-        # add them to the layout
-        self.layout.addWidget(self.split_name_label)
-        self.layout.addWidget(self.delta_label)
-        self.layout.addWidget(self.time_label)
+    @property
+    def current_start_time(self) -> int:
+        return self.parent.run.start_times[self.index]
 
-        # align the items in the layout
-        self.layout.setAlignment(self.split_name_label, Qt.AlignLeft | Qt.AlignVCenter)
-        self.layout.setAlignment(self.delta_label, Qt.AlignRight)
-        self.layout.setAlignment(self.time_label, Qt.AlignRight | Qt.AlignVCenter)
-
-        self.setObjectName('SingleSplit')
-
-        self.setLayout(self.layout)  # set the layout on the frame
-        self.setFixedHeight(30)
-
-    def get_colors_from_style(self):
+    def set_time_state(self, label, segment: str, ahead: bool = True):
         """
-        Gets the colors from the style and then saves them to vars
+        Colors a label, only doing the work when the state actually changes since restyling is the expensive part
 
-        Returns:
-            None
+        Args:
+            label: (QLabel) the label to color
+            segment: (str) how the segment went, 'gold', 'saved', 'lost', or '' for no color
+            ahead: (bool) whether the run is ahead of the comparison
         """
-        var_map = self.parent.main.settings.style.variable_map
+        state = (segment, ahead)
+
+        if self._label_states.get(label) == state:
+            return
 
-        self.best_time_color_ahead = f'color: {var_map['best-time-color-ahead']};'
-        self.best_time_color_behind = f'color: {var_map['best-time-color-behind']};'
+        self._label_states[label] = state
+        self.apply_time_state(label, segment, ahead)
 
-        self.saved_time_color_ahead = f'color: {var_map['saved-time-color-ahead']};'
-        self.saved_time_color_behind = f'color: {var_map['saved-time-color-behind']};'
+    def clear_time_state(self):
+        """
+        Takes the colors off the labels and clears the delta
+        """
+        self._delta_centis = None
 
-        self.lost_time_color_ahead = f'color: {var_map['lost-time-color-ahead']};'
-        self.lost_time_color_behind = f'color: {var_map['lost-time-color-behind']};'
+        self.delta_label.setText('')
+        self.set_time_state(self.delta_label, '')
+        self.set_time_state(self.time_label, '')
 
     @Slot(int)
     def update_split(self, curr_time_ms: int):
@@ -105,61 +85,70 @@ class SingleSplitWidget(QFrame):
         Args:
             curr_time_ms: (int) the current amount of time taken up to this point (from start of timer to now, not start of split)
         """
-        segment_time = curr_time_ms - self.current_start_time  # get the current change
-        self.current_segment_ms = segment_time  # add the current change to the current segment value to get the size of the segment
+        comparison_ms = self.parent.comparisons.current[self.index]
+        time_delta = curr_time_ms - comparison_ms
 
-        self.current_time_ms = curr_time_ms
+        if comparison_ms and time_delta >= -1000:
+            # only redraw once per centisecond, rounded towards 0 so we never show more time than has passed
+            centis = time_delta // 10 if time_delta >= 0 else -(-time_delta // 10)
 
-        time_delta = self.current_time_ms - self.split.pb_time_ms
+            if centis == self._delta_centis:
+                return
 
-        if time_delta >= -1000.0:
-            time_delta_str = format_wall_clock_from_ms(time_delta)
+            self._delta_centis = centis
+            time_delta_str = self._delta_formatter(centis * 10)
 
             if time_delta >= 0:
                 time_delta_str = '+' + time_delta_str
 
             self.delta_label.setText(time_delta_str)
 
-            if time_delta <= 0:
-                self.delta_label.setStyleSheet(self.saved_time_color_ahead)  # TODO : Figure ahead / behind out here
-            else:
-                self.delta_label.setStyleSheet(self.lost_time_color_ahead)
+            # losing time if this segment has already taken longer than it does in the comparison
+            segment = 'lost' if curr_time_ms - self.current_start_time > self.get_comparison_segment() else 'saved'
+            self.set_time_state(self.delta_label, segment, time_delta <= 0)
 
-        else:
+        elif self._delta_centis is not None:
+            self._delta_centis = None
             self.delta_label.setText('')
 
-    def get_comparison_time(self):
-        return self.comparison_strategy(self.split)
-
-    def reset_split(self):
+    @Slot()
+    def refresh(self):
         """
-        Resets the split data to how it would have been when first loaded
+        Redraws the split with the time sampled from the shared time source for this frame
         """
-        var_map = self.parent.main.settings.style.variable_map
+        self.update_split(self.parent.time_source.frame_time)
 
-        self.delta_label.setText('')  # clear the time delta
-        self.time_label.setText(format_wall_clock_from_ms(self.get_comparison_time()))
-        self.time_label.setStyleSheet(f'color: {var_map['split-color']}')
+    def get_comparison_time(self) -> int:
+        return self.parent.comparisons.current[self.index]
 
-        self.current_time_ms = 0
-        self.current_segment_ms = 0
+    def get_comparison_segment(self) -> int:
+        return self.parent.comparisons.segment(self.index)
 
-    def finalize_split(self):
+    def show_comparison(self):
         """
-        Saves any golds and pbs and starts the split over
+        Redraws the split against the comparison after it was switched, a finished split keeps its time and gets a new
+        delta, anything else shows the comparison's time
         """
-        if self.current_segment_ms < self.split.gold_segment_ms and self.current_time_ms != 0:
-            self.split.gold_segment_ms = self.current_segment_ms
+        run = self.parent.run
 
-        if self.current_time_ms < self.split.pb_time_ms and self.current_time_ms != 0:
-            self.split.pb_time_ms = self.current_time_ms
+        if run.started and (self.index < run.index or run.done) and self.current_time_ms != 0:
+            self.show_result()
+        else:
+            self.finalize_split()
+            self._delta_centis = None  # the current split draws its delta again on the next frame
 
-        # make the split show what it should
+    def reset_split(self):
+        """
+        Resets the split data to how it would have been when first loaded
+        """
+        self.clear_time_state()
         self.time_label.setText(format_wall_clock_from_ms(self.get_comparison_time()))
 
-        # reset the current state to 0 since this split is done
-        self.current_time_ms = 0
-        self.current_segment_ms = 0
+    def finalize_split(self):
+        """
+        Shows the comparison time again once the run has saved any golds and pbs
+        """
+        self.time_label.setText(format_wall_clock_from_ms(self.get_comparison_time()))
 
     @Slot()
     def export_data(self, indent: str = '    ', depth: int = 1):
@@ -177,41 +166,97 @@ class SingleSplitWidget(QFrame):
 {indent * (depth + 1)}"gold_segment_ms": {self.split.gold_segment_ms}
 {indent * depth}}}"""
 
-    @Slot(str)
-    def handle_control(self, event: str):
-        if event == 'STARTSPLIT' and self.current_time_ms != 0:
-            time_delta = self.current_time_ms - self.get_comparison_time()
-            time_delta_str = format_wall_clock_from_ms(time_delta)
+    def show_result(self):
+        """
+        Shows the time the run finished this split at, and how that went against the comparison and the gold
+        """
+        time_delta = self.current_time_ms - self.get_comparison_time()
+        time_delta_str = format_wall_clock_from_ms(time_delta)
 
-            if time_delta >= 0:
-                time_delta_str = '+' + time_delta_str
+        if time_delta >= 0:
+            time_delta_str = '+' + time_delta_str
 
-            self.delta_label.setText(time_delta_str)  # update the +/- time delta label
-            self.time_label.setText(format_wall_clock_from_ms(self.current_time_ms))  # set the text to show the time taken
+        self.delta_label.setText(time_delta_str)  # update the +/- time delta label
+        self.time_label.setText(format_wall_clock_from_ms(self.current_time_ms))  # set the text to show the time taken
 
-            if self.current_segment_ms < self.split.gold_segment_ms:
-                # if we're ahead of the saved time, then a "gold" gold
-                if self.current_segment_ms < self.split.pb_segment_ms:
-                    self.time_label.setStyleSheet(self.best_time_color_ahead)  # TODO : Figure out ahead / behind here too
-                    self.delta_label.setStyleSheet(self.best_time_color_ahead)
-                else:  # we're behind, but we saved time, then we ought to color it a different color to note the gold but while not ahead
-                    self.time_label.setStyleSheet(self.best_time_color_behind)
-                    self.delta_label.setStyleSheet(self.best_time_color_behind)
+        if self.current_segment_ms < self.split.gold_segment_ms or self.split.gold_segment_ms == 0:
+            segment = 'gold'
+        elif self.current_segment_ms < self.get_comparison_segment():
+            segment = 'saved'
+        else:
+            segment = 'lost'
 
-            elif self.current_segment_ms < self.split.pb_segment_ms:
-                self.time_label.setStyleSheet(self.saved_time_color_ahead)
-                self.delta_label.setStyleSheet(self.saved_time_color_ahead)
+        ahead = time_delta < 0 or self.get_comparison_time() == 0  # nothing to be behind without a comparison time
 
-            elif self.current_time_ms >= self.split.pb_time_ms:
-                self.time_label.setStyleSheet(self.lost_time_color_ahead)
-                self.delta_label.setStyleSheet(self.lost_time_color_ahead)
+        self.set_time_state(self.time_label, segment, ahead)
+        self.set_time_state(self.delta_label, segment, ahead)
+        self._delta_centis = None
 
-            else:
-                self.time_label.setStyleSheet(self.saved_time_color_ahead)
-                self.delta_label.setStyleSheet(self.saved_time_color_ahead)
+    @Slot(str)
+    def handle_control(self, event: str):
+        if event == 'STARTSPLIT' and self.current_time_ms != 0:
+            self.show_result()
 
         elif event == 'RESET':
             self.reset_split()
 
         elif event == 'STOP':
             self.finalize_split()
+
+
+class SingleSplitWidget(SplitPresenter, QFrame):
+    def is_selected(self):
+        return self._selected
+
+    def set_selected(self, state: bool):
+        if self._selected != state:
+            self._selected = state
+            self.setProperty("selected", state)
+            self.style().polish(self)
+            self.update()
+
+    selected = Property(bool, is_selected, set_selected)  # hate the formatting here
+
+    def __init__(self, split: Split, parent, index: int = 0):
+        """
+        An individual split that can display the times from the PB and the comparison time
+        Args:
+            split: (Split) The split object that contains the information for the split itself
+            parent: (SplitsWidget) a reference to the parent widget that we can use to get colors, settings and the run from
+            index: (int, optional) where this split is in the run
+        """
+        super().__init__()
+
+        self._selected = False
+        self.setup_presenter(split, parent, index)
+
+        self.layout = QHBoxLayout()
+
+        # create the labels we need
+        self.split_name_label = QLabel(self.split.split_name, self)
+        self.time_label = QLabel(format_wall_clock_from_ms(self.get_comparison_time()), self)
+        self.delta_label = QLabel('', self)
+
+        # add them to the layout
+        self.layout.addWidget(self.split_name_label)
+        self.layout.addWidget(self.delta_label)
+        self.layout.addWidget(self.time_label)
+
+        # align the items in the layout
+        self.layout.setAlignment(self.split_name_label, Qt.AlignLeft | Qt.AlignVCenter)
+        self.layout.setAlignment(self.delta_label, Qt.AlignRight)
+        self.layout.setAlignment(self.time_label, Qt.AlignRight | Qt.AlignVCenter)
+
+        self.setObjectName('SingleSplit')
+
+        self.setLayout(self.layout)  # set the layout on the frame
+        self.setFixedHeight(SPLIT_HEIGHT)
+
+    def apply_time_state(self, label: QLabel, segment: str, ahead: bool):
+        """
+        Colors a label through its dynamic properties, the colors themselves live in the stylesheet
+        """
+        label.setProperty('segment', segment)
+        label.setProperty('ahead', ahead)
+        label.style().unpolish(label)
+        label.style().polish(label)
@@ -0,0 +1,248 @@
+"""
+A model/view version of the splits list for games with too many splits to make a widget for each one
+"""
+from __future__ import annotations
+
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QFrame, QLabel, QHBoxLayout, QStyle, QStyleOption, QAbstractItemView
+from PySide6.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QEvent
+
+from helpers.TimerFormat import format_wall_clock_from_ms
+from Models.Split import Split
+from Widgets.SingleSplitWidget import SplitPresenter, SPLIT_HEIGHT
+
+ROW_SPACING = 2  # the same gap the widget version leaves between splits
+ROW_PITCH = SPLIT_HEIGHT + ROW_SPACING
+
+SplitRowRole = Qt.UserRole + 1
+
+TIME_STATES = [('', True), ('gold', True), ('gold', False), ('saved', True), ('saved', False), ('lost', True), ('lost', False)]
+
+
+class SplitCell:
+    """
+    Stands in for a QLabel on a split row, it holds the text and color state and tells the row when they change
+    """
+    __slots__ = ('row', '_text', 'segment', 'ahead')
+
+    def __init__(self, row: SplitRow, text: str = ''):
+        self.row = row
+        self._text = text
+
+        self.segment = ''
+        self.ahead = True
+
+    def text(self) -> str:
+        return self._text
+
+    def setText(self, text: str):
+        if text != self._text:
+            self._text = text
+            self.row.changed()
+
+
+class SplitRow(SplitPresenter):
+    """
+    A split in the model/view list, it works out what to show the same way SingleSplitWidget does but only holds onto
+    the result, the delegate draws it when the row is on screen
+    """
+    def __init__(self, split: Split, parent, index: int, model: SplitListModel):
+        """
+        Args:
+            split: (Split) The split object that contains the information for the split itself
+            parent: (SplitsWidget) a reference to the parent widget that we can use to get settings, the run and the comparison from
+            index: (int) where this split is in the run, and the row it is in the model
+            model: (SplitListModel) the model to tell when this row changes
+        """
+        self.setup_presenter(split, parent, index)
+
+        self.model = model
+        self._selected = False
+
+        self.split_name_label = SplitCell(self, split.split_name)
+        self.time_label = SplitCell(self, format_wall_clock_from_ms(self.get_comparison_time()))
+        self.delta_label = SplitCell(self)
+
+    def height(self) -> int:
+        return SPLIT_HEIGHT
+
+    def is_selected(self) -> bool:
+        return self._selected
+
+    def set_selected(self, state: bool):
+        if self._selected != state:
+            self._selected = state
+            self.changed()
+
+    def apply_time_state(self, label: SplitCell, segment: str, ahead: bool):
+        label.segment = segment
+        label.ahead = ahead
+
+        self.changed()
+
+    def changed(self):
+        self.model.row_changed(self.index)
+
+
+class SplitListModel(QAbstractListModel):
+    """
+    Holds the split rows for the list view
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        self.rows = []
+
+    def set_rows(self, rows: list[SplitRow]):
+        """
+        Swaps out every row in the model at once
+
+        Args:
+            rows: (list[SplitRow]) the new rows
+        """
+        self.beginResetModel()
+        self.rows = rows
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+
+        row = self.rows[index.row()]
+
+        if role == Qt.DisplayRole:
+            return row.split_name_label.text()
+
+        elif role == SplitRowRole:
+            return row
+
+        return None
+
+    def row_changed(self, row: int):
+        """
+        Lets the view know a single row needs to be redrawn
+        """
+        model_index = self.index(row)
+        self.dataChanged.emit(model_index, model_index)
+
+
+class SplitStyleProxy(QFrame):
+    """
+    A hidden stand-in split that the stylesheet is applied to, so the delegate can draw with the same QSS as SingleSplitWidget
+
+    There is one label for each color state, so nothing ever needs to be re-polished while drawing
+    """
+    def __init__(self, selected: bool, parent=None):
+        super().__init__(parent)
+
+        self.setObjectName('SingleSplit')
+        self.setProperty('selected', selected)
+        self.setFixedHeight(SPLIT_HEIGHT)
+
+        self.layout = QHBoxLayout()
+        self.labels = {}
+
+        for segment, ahead in TIME_STATES:
+            label = QLabel(self)
+            label.setProperty('segment', segment)
+            label.setProperty('ahead', ahead)
+
+            self.labels[(segment, ahead)] = label
+
+        self.setLayout(self.layout)
+        self.hide()
+
+    def label(self, cell: SplitCell) -> QLabel:
+        return self.labels.get((cell.segment, cell.ahead), self.labels[('', True)])
+
+
+class SplitDelegate(QStyledItemDelegate):
+    """
+    Draws a split row the same way a SingleSplitWidget would look
+    """
+    def __init__(self, proxies: dict[bool, SplitStyleProxy], parent=None):
+        super().__init__(parent)
+
+        self.proxies = proxies
+
+    def sizeHint(self, option, index) -> QSize:
+        return QSize(option.rect.width(), ROW_PITCH)
+
+    def paint(self, painter, option, index):
+        row = index.data(SplitRowRole)
+        proxy = self.proxies[row.is_selected()]
+        proxy.ensurePolished()
+
+        rect = option.rect.adjusted(0, ROW_SPACING // 2, 0, -(ROW_SPACING - ROW_SPACING // 2))
+
+        # let the stylesheet draw the background for us
+        style_option = QStyleOption()
+        style_option.initFrom(proxy)
+        style_option.rect = rect
+        proxy.style().drawPrimitive(QStyle.PE_Widget, style_option, painter, proxy)
+
+        inner = rect.marginsRemoved(proxy.layout.contentsMargins())
+        spacing = proxy.layout.spacing()
+
+        painter.save()
+
+        name_label = proxy.label(row.split_name_label)
+        painter.setFont(name_label.font())
+        painter.setPen(name_label.palette().color(name_label.foregroundRole()))
+        painter.drawText(inner, Qt.AlignLeft | Qt.AlignVCenter, row.split_name_label.text())
+
+        time_label = proxy.label(row.time_label)
+        painter.setFont(time_label.font())
+        painter.setPen(time_label.palette().color(time_label.foregroundRole()))
+        painter.drawText(inner, Qt.AlignRight | Qt.AlignVCenter, row.time_label.text())
+
+        time_width = time_label.fontMetrics().horizontalAdvance(row.time_label.text())
+
+        if row.delta_label.text():
+            delta_label = proxy.label(row.delta_label)
+            painter.setFont(delta_label.font())
+            painter.setPen(delta_label.palette().color(delta_label.foregroundRole()))
+            painter.drawText(inner.adjusted(0, 0, -(time_width + spacing), 0), Qt.AlignRight | Qt.AlignVCenter, row.delta_label.text())
+
+        painter.restore()
+
+
+class SplitListView(QListView):
+    """
+    Only draws the splits that are on screen, and since every row is the same height it can jump straight to any of them
+    """
+    def __init__(self, model: SplitListModel, parent=None):
+        super().__init__(parent)
+
+        self.proxies = {False: SplitStyleProxy(False, self), True: SplitStyleProxy(True, self)}
+
+        self.setModel(model)
+        self.setItemDelegate(SplitDelegate(self.proxies, self))
+
+        self.setUniformItemSizes(True)  # lets the view skip measuring every row
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setFrameStyle(QFrame.NoFrame)
+
+        self.viewport().setAutoFillBackground(False)  # let the splits widget's background show through like the scroll area does
+
+    def scroll_to_row(self, row: int):
+        """
+        Scrolls so the given row is at the top of the view
+
+        Args:
+            row: (int) the row to scroll to
+        """
+        self.executeDelayedItemsLayout()  # make sure the scroll range knows about every row before we jump
+        self.verticalScrollBar().setValue(row * ROW_PITCH)
+
+    def changeEvent(self, event):
+        if event.type() in (QEvent.StyleChange, QEvent.FontChange, QEvent.PaletteChange):
+            self.viewport().update()  # the proxies picked up a new style, so redraw with it
+
+        super().changeEvent(event)
@@ -1,9 +1,18 @@
-from Models.Game import Game, Split
+from Models.Game import Game
+from Models.Split import Split
+from Models.SplitTable import SplitTable
 from PySide6.QtWidgets import QWidget, QFrame, QLabel, QVBoxLayout, QScrollArea
 from PySide6.QtCore import Slot, Signal, Qt
 
 from Styling.Settings import Settings
+from Core.Comparisons import ComparisonEngine
+from Core.SegmentStats import SegmentStatsEngine
+from Core.TimeSource import TimeSource, wall_clock_ms
+from Core.Run import Run, STARTED, SPLIT, FINISHED, UNSPLIT, RESET, STOPPED
 from Widgets.SingleSplitWidget import SingleSplitWidget
+from Widgets.SplitListView import SplitListView, SplitListModel, SplitRow
+
+VIRTUAL_SPLIT_THRESHOLD = 100  # games with more splits than this get drawn by the list view instead of a widget per split
 
 
 class SplitsWidget(QWidget):
@@ -11,13 +20,16 @@ class SplitsWidget(QWidget):
     Assembler Widget that holds a list of all the splits we have in the run and listens to the controller for input
     """
     SplitControlSignal = Signal(str)
-    SplitFinish = Signal()
+    SplitFinish = Signal(object)  # emits the timestamp of the final split so the timer stops at the same moment
     SplitReset = Signal()
+    RunEvent = Signal(str, object)  # a control event the run acted on and the time on the timer it happened at, for the journal
+    AttemptEnded = Signal(dict)  # everything about an attempt that was finished, reset or stopped, for the attempt history
+    ComparisonChanged = Signal(str)  # the name of the comparison the splits switched to
 
-    # TODO : Add better support for the strategy adoption
-    def __init__(self, settings: Settings, parent: 'Main'):
+    def __init__(self, settings: Settings, parent: 'Main', time_source: TimeSource = None):
         super().__init__()
         self.settings = settings
+        self.time_source = time_source if time_source is not None else TimeSource()
 
         self.visible_splits = self.settings.settings['visible_splits']
         self.main = parent
@@ -39,14 +51,21 @@ class SplitsWidget(QWidget):
         self.scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.scroll_area.setFrameStyle(QFrame.NoFrame)
 
+        # really long games only draw the splits that are on screen
+        self.split_model = SplitListModel(self)
+        self.split_view = SplitListView(self.split_model, self)
+        self.virtual = False
+
         # we'll want to keep track of these
         self.splits = []
-        self.index = 0  # a way to keep place in our list
         self.curr_time = 0.0
 
-        # add in some bools to track state of the splits
-        self.started = False
-        self.done = False
+        # the run itself lives in the core, this widget just draws it
+        self.run = Run(self.settings.game.splits, self.settings.game.session_attempts, self.settings.game.lifetime_attempts)
+        self.attempt_started_at = None  # the wall clock time in ms the current attempt started at
+
+        # every split reads the time it compares against from here, switching comparisons swaps the array it holds
+        self.comparisons = ComparisonEngine(self.settings.game.splits)
 
         # load the splits in from the settings
         self.load_splits(self.settings.game)
@@ -59,6 +78,7 @@ class SplitsWidget(QWidget):
         self.apply_settings()
 
         self.layout.addWidget(self.scroll_area)
+        self.layout.addWidget(self.split_view)
         self.setLayout(self.layout)
 
     def apply_settings(self):
@@ -68,59 +88,61 @@ class SplitsWidget(QWidget):
         self.visible_splits = self.settings.settings['visible_splits']
         self.setFixedHeight((self.splits[0].height() + 2) * self.visible_splits + 2)
 
+    @property
+    def index(self) -> int:
+        return self.run.index
+
+    @index.setter
+    def index(self, value: int):
+        self.run.index = value
+
+    @property
+    def started(self) -> bool:
+        return self.run.started
+
+    @started.setter
+    def started(self, value: bool):
+        self.run.started = value
+
+    @property
+    def done(self) -> bool:
+        return self.run.done
+
+    @done.setter
+    def done(self, value: bool):
+        self.run.done = value
+
     def get_current_split(self):
         return self.splits[self.index]
 
-    @Slot(int)
-    def increment_split(self, inc: int):
+    def select_split(self, prev_index: int):
         """
-        Go to the next (or more) split(s) and return it
+        Moves the highlight from the previously selected split to the current one and scrolls it into view
 
         Args:
-            inc: (int) the number of splits to increment by
-
-        Returns:
-            (SingleSplitWidget): The split that is currently active
+            prev_index: (int) the index of the split that was selected before
         """
-        curr_time = self.splits[self.index].current_time_ms
-        self.splits[self.index].set_selected(False)
-
-        self.index += inc
-
-        self.splits[self.index].current_start_time = curr_time
+        self.splits[prev_index].set_selected(False)
         self.splits[self.index].set_selected(True)
 
         if self.index >= self.visible_splits:
-            sb = self.scroll_area.verticalScrollBar()  # doing this will allow us to scroll to the next widget
-            sb.setValue((self.splits[self.index].height() + 2) * self.index + 2)
-
-        if self.index >= len(self.splits):  # don't let it leave the array
-            self.index = len(self.splits) - 1
+            self.scroll_to_split(self.index)
+        elif self.index < prev_index:
+            self.scroll_to_split(0)
 
-        return self.splits[self.index]
-
-    @Slot(int)
-    def decrement_split(self, inc: int):
+    def scroll_to_split(self, index: int):
         """
-        Go back a (or more) split(s) and return it
+        Scrolls the list so the given split is at the top
 
         Args:
-            inc: (int) the number of splits to decrement, if it goes negative, hard stop at 0
-
-        Returns:
-            (SingleSplitWidget): The split that is currently active
+            index: (int) the index of the split to scroll to
         """
-        self.splits[self.index].set_selected(False)
+        if self.virtual:
+            self.split_view.scroll_to_row(index)
+            return
 
-        self.index -= inc
         sb = self.scroll_area.verticalScrollBar()  # doing this will allow us to scroll to the next widget
-        sb.setValue((self.splits[self.index].height() + 2) * self.index + 2)
-        self.splits[self.index].set_selected(True)
-
-        if self.index < 0:  # don't let it leave the array
-            self.index = 0
-
-        return self.splits[self.index]
+        sb.setValue(0 if index == 0 else (self.splits[index].height() + 2) * index + 2)
 
     @Slot(int)
     def update_split(self, curr_time: int):
@@ -133,111 +155,117 @@ class SplitsWidget(QWidget):
         self.curr_time = curr_time
 
         if self.started:
+            self.run.update(curr_time)
             self.splits[self.index].update_split(curr_time)
 
-    @Slot(str)
-    def handle_control(self, event: str):
+    @Slot()
+    def refresh(self):
         """
-        An event handler to send all the needed data to the splits themselves
+        Redraws the current split with the time sampled from the time source for this frame
+        """
+        self.update_split(self.time_source.frame_time)
+
+    @Slot(str, object)
+    def handle_control(self, event: str, timestamp_ns: int = None):
+        """
+        Passes the event on to the run and then redraws whatever it changed
 
         Args:
             event: (str) the event to handle from the user
+            timestamp_ns: (int, optional) the perf_counter_ns() stamp of when the input was captured, splits are recorded at this moment
         """
-        current_split = self.get_current_split()
-
-        # pass the control on to the split itself
-        current_split.handle_control(str)
-
-        if event == 'STARTSPLIT':  # if we are splitting, then we ought to move on to the next one
-            if self.splits[self.index].current_time_ms < 0:
-                return  # ignore splits before the time offset finishes
+        if event == 'COMPARISON':
+            self.next_comparison()
+            return
 
-            self.splits[self.index].handle_control(event)
+        prev_index = self.index
+        was_done = self.done
+        in_attempt = self.started and not self.done
 
-            if not self.started:
-                self.index = 0
-                sb = self.scroll_area.verticalScrollBar()
-                sb.setValue(0)
+        time_ms = None
+        if (event == 'STARTSPLIT' and in_attempt) or event in ('PAUSE', 'RESUME'):
+            # record the event at the moment of the keypress, not the last frame or when the event got here
+            time_ms = self.time_source.now() if timestamp_ns is None else self.time_source.time_at(timestamp_ns)
 
-                self.settings.game.session_attempts += 1
-                self.settings.game.lifetime_attempts += 1
-                self.settings.game.GameUpdated.emit(self.settings.game)
+        if event == 'STARTSPLIT' and in_attempt:
+            self.update_split(time_ms)
 
-                if self.done:
-                    for sp in self.splits:
-                        sp.delta_label.setText('')
-                        sp.delta_label.setStyleSheet('color: #bbbbbb;')
-                        sp.time_label.setStyleSheet('color: #bbbbbb;')
+            if self.run.current_time >= 0:
+                self.splits[self.index].handle_control(event)  # draw the finished split before the run saves any golds
 
-                self.started = True
-                self.done = False
-                self.splits[self.index].set_selected(True)  # highlight it once it starts
+        result = self.run.handle(event, time_ms)
 
-            elif not self.done:
-                if self.index == len(self.splits) - 1:
-                    did_pb = self.splits[-1].split.pb_time_ms < self.splits[-1].current_time_ms
+        if result is not None:
+            self.RunEvent.emit(event, time_ms)
 
-                    for sp in self.splits:
-                        if did_pb:
-                            sp.split.pb_time_ms = sp.current_time_ms
-                            sp.split.pb_segment_ms = sp.current_segment_ms
+        if in_attempt and result in (FINISHED, RESET, STOPPED):
+            attempt = self.attempt_record()
+            self.AttemptEnded.emit(attempt)
 
-                        if sp.current_segment_ms < sp.split.gold_segment_ms:
-                            sp.split.gold_segment_ms = sp.current_segment_ms
+            # after the emit so the stats have the attempt too, anything on screen keeps the comparison it was run against
+            self.comparisons.add_attempt(attempt)
 
-                        sp.current_time_ms = 0
-                        sp.current_segment_ms = 0
+        if result == STARTED:
+            self.attempt_started_at = wall_clock_ms(timestamp_ns)
 
-                    # maintain state
-                    self.started = False
-                    self.done = True
-                    self.splits[self.index].set_selected(False)
+            if was_done:
+                for sp in self.splits:
+                    sp.reset_split()
 
-                    self.SplitFinish.emit()
+            self.scroll_to_split(0)
+            self.select_split(prev_index)  # highlight it once it starts
 
-                else:
-                    self.increment_split(1)
+            # the run counts the attempts, the game just holds onto them
+            self.settings.game.set_attempts(self.run.session_attempts, self.run.lifetime_attempts)
 
-        elif event == 'UNSPLIT' and self.started and not self.done:
-            if self.index != 0:
-                self.decrement_split(1)
-                sp = self.splits[self.index + 1]
+        elif result == SPLIT:
+            self.select_split(prev_index)
 
-                sp.current_time_ms = 0
+        elif result == FINISHED:
+            self.splits[self.index].set_selected(False)
 
-                sp.delta_label.setText('')
-                sp.delta_label.setStyleSheet('color: #bbbbbb;')
-                sp.time_label.setStyleSheet('color: #bbbbbb;')
+            self.SplitFinish.emit(timestamp_ns)
+            self.settings.game.set_splits()  # let everyone know about any new pb or golds
 
-                self.splits[self.index].time_label.setStyleSheet('color: #bbbbbb;')
+        elif result == UNSPLIT:
+            self.select_split(prev_index)
 
-        elif event == 'RESET':
-            self.splits[self.index].set_selected(False)
+            self.splits[prev_index].clear_time_state()
 
-            self.index = 0
-            self.started = False
-            self.done = False
+            sp = self.splits[self.index]
+            sp.set_time_state(sp.time_label, '')
 
-            sb = self.scroll_area.verticalScrollBar()
-            sb.setValue(0)
+        elif result == RESET:
+            self.splits[prev_index].set_selected(False)
+            self.scroll_to_split(0)
 
             for sp in self.splits:
                 sp.reset_split()
 
-        elif event == 'STOP':
-            self.splits[self.index].set_selected(False)
-
-            self.index = 0
-            self.started = False
-            self.done = False
+        elif result == STOPPED:
+            self.splits[prev_index].set_selected(False)
+            self.settings.game.set_splits()
 
             for sp in self.splits:
-                # sp.finalize_split()
-                if sp.current_segment_ms != 0 and sp.current_segment_ms < sp.split.gold_segment_ms:
-                    sp.split.gold_segment_ms = sp.current_segment_ms
+                sp.finalize_split()
 
-                sp.current_segment_ms = 0
-                sp.gold_segment_ms = 0
+    def attempt_record(self) -> dict:
+        """
+        Builds the attempt history entry for the attempt that just ended
+
+        Returns:
+            (dict) the game, category, when it started, the timer offset, and the split times, pauses and reset index from the run
+        """
+        attempt = {
+            'game': self.settings.game.title,
+            'category': self.settings.game.sub_title,
+            'attempt': self.run.lifetime_attempts,
+            'started_at': self.attempt_started_at,
+            'offset': self.time_source.offset
+        }
+        attempt.update(self.run.last_attempt)
+
+        return attempt
 
     def export_splits(self, indent: str = '    ', depth: int = 0) -> str:
         """
@@ -267,7 +295,7 @@ class SplitsWidget(QWidget):
         Args:
             game: (Models.Game) the game object that we are building the GUI from
         """
-        self.load_splits_from_list(game.splits)
+        self.load_splits_from_game(game)
 
     def load_splits_from_list(self, splits: list[Split]):
         """
@@ -275,64 +303,208 @@ class SplitsWidget(QWidget):
         Args:
             splits: (list[Models.Game.Split]) the list of splits to load into our split widget
         """
-        pb_segment_total = 0
-        gold_segment_total = 0
-
         self.remove_all_splits()
+        self.run.set_splits(splits)  # keeps the run going if these are the splits we are already on
+        self.comparisons.set_splits(splits)
+
+        self.virtual = len(splits) > self.settings.settings.get('virtual_split_threshold', VIRTUAL_SPLIT_THRESHOLD)
 
         # create the new splits, and add them to the screen
         for i in range(len(splits)):
             split = splits[i]
 
-            pb_segment_total += split.pb_segment_ms
-            gold_segment_total += split.gold_segment_ms
-
-            tmp = SingleSplitWidget(split, split_pb_strategy, parent=self)
-            tmp.pb_segment_total = pb_segment_total
-            tmp.gold_segment_total = gold_segment_total
+            if self.virtual:
+                tmp = SplitRow(split, parent=self, index=i, model=self.split_model)
+            else:
+                tmp = SingleSplitWidget(split, parent=self, index=i)
+                self.scroll_widget_layout.addWidget(tmp)
 
             self.splits.append(tmp)
-            self.scroll_widget_layout.addWidget(tmp)
+
+        if self.virtual:
+            self.split_model.set_rows(self.splits)
+
+        self.scroll_area.setVisible(not self.virtual)
+        self.split_view.setVisible(self.virtual)
+
+        if self.started:
+            self.splits[self.index].set_selected(True)
 
     def load_splits_from_game(self, game: Game):
+        self.run.session_attempts = game.session_attempts
+        self.run.lifetime_attempts = game.lifetime_attempts
+
         self.load_splits_from_list(game.splits)
 
-    def load_splits_from_json(self, json: dict[str]):
-        pb_segment_total = 0
-        gold_segment_total = 0
+    @Slot(int, int)
+    def update_attempts(self, session_attempts: int, lifetime_attempts: int):
+        """
+        Keeps the run's attempt counters in line with the game's
 
-        self.remove_all_splits()
+        Args:
+            session_attempts: (int) the number of attempts since the app was opened
+            lifetime_attempts: (int) the number of attempts ever
+        """
+        self.run.session_attempts = session_attempts
+        self.run.lifetime_attempts = lifetime_attempts
 
-        # create the new splits, and add them to the screen
-        for split in json:
-            pb_segment_total += split.pb_segment_ms
-            gold_segment_total += split.gold_segment_ms
+    @Slot(int, int)
+    def insert_splits(self, first: int, count: int):
+        """
+        Adds widgets for splits that were added to the game, without touching the rest
 
-            tmp = SingleSplitWidget(split, split_pb_strategy, parent=self)
-            tmp.pb_segment_total = pb_segment_total
-            tmp.gold_segment_total = gold_segment_total
+        Args:
+            first: (int) the index of the first new split
+            count: (int) the number of splits that were added
+        """
+        splits = self.settings.game.splits
+        self.run.set_splits(splits)
+        self.comparisons.set_splits(splits)
 
-            self.splits.append(tmp)
-            self.scroll_widget_layout.addWidget(tmp)
+        if self.virtual or len(splits) > self.settings.settings.get('virtual_split_threshold', VIRTUAL_SPLIT_THRESHOLD):
+            self.load_splits_from_list(splits)  # the rows are cheap to remake, and we may need to swap over to the list view
+            return
 
-    def remove_all_splits(self):
+        for i in range(first, first + count):
+            tmp = SingleSplitWidget(splits[i], parent=self, index=i)
+
+            self.splits.insert(i, tmp)
+            self.scroll_widget_layout.insertWidget(i, tmp)
+
+        self._reindex_splits(first + count)
+
+    @Slot(int, int)
+    def remove_splits(self, first: int, count: int):
         """
-        clear out the splits from the widget
+        Removes the widgets for splits that were removed from the game, without touching the rest
+
+        Args:
+            first: (int) the index of the first removed split
+            count: (int) the number of splits that were removed
         """
-        for split in self.splits:
+        splits = self.settings.game.splits
+        self.run.set_splits(splits)
+        self.comparisons.set_splits(splits)
+
+        if self.virtual:
+            self.load_splits_from_list(splits)
+            return
+
+        for split in self.splits[first:first + count]:
             self.scroll_widget_layout.removeWidget(split)
             split.setParent(None)
             split.deleteLater()
 
+        del self.splits[first:first + count]
+
+        self._reindex_splits(first)
+
+    @Slot(list)
+    def update_split_names(self, indexes: list[int]):
+        """
+        Shows the new names of the given splits
+
+        Args:
+            indexes: (list[int]) the indexes of the splits that were renamed
+        """
+        for i in indexes:
+            self.splits[i].split_name_label.setText(self.splits[i].split.split_name)
+
+    @Slot(list)
+    def update_split_times(self, indexes: list[int]):
+        """
+        Builds the comparisons that come from the saved times again, and shows any comparison times that changed
+        unless a run is on screen
+
+        Args:
+            indexes: (list[int]) the indexes of the splits whose saved times changed
+        """
+        before = self.comparisons.current
+        self.comparisons.set_splits(self.settings.game.splits)
+
+        if self.started or self.done:
+            return  # the run's times are showing, the new ones show up when it is reset
+
+        after = self.comparisons.current
+
+        # a changed segment moves the time of every split after it in some comparisons, so check them all
+        for i in range(min(len(after), len(self.splits))):
+            if i >= len(before) or before[i] != after[i]:
+                self.splits[i].finalize_split()
+
+    @Slot(str)
+    def set_comparison(self, name: str):
+        """
+        Switches the comparison every split is drawn against
+
+        Args:
+            name: (str) one of Core.Comparisons.COMPARISONS
+        """
+        self.comparisons.set_comparison(name)
+        self.show_comparison()
+
+    @Slot()
+    def next_comparison(self):
+        """
+        Switches to the next comparison, for the hotkey
+        """
+        self.comparisons.next_comparison()
+        self.show_comparison()
+
+    def show_comparison(self):
+        """
+        Redraws every split against the current comparison, nothing is rebuilt
+        """
+        for sp in self.splits:
+            sp.show_comparison()
+
+        self.ComparisonChanged.emit(self.comparisons.name)
+
+    def set_comparison_stats(self, stats: SegmentStatsEngine):
+        """
+        Takes the segment stats the average, median and balanced comparisons are built from
+
+        Args:
+            stats: (SegmentStatsEngine) the stats, for the same splits as the game
+        """
+        if self.comparisons.set_stats(stats):
+            self.show_comparison()
+
+    def _reindex_splits(self, first: int):
+        """
+        Fixes up the index on every split from the given one on
+        """
+        for i in range(first, len(self.splits)):
+            self.splits[i].index = i
+
+    def load_splits_from_json(self, json: list[dict]):
+        """
+        Loads in splits from their JSON dictionaries
+
+        Args:
+            json: (list[dict]) the JSON representation of each split
+        """
+        self.load_splits_from_list(SplitTable.from_json(json))
+
+    def remove_all_splits(self):
+        """
+        clear out the splits from the widget
+        """
+        if self.virtual:
+            self.split_model.set_rows([])
+        else:
+            for split in self.splits:
+                self.scroll_widget_layout.removeWidget(split)
+                split.setParent(None)
+                split.deleteLater()
+
         self.splits = []
 
     def reset_splits(self):
         """
         Resets the splits back to an unstarted state
         """
-        self.index = 0
-        self.started = False
-        self.done = False
+        self.run.reset()
 
         for sp in self.splits:
             sp.reset_split()
@@ -341,29 +513,8 @@ class SplitsWidget(QWidget):
         """
         Update the splits to ensure they stay up to date as to the best times vs. current times
         """
-        self.index = 0
-        self.started = False
-        self.done = False
+        self.run.stop()  # saves the golds for anything we finished
 
-        # for each split, if the current time is better than the best, reset it
         for sp in self.splits:
-            if sp.current_time_ms < sp.gold_time_ms:
-                sp.gold_time_ms = sp.current_time_ms
-
-            if sp.current_time_ms < sp.pb_time_ms:
-                sp.pb_time_ms = sp.current_time_ms
-
             sp.reset_split()
 
-
-# different split display time strategies
-def split_pb_strategy(split: Split):
-    return split.pb_time_ms
-
-
-def split_pb_segment_strategy(split: Split):
-    return split.pb_segment_total_ms
-
-
-def split_gold_segement_strategy(split: Split):
-    return split.gold_segment_total_ms
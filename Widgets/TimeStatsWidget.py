@@ -1,20 +1,468 @@
-from PySide6.QtWidgets import QWidget, QLabel, QSizePolicy, QVBoxLayout, QFrame
-from PySide6.QtCore import Slot
+from PySide6.QtWidgets import QWidget, QLabel, QSizePolicy, QVBoxLayout, QHBoxLayout, QFrame
+from PySide6.QtCore import Slot, Signal, QObject, QThread
 
+from Core import PBChance
+from Core.AttemptHistory import AttemptHistory
+from Core.PBChance import PBChanceEstimator, DEFAULT_TRIALS, DEFAULT_BUDGET_MS
+from Core.Run import Run
+from Core.SegmentStats import SegmentStatsEngine, GoldSums
+from Core.TimeSource import TimeSource
 from helpers.TimerFormat import format_wall_clock_from_ms
+from Styling.Settings import Settings
 
+# the stats the footer can show, the key they are turned on or off by in the settings and the name shown next to them
+STATS = {
+    'comparison': 'Comparison',
+    'sum_of_best': 'Sum of Best',
+    'best_possible': 'Best Possible Time',
+    'time_save': 'Possible Time Save',
+    'pb_chance': 'PB Chance',
+    'average': 'Average',
+    'median': 'Median'
+}
+
+
+class _StatLine(QFrame):
+    """
+    One line of the footer, the name of the stat on the left and its value on the right
+    """
+    def __init__(self, name: str, parent=None):
+        super().__init__(parent)
+
+        self.layout = QHBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+
+        self.name_label = QLabel(name, self)
+        self.name_label.setObjectName('StatNameLabel')
+
+        self.value_label = QLabel('-', self)
+        self.value_label.setObjectName('StatValueLabel')
+        self.value_label.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Fixed)
+
+        self.layout.addWidget(self.name_label)
+        self.layout.addStretch()
+        self.layout.addWidget(self.value_label)
+
+    def set_time(self, time_ms: int):
+        """
+        Shows the time, or a dash if there isn't one yet
+
+        Args:
+            time_ms: (int) the time in milliseconds, 0 if there isn't one
+        """
+        self.set_text(format_wall_clock_from_ms(time_ms) if time_ms > 0 else '-')
+
+    def set_text(self, text: str):
+        if text != self.value_label.text():
+            self.value_label.setText(text)
+
+
+def _read_attempts(path: str, game: str, category: str, before: int) -> list[dict]:
+    """
+    Reads a game's attempts with a history of its own, so it can be done off the GUI thread while the GUI's history
+    keeps appending
+    """
+    if path is None:
+        return []
+
+    history = AttemptHistory(path)
+
+    try:
+        return list(history.attempts(game, category, before=before))
+    finally:
+        history.close()
+
+
+class _StatsWorker(QObject):
+    """
+    Builds the segment stats and the PB chance estimator from the attempt history on its own thread, and owns the
+    estimator after, everything is handed to it through queued signals so it is only ever touched from that thread
+
+    The segment stats it builds are handed back to the GUI thread and never touched here again.
+    """
+    Loaded = Signal(int, object)  # the load it answers, and the SegmentStatsEngine it built
+    Estimated = Signal(int, object)  # the request it answers, and the chance or None
 
-class TimeStatsWidget(QWidget):
     def __init__(self):
         super().__init__()
+        self.estimator = None  # until the first load, and always without numpy
+        self.latest = 0  # the newest request, set from the GUI thread so requests that were overtaken are skipped
+        self.latest_load = 0  # the same for loads
+
+    @Slot(int, object)
+    def load(self, request: int, kwargs: dict):
+        """
+        Builds everything from the attempt history, anything queued after this was asked for applies on top of it
+        """
+        if request != self.latest_load:
+            return  # another load is queued behind this one
+
+        attempts = _read_attempts(kwargs['path'], kwargs['game'], kwargs['category'], kwargs['before'])
+        split_count = kwargs['split_count']
+
+        if PBChance.available():
+            self.estimator = PBChanceEstimator.from_attempts(split_count, attempts, kwargs['golds'], kwargs['pb_time_ms'])
+
+        self.Loaded.emit(request, SegmentStatsEngine.from_attempts(split_count, attempts, kwargs['golds']))
+
+    @Slot(dict)
+    def add_attempt(self, attempt: dict):
+        if self.estimator is not None:
+            self.estimator.add_attempt(attempt)
+
+    @Slot(list, int)
+    def set_golds(self, golds: list, pb_time_ms: int):
+        if self.estimator is not None:
+            self.estimator.set_golds(golds, pb_time_ms)
+
+    @Slot(int, int)
+    def insert_segments(self, first: int, count: int):
+        if self.estimator is not None:
+            self.estimator.insert_segments(first, count)
+
+    @Slot(int, int)
+    def remove_segments(self, first: int, count: int):
+        if self.estimator is not None:
+            self.estimator.remove_segments(first, count)
+
+    @Slot(int, object)
+    def estimate(self, request: int, kwargs: dict):
+        if request != self.latest:
+            return
+
+        chance = self.estimator.estimate(**kwargs)[0] if self.estimator is not None else None
+        self.Estimated.emit(request, chance)
+
+
+class TimeStatsWidget(QWidget):
+    """
+    The footer under the timer, shows the totals the segment stats engine keeps for the whole game
+
+    The best possible time and possible time save move with the run, they are read from the gold sums each frame so
+    a frame costs the same no matter how many splits there are. The segment stats and the PB chance estimator are built
+    from the attempt history on a worker thread, so a long history never holds up the window, and the PB chance is
+    worked out there too, only when the run splits or unsplits. When splits are added or removed the stats are moved
+    around to match instead of being built again.
+    """
+    StatsChanged = Signal(object)  # the SegmentStatsEngine, whenever it is swapped out or its splits move
+
+    _Load = Signal(int, object)
+    _AddAttempt = Signal(dict)
+    _SetGolds = Signal(list, int)
+    _InsertSegments = Signal(int, int)
+    _RemoveSegments = Signal(int, int)
+    _Estimate = Signal(int, object)
+
+    def __init__(self, settings: Settings, history: AttemptHistory = None, run: Run = None, time_source: TimeSource = None):
+        """
+        Args:
+            settings: (Settings) the settings, and the game the stats are for
+            history: (AttemptHistory, optional) the game's attempt history, the stats are built from it
+            run: (Run, optional) the run in progress, for the stats that move with it
+            time_source: (TimeSource, optional) where the time for each frame is sampled from
+        """
+        super().__init__()
+        self.settings = settings
+        self.stats = SegmentStatsEngine(len(settings.game.splits))  # empty until the history is loaded
+        self.history = history
+        self.run = run
+        self.time_source = time_source
+
+        self.golds = GoldSums()
+        self.load_golds()
+
+        self.pb_chance_available = PBChance.available()  # without numpy there is no pb chance, but the stats still load
+        self._request = 0
+        self._load_request = 0
+        self._pending = []  # (method, args) done to the stats since the load was asked for, to do again to what it builds
+
+        self.stats_worker = _StatsWorker()
+        self.stats_thread = QThread()
+        self.stats_worker.moveToThread(self.stats_thread)
+
+        self._Load.connect(self.stats_worker.load)
+        self._AddAttempt.connect(self.stats_worker.add_attempt)
+        self._SetGolds.connect(self.stats_worker.set_golds)
+        self._InsertSegments.connect(self.stats_worker.insert_segments)
+        self._RemoveSegments.connect(self.stats_worker.remove_segments)
+        self._Estimate.connect(self.stats_worker.estimate)
+        self.stats_worker.Loaded.connect(self.stats_loaded)
+        self.stats_worker.Estimated.connect(self.show_pb_chance)
+
+        self.stats_thread.start()
 
         self.layout = QVBoxLayout()
 
-        self.sob_label = QLabel("FOO", self)
+        self.lines = {key: _StatLine(name, self) for key, name in STATS.items()}
 
         # add everything to the layout
-        self.layout.addWidget(self.sob_label)
+        for line in self.lines.values():
+            self.layout.addWidget(line)
 
         # finish up and set everything properly
         self.setLayout(self.layout)
         self.setObjectName("TimerStatsWidget")
+
+        self.apply_settings()
+        self.refresh_stats()
+        self.refresh()
+        self.load_stats()
+
+    @Slot()
+    def apply_settings(self):
+        """
+        Shows only the stats that are turned on in the settings
+        """
+        shown = self.settings.settings.get('stats', {})
+
+        for key, line in self.lines.items():
+            line.setVisible(shown.get(key, True))
+
+        self.lines['pb_chance'].setVisible(shown.get('pb_chance', True) and self.pb_chance_available)
+
+    @property
+    def loading(self) -> bool:
+        """
+        Whether the worker is still building the stats from the history
+        """
+        return self._load_request != 0
+
+    @Slot()
+    def load_stats(self):
+        """
+        Has the worker build the segment stats and PB chance estimator from the attempt history, for when the game is
+        swapped out. The stats shown until then carry on as they are.
+
+        Only the attempts already in the history are read, any that end after this reach the new stats after the load.
+        """
+        game = self.settings.game
+        self.load_golds()
+
+        self._request += 1  # anything asked of the old estimator is moot
+        self._load_request = self._request
+        self.stats_worker.latest_load = self._load_request
+        self._pending = []
+
+        self._Load.emit(self._load_request, {
+            'path': self.history.path if self.history is not None else None,
+            'before': self.history.size() if self.history is not None else 0,
+            'game': game.title,
+            'category': game.sub_title,
+            'split_count': len(self.golds),
+            'golds': list(self.golds.golds),
+            'pb_time_ms': self.golds.pb_time_ms
+        })
+
+    @Slot(int, object)
+    def stats_loaded(self, request: int, stats: SegmentStatsEngine):
+        """
+        Swaps in the stats the worker built, once whatever happened while it was building is done to them too
+        """
+        if request != self._load_request:
+            return  # a newer load is on its way
+
+        for method, args in self._pending:
+            getattr(stats, method)(*args)
+
+        self._pending = []
+        self._load_request = 0
+
+        for i, split in enumerate(self.settings.game.splits[:len(stats)]):
+            stats.offer_best(i, split.gold_segment_ms)  # any golds saved while it was loading
+
+        self.stats = stats
+        self.refresh_stats()
+        self.refresh()
+
+        self.StatsChanged.emit(stats)
+        self.request_pb_chance()
+
+    def _change_stats(self, method: str, *args):
+        """
+        Does something to the stats, and again to the ones being loaded once they're here
+        """
+        getattr(self.stats, method)(*args)
+
+        if self.loading:
+            self._pending.append((method, args))
+
+    def load_golds(self) -> bool:
+        """
+        Takes the golds and pb from the game, the sums are only worked out again if a gold changed
+
+        Returns:
+            (bool) whether any gold changed
+        """
+        splits = self.settings.game.splits
+        self.golds.pb_time_ms = splits[-1].pb_time_ms if len(splits) else 0
+
+        return self.golds.set_golds(split.gold_segment_ms for split in splits)
+
+    @Slot(dict)
+    def add_attempt(self, attempt: dict):
+        """
+        Adds the segments of an attempt that just ended to the stats and shows the new totals
+
+        Args:
+            attempt: (dict) the attempt, as it is added to the attempt history
+        """
+        self._change_stats('add_attempt', attempt)
+        self.refresh_stats()
+
+        # the next attempt starts from the top, with this one's times in the history too
+        self._AddAttempt.emit(attempt)
+        self.request_pb_chance()
+
+    @Slot(int, int)
+    def insert_splits(self, first: int, count: int):
+        """
+        Moves the stats along for splits that were added to the game, the new ones start without any history
+
+        Args:
+            first: (int) where the first new split is
+            count: (int) how many were added
+        """
+        self._change_stats('insert_segments', first, count)
+        self._InsertSegments.emit(first, count)
+        self._splits_moved()
+
+    @Slot(int, int)
+    def remove_splits(self, first: int, count: int):
+        """
+        Drops the stats of splits that were removed from the game
+
+        Args:
+            first: (int) where the first removed split was
+            count: (int) how many were removed
+        """
+        self._change_stats('remove_segments', first, count)
+        self._RemoveSegments.emit(first, count)
+        self._splits_moved()
+
+    def _splits_moved(self):
+        splits = self.settings.game.splits
+
+        if len(splits) != len(self.stats):
+            return  # the game sends the removes and adds of one change back to back, wait for the last of them
+
+        for i, split in enumerate(splits):
+            self.stats.offer_best(i, split.gold_segment_ms)
+
+        self.load_golds()
+        self._SetGolds.emit(list(self.golds.golds), self.golds.pb_time_ms)
+
+        self.refresh_stats()
+        self.refresh()
+
+        self.StatsChanged.emit(self.stats)
+        self.request_pb_chance()
+
+    @Slot(list)
+    def update_golds(self, indexes: list[int]):
+        """
+        Counts any golds that were changed in the game towards the best segments
+
+        Args:
+            indexes: (list[int]) the splits whose saved times changed
+        """
+        splits = self.settings.game.splits
+
+        for i in indexes:
+            if i < len(self.stats):
+                self.stats.offer_best(i, splits[i].gold_segment_ms)
+
+        pb_time_ms = self.golds.pb_time_ms
+
+        if self.load_golds() or self.golds.pb_time_ms != pb_time_ms:
+            self._SetGolds.emit(list(self.golds.golds), self.golds.pb_time_ms)
+            self.request_pb_chance()  # anything asked for before this was against the old pb
+
+        self.refresh_stats()
+        self.refresh()
+
+    @Slot()
+    def refresh_stats(self):
+        """
+        Shows the latest totals, each one is a lookup of a running total so this is cheap no matter how long the game is
+        """
+        self.lines['sum_of_best'].set_time(self.golds.sum_of_best())
+        self.lines['average'].set_time(self.stats.average_time())
+        self.lines['median'].set_time(self.stats.median_time())
+
+    @Slot()
+    def refresh(self):
+        """
+        Redraws the best possible time and possible time save with the time sampled from the time source for this frame
+        """
+        run = self.run
+
+        if run is None or self.time_source is None or not run.started or run.done:
+            best = self.golds.sum_of_best()
+        else:
+            best = self.golds.best_possible_time(run.index, run.start_times[run.index], self.time_source.frame_time)
+
+        self.lines['best_possible'].set_time(best)
+        self.lines['time_save'].set_time(self.golds.possible_time_save(best))
+
+    @Slot(str)
+    def show_comparison(self, name: str):
+        """
+        Shows which comparison the splits are being drawn against
+
+        Args:
+            name: (str) the comparison's name
+        """
+        self.lines['comparison'].set_text(name)
+
+    @Slot(str, object)
+    def handle_run_event(self, event: str, time_ms: int = None):
+        """
+        Works the PB chance out again when the run moves to another split, it doesn't change between splits
+
+        Args:
+            event: (str) the control event the run acted on
+            time_ms: (int, optional) the time on the timer it happened at
+        """
+        if event in ('STARTSPLIT', 'UNSPLIT'):
+            self.request_pb_chance(time_ms)
+
+    def request_pb_chance(self, time_ms: int = None):
+        """
+        Asks the worker for the PB chance from where the run is now, any answer still to come for an older ask is dropped
+
+        Args:
+            time_ms: (int, optional) the time on the timer now, for how long the current segment has already taken
+        """
+        if not self.pb_chance_available:
+            return
+
+        run = self.run
+
+        if run is None or not run.started or run.done:
+            index, start_ms, elapsed_ms = 0, 0, 0
+        else:
+            index, start_ms = run.index, run.start_times[run.index]
+            elapsed_ms = max(0, (time_ms if time_ms is not None else run.split_times[run.index]) - start_ms)
+
+        self._request += 1
+        self.stats_worker.latest = self._request
+
+        self._Estimate.emit(self._request, {
+            'index': index,
+            'start_ms': start_ms,
+            'elapsed_ms': elapsed_ms,
+            'trials': self.settings.settings.get('pb_chance_trials', DEFAULT_TRIALS),
+            'budget_ms': self.settings.settings.get('pb_chance_budget_ms', DEFAULT_BUDGET_MS)
+        })
+
+    @Slot(int, object)
+    def show_pb_chance(self, request: int, chance: float = None):
+        if request == self._request:
+            self.lines['pb_chance'].set_text('-' if chance is None else f'{chance:.1%}')
+
+    def stop_worker(self):
+        """
+        Stops the stats thread, for when the app is closing
+        """
+        self.stats_thread.quit()
+        self.stats_thread.wait()
@@ -1,9 +1,11 @@
 from PySide6.QtGui import QPalette
-from PySide6.QtWidgets import QLabel, QSizePolicy, QVBoxLayout, QFrame
+from PySide6.QtWidgets import QSizePolicy, QVBoxLayout, QFrame
 from PySide6.QtCore import Slot, Qt
 
+from Core.TimeSource import TimeSource
+from Widgets.GlyphTimerLabel import GlyphTimerLabel
 from Widgets.SplitsWidget import SplitsWidget
-from helpers.TimerFormat import format_wall_clock_from_ms
+from helpers.TimerFormat import WallClockFormatter
 
 
 class TimerWidget(QFrame):
@@ -19,14 +21,16 @@ class TimerWidget(QFrame):
         label.style().polish(label)
         label.update()
 
-    def __init__(self, splits_widget: SplitsWidget):
+    def __init__(self, splits_widget: SplitsWidget, time_source: TimeSource = None):
         super().__init__()
 
         self.layout = QVBoxLayout()
         self._negative = None
         self._splits_widget = splits_widget
+        self._time_source = time_source if time_source is not None else splits_widget.time_source
+        self._formatter = WallClockFormatter()
 
-        self.main_timer_label = QLabel("", self)
+        self.main_timer_label = GlyphTimerLabel("", self)  # redrawn every frame, so it paints from cached glyphs instead of being a QLabel
         self.main_timer_label.setObjectName('TimerLabel')
         self.main_timer_label.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
 
@@ -42,7 +46,7 @@ class TimerWidget(QFrame):
 
     @Slot(int)
     def update_time(self, time: int):
-        timer_string = format_wall_clock_from_ms(time)
+        timer_string = self._formatter(time)
 
         if time < 0 and not self._negative and self._splits_widget.started:
             self.set_negative(True)
@@ -51,3 +55,17 @@ class TimerWidget(QFrame):
             self.set_negative(False)
 
         self.main_timer_label.setText(timer_string)
+
+    @Slot()
+    def update_style(self):
+        """
+        Has the timer label re-render its glyphs, since the stylesheet may have changed its font or color
+        """
+        self.main_timer_label.invalidate_glyphs()
+
+    @Slot()
+    def refresh(self):
+        """
+        Redraws the timer with the time sampled from the time source for this frame
+        """
+        self.update_time(self._time_source.frame_time)
@@ -77,6 +77,16 @@ class TitleWidget(QFrame):
         if lifetime_attempts is not None:
             self.lifetime_attempts_label.setText(str(lifetime_attempts))
 
+    def update_attempts(self, session_attempts: int, lifetime_attempts: int):
+        """
+        Updates just the attempt counters, for when a run starts
+
+        Args:
+            session_attempts: (int) The number of attempts done since opening the app today
+            lifetime_attempts: (int) The total number of times this game has been run
+        """
+        self.update(session_attempts=session_attempts, lifetime_attempts=lifetime_attempts)
+
     def update_from_game(self, game: Game):
         """
         Updates the title widget with the currently saved game information
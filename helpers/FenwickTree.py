@@ -0,0 +1,72 @@
+"""
+A Fenwick (binary indexed) tree, for running totals that need to stay correct while values in the middle change
+"""
+from array import array
+from typing import Iterable
+
+
+class FenwickTree:
+    """
+    Keeps prefix sums of a list of ints, both changing a value and summing up to any index take O(log n)
+    """
+    def __init__(self, values: Iterable[int] = ()):
+        """
+        Builds the tree in O(n)
+
+        Args:
+            values: (Iterable[int]) the starting values
+        """
+        self._tree = array('q', [0])  # 1 based, index 0 is never used
+        self._tree.extend(values)
+
+        size = len(self._tree)
+
+        for i in range(1, size):
+            parent = i + (i & -i)
+
+            if parent < size:
+                self._tree[parent] += self._tree[i]
+
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+
+    def add(self, index: int, delta: int):
+        """
+        Adds to the value at the given index
+
+        Args:
+            index: (int) the 0 based index of the value to change
+            delta: (int) how much to add to it
+        """
+        i = index + 1
+        size = len(self._tree)
+
+        while i < size:
+            self._tree[i] += delta
+            i += i & -i
+
+    def prefix_sum(self, index: int) -> int:
+        """
+        Sums every value up to and including the given index
+
+        Args:
+            index: (int) the 0 based index of the last value to include, -1 for an empty sum
+
+        Returns:
+            (int) the total
+        """
+        total = 0
+        i = min(index + 1, len(self._tree) - 1)
+
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+
+        return total
+
+    def total(self) -> int:
+        """
+        Returns:
+            (int) the sum of every value
+        """
+        return self.prefix_sum(len(self) - 1)
@@ -0,0 +1,68 @@
+"""
+Helpers for writing files so a crash part way through a save can never leave a half written file behind
+"""
+from __future__ import annotations
+
+import os
+import stat
+import tempfile
+
+
+def atomic_write(path: str, data: str | bytes):
+    """
+    Writes the data to a temporary file next to the path, syncs it to disk, and then renames it over the path, so the file
+    is always either the old contents or the new contents
+
+    Args:
+        path: (str) the file to write
+        data: (str | bytes) what to write to it, strings are written as UTF-8
+    """
+    path = os.fspath(path)
+    directory = os.path.dirname(os.path.abspath(path))
+
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+
+    try:
+        # keep the permissions of the file we are replacing
+        if os.path.exists(path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        else:
+            os.chmod(tmp_path, 0o644)
+
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+        os.replace(tmp_path, path)
+
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+        raise
+
+    fsync_directory(directory)
+
+
+def fsync_directory(directory: str):
+    """
+    Syncs a directory so a rename in it survives a power loss, this isn't possible on windows so it does nothing there
+
+    Args:
+        directory: (str) the directory to sync
+    """
+    if os.name != 'posix':
+        return
+
+    fd = os.open(directory, os.O_RDONLY)
+
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -0,0 +1,432 @@
+"""
+Imports and exports LiveSplit .lss splits, along with their attempt history
+
+Both directions stream, the import reads the XML with iterparse and throws away each attempt and segment once it has
+been read, and the export writes each element as it goes, so neither ever holds the whole document. The import keeps
+only what ends up in the game and history, packed into arrays, and the export reads the history again for each chunk of
+segments, so it never holds more than MAX_HISTORY_CELLS segment times.
+
+Import with: python -m helpers.LiveSplit import RUN.lss GAME.json
+Export with: python -m helpers.LiveSplit export GAME.json RUN.lss
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import xml.etree.ElementTree as ET
+from array import array
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterable
+from xml.sax.saxutils import XMLGenerator
+
+from helpers.FileHelpers import atomic_write
+
+LSS_VERSION = '1.7.0'
+COMPARISON = 'Personal Best'  # the split times LiveSplit keeps the pb in
+DATE_FORMAT = '%m/%d/%Y %H:%M:%S'  # LiveSplit's attempt dates, always in UTC
+INDENT = '  '
+MAX_HISTORY_CELLS = 1_000_000  # the most segment times the export holds at once, longer histories take more passes
+
+
+def parse_time(text: str) -> int | None:
+    """
+    Reads a LiveSplit time, a .NET TimeSpan like -00:00:05, 01:02:03.4560000 or 1.02:03:04.5
+
+    Args:
+        text: (str) the time, or None for an element without one
+
+    Returns:
+        (int | None) the time in ms, or None if there isn't one
+    """
+    if not text or not text.strip():
+        return None
+
+    text = text.strip()
+    sign = -1 if text.startswith('-') else 1
+    text = text.lstrip('-')
+
+    hours, minutes, seconds = text.split(':')
+    days, _, hours = hours.rpartition('.')  # whole days come before the hours
+
+    ms = round(float(seconds) * 1000) + (int(minutes) * 60 + int(hours) * 3600 + int(days or 0) * 86_400) * 1000
+
+    return sign * ms
+
+
+def format_time(ms: int) -> str:
+    """
+    Writes a time the way LiveSplit does, eg: 01:02:03.4560000
+
+    Args:
+        ms: (int) the time in ms
+
+    Returns:
+        (str) the time
+    """
+    sign = '-' if ms < 0 else ''
+    ms = abs(ms)
+
+    hours, ms = divmod(ms, 3_600_000)
+    minutes, ms = divmod(ms, 60_000)
+    seconds, ms = divmod(ms, 1000)
+
+    return f'{sign}{hours:02}:{minutes:02}:{seconds:02}.{ms:03}0000'
+
+
+def parse_date(text: str) -> int | None:
+    """
+    Returns:
+        (int | None) the wall clock time in ms of a LiveSplit date, or None if there isn't a readable one
+    """
+    try:
+        return round(datetime.strptime(text, DATE_FORMAT).replace(tzinfo=timezone.utc).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+def format_date(wall_clock_ms: int) -> str:
+    return datetime.fromtimestamp(wall_clock_ms / 1000, timezone.utc).strftime(DATE_FORMAT)
+
+
+def _real_time(element: ET.Element) -> int | None:
+    return parse_time(element.findtext('RealTime')) if element is not None else None
+
+
+def read_lss(path: str | Path) -> tuple[dict, list[dict]]:
+    """
+    Reads a .lss file into a game and its attempts, without ever building the whole document
+
+    A split that was skipped in an attempt has no time of its own in PySplit, so the attempt is kept as reset at the
+    first split it skipped.
+
+    Args:
+        path: (str | Path) the .lss file
+
+    Returns:
+        (tuple[dict, list[dict]]) the game's JSON, ready for Game.from_json, and its attempts oldest first, in the same
+            shape as the records the splits widget adds to the attempt history
+    """
+    game = {'title': '', 'sub_title': '', 'lifetime_attempts': 0, 'start_offset': 0.0, 'display_pb': True, 'splits': []}
+
+    attempts = {}  # id -> [started_at, finished, split_times, still going], in the order LiveSplit lists them
+    segment_count = 0
+    stack = []  # the elements that have started but not ended, so a finished one can be taken out of its parent
+
+    for event, element in ET.iterparse(str(path), events=('start', 'end')):
+        if event == 'start':
+            stack.append(element)
+            continue
+
+        stack.pop()
+        parent = stack[-1] if stack else None
+        tag = element.tag
+
+        if len(stack) == 1:  # the run's own values
+            if tag == 'GameName':
+                game['title'] = element.text or ''
+            elif tag == 'CategoryName':
+                game['sub_title'] = element.text or ''
+            elif tag == 'Offset':
+                game['start_offset'] = (parse_time(element.text) or 0) / 1000
+            elif tag == 'AttemptCount':
+                game['lifetime_attempts'] = int(element.text or 0)
+
+        elif tag == 'Attempt':
+            attempts[int(element.get('id'))] = [parse_date(element.get('started')), element.find('RealTime') is not None, array('q'), True]
+            parent.remove(element)
+
+        elif tag == 'Segment':
+            pb_time = _real_time(next((t for t in element.iterfind('SplitTimes/SplitTime') if t.get('name') == COMPARISON), None))
+
+            game['splits'].append({
+                'split_name': element.findtext('Name') or '',
+                'pb_time_ms': pb_time or 0,
+                'pb_segment_ms': 0,  # worked out once every pb time is in
+                'gold_segment_ms': _real_time(element.find('BestSegmentTime')) or 0
+            })
+
+            # each attempt that got through this segment has a time for it, a skipped one has an empty time
+            for time in element.iterfind('SegmentHistory/Time'):
+                attempt = attempts.get(int(time.get('id')))
+
+                if attempt is None or not attempt[3] or len(attempt[2]) != segment_count:
+                    continue  # history from before the attempts were kept, or an attempt that already stopped
+
+                segment_ms = _real_time(time)
+
+                if segment_ms is None:
+                    attempt[3] = False
+                else:
+                    attempt[2].append((attempt[2][-1] if attempt[2] else 0) + segment_ms)
+
+            segment_count += 1
+            parent.remove(element)
+
+    # the pb segments come from the pb times, but only while every split before has one
+    prev = 0
+    for split in game['splits']:
+        split['pb_segment_ms'] = split['pb_time_ms'] - prev if split['pb_time_ms'] and prev >= 0 else 0
+        prev = split['pb_time_ms'] if split['pb_time_ms'] else -1
+
+    records = []
+
+    for attempt_id, (started_at, finished, split_times, _) in attempts.items():
+        finished = finished and len(split_times) == segment_count
+
+        records.append({
+            'game': game['title'],
+            'category': game['sub_title'],
+            'attempt': attempt_id,
+            'started_at': started_at,
+            'offset': round(game['start_offset'] * 1000),
+            'result': 'FINISHED' if finished else 'RESET',
+            'split_times': split_times.tolist(),
+            'reset_index': None if finished else len(split_times),
+            'pauses': []  # LiveSplit only keeps how long an attempt was paused, not when
+        })
+
+    return game, records
+
+
+def import_lss(lss_path: str | Path, game_path: str | Path) -> dict:
+    """
+    Reads a .lss file and writes it out as a PySplit game, with its attempts added to the game's attempt history
+
+    Args:
+        lss_path: (str | Path) the .lss file
+        game_path: (str | Path) where to write the game's JSON, the history goes where AttemptHistory.for_game looks
+
+    Returns:
+        (dict) the game that was written
+    """
+    from Core.AttemptHistory import AttemptHistory  # only needed here, so reading a file stays dependency free
+
+    game, attempts = read_lss(lss_path)
+    atomic_write(game_path, json.dumps(game, indent=4))
+
+    history = AttemptHistory.for_game(str(game_path))
+
+    try:
+        for attempt in attempts:
+            history.append(attempt)
+    finally:
+        history.close()
+
+    return game
+
+
+class _Writer:
+    """
+    Writes the XML element by element straight to the file, indented the way LiveSplit writes it
+    """
+    def __init__(self, f):
+        self.xml = XMLGenerator(f, encoding='utf-8', short_empty_elements=True)
+        self.depth = 0
+
+    def start(self, tag: str, attrs: dict = None):
+        if self.depth:
+            self.xml.ignorableWhitespace('\n' + INDENT * self.depth)
+        self.xml.startElement(tag, {k: str(v) for k, v in (attrs or {}).items()})
+        self.depth += 1
+
+    def end(self, tag: str, inline: bool = False):
+        self.depth -= 1
+
+        if not inline:
+            self.xml.ignorableWhitespace('\n' + INDENT * self.depth)
+
+        self.xml.endElement(tag)
+
+    def element(self, tag: str, text: str = None, attrs: dict = None):
+        self.start(tag, attrs)
+
+        if text:
+            self.xml.characters(text)
+
+        self.end(tag, inline=True)
+
+    def real_time(self, tag: str, ms: int, attrs: dict = None):
+        """
+        Writes a LiveSplit time, with only the real time since PySplit doesn't keep game time
+        """
+        self.start(tag, attrs)
+
+        if ms:
+            self.element('RealTime', format_time(ms))
+
+        self.end(tag, inline=not ms)
+
+
+def write_lss(path: str | Path, game: dict, attempts: Iterable[dict] | Callable[[], Iterable[dict]]):
+    """
+    Writes a game and its attempts out as a .lss file, writing each element as it goes
+
+    LiveSplit keeps each segment's history under the segment, so the attempts are gone through once for the attempt
+    history and then once for each chunk of segments, with the chunks sized so only MAX_HISTORY_CELLS segment times are
+    held at once. A short history is done in a single pass after the first.
+
+    Args:
+        path: (str | Path) where to write the .lss file
+        game: (dict) the game's JSON, eg: from Game.to_dict()
+        attempts: (Iterable[dict] | Callable[[], Iterable[dict]]) the attempts oldest first, either something that can
+            be gone through more than once like a list, or a function that reads them again each time it is called, eg:
+            lambda: history.attempts(game, category)
+
+    Raises:
+        TypeError: if attempts is an iterator, which can only be gone through once
+    """
+    if callable(attempts):
+        read_attempts = attempts
+    elif iter(attempts) is attempts:
+        raise TypeError('the attempts are gone through more than once, pass a list or a function that reads them again')
+    else:
+        read_attempts = lambda: attempts
+
+    splits = game['splits']
+
+    with open(path, 'w', encoding='utf-8') as f:
+        out = _Writer(f)
+        out.xml.startDocument()
+
+        out.start('Run', {'version': LSS_VERSION})
+        out.element('GameIcon')
+        out.element('GameName', game['title'])
+        out.element('CategoryName', game['sub_title'])
+        out.element('LayoutPath')
+
+        out.start('Metadata')
+        out.element('Run', attrs={'id': ''})
+        out.element('Platform', attrs={'usesEmulator': 'False'})
+        out.element('Region')
+        out.element('Variables')
+        out.end('Metadata')
+
+        out.element('Offset', format_time(round(game.get('start_offset', 0.0) * 1000)))
+        out.element('AttemptCount', str(game.get('lifetime_attempts', 0)))
+
+        out.start('AttemptHistory')
+        attempt_count = 0
+
+        for attempt_id, attempt in _with_ids(read_attempts()):
+            split_times = attempt.get('split_times') or []
+            finished = attempt.get('result') == 'FINISHED' and len(split_times) == len(splits)
+
+            attrs = {'id': attempt_id}
+            if attempt.get('started_at') is not None:
+                ended_at = attempt['started_at'] + (split_times[-1] if split_times else 0) - attempt.get('offset', 0)
+                attrs.update(started=format_date(attempt['started_at']), isStartedSynced='True', ended=format_date(ended_at), isEndedSynced='True')
+
+            out.real_time('Attempt', split_times[-1] if finished else 0, attrs)
+            attempt_count += 1
+
+        out.end('AttemptHistory')
+
+        out.start('Segments')
+        chunk = max(1, MAX_HISTORY_CELLS // max(attempt_count, 1))
+
+        for first in range(0, len(splits), chunk):
+            last = min(first + chunk, len(splits))
+            histories = _segment_histories(read_attempts(), first, last)
+
+            for split, (ids, times) in zip(splits[first:last], histories):
+                out.start('Segment')
+                out.element('Name', split['split_name'])
+                out.element('Icon')
+
+                out.start('SplitTimes')
+                out.real_time('SplitTime', split['pb_time_ms'], {'name': COMPARISON})
+                out.end('SplitTimes')
+
+                out.real_time('BestSegmentTime', split['gold_segment_ms'])
+
+                out.start('SegmentHistory')
+                for attempt_id, segment_ms in zip(ids, times):
+                    out.real_time('Time', segment_ms, {'id': attempt_id})
+                out.end('SegmentHistory')
+
+                out.end('Segment')
+
+        out.end('Segments')
+
+        out.element('AutoSplitterSettings')
+        out.end('Run')
+
+        out.xml.endDocument()
+        f.write('\n')
+
+
+def _with_ids(attempts: Iterable[dict]):
+    """
+    Yields each attempt with the id it has in the .lss, its attempt number or where it is in the history if it has none
+    """
+    for n, attempt in enumerate(attempts, 1):
+        yield attempt.get('attempt') or n, attempt
+
+
+def _segment_histories(attempts: Iterable[dict], first: int, last: int) -> list[tuple[array, array]]:
+    """
+    Goes through the attempts for the segments from first up to last
+
+    Returns:
+        (list[tuple[array, array]]) the ids of the attempts that finished each segment, and the segment's time in each
+    """
+    histories = [(array('q'), array('q')) for _ in range(first, last)]
+
+    for attempt_id, attempt in _with_ids(attempts):
+        split_times = attempt.get('split_times') or []
+
+        for i in range(first, min(last, len(split_times))):
+            ids, times = histories[i - first]
+            ids.append(attempt_id)
+            times.append(split_times[i] - (split_times[i - 1] if i else 0))
+
+    return histories
+
+
+def export_lss(game_path: str | Path, lss_path: str | Path):
+    """
+    Writes a PySplit game and its attempt history out as a .lss file
+
+    Args:
+        game_path: (str | Path) the game's JSON
+        lss_path: (str | Path) where to write the .lss file
+    """
+    from Core.AttemptHistory import AttemptHistory
+
+    with open(game_path, 'r') as f:
+        game = json.load(f)
+
+    history = AttemptHistory.for_game(str(game_path))
+
+    try:
+        write_lss(lss_path, game, lambda: history.attempts(game['title'], game['sub_title']))
+    finally:
+        history.close()
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Imports and exports LiveSplit .lss splits along with their attempt history')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    importer = commands.add_parser('import', help='turn a .lss file into a PySplit game')
+    importer.add_argument('lss', type=Path, help='the .lss file to read')
+    importer.add_argument('game', type=Path, help="where to write the game's JSON")
+
+    exporter = commands.add_parser('export', help='turn a PySplit game into a .lss file')
+    exporter.add_argument('game', type=Path, help="the game's JSON")
+    exporter.add_argument('lss', type=Path, help='where to write the .lss file')
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'import':
+        import_lss(args.lss, args.game)
+        print(f'wrote {args.game}', file=sys.stderr)
+    else:
+        export_lss(args.game, args.lss)
+        print(f'wrote {args.lss}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
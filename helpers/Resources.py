@@ -0,0 +1,66 @@
+"""
+Loads the icons and images in resources.qrc, from the compiled resources.rcc when it has been built
+
+Build the .rcc after changing resources.qrc with: python -m helpers.Resources
+"""
+from __future__ import annotations
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+from PySide6.QtCore import QResource
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+QRC_PATH = ROOT_DIR / 'resources.qrc'
+RCC_PATH = ROOT_DIR / 'resources.rcc'
+
+
+def load_resources(rcc_path: str | Path = RCC_PATH) -> str:
+    """
+    Registers the app's resources so :/icons/... paths work
+
+    The binary .rcc is memory mapped by Qt, so it costs next to nothing at startup. If it hasn't been built we fall back
+    to importing resources_rc, which has to load every byte of every icon as a Python literal first.
+
+    Args:
+        rcc_path: (str | Path, optional) the compiled resource file
+
+    Returns:
+        (str) where the resources came from, the .rcc path or 'resources_rc'
+    """
+    rcc_path = str(rcc_path)
+
+    if Path(rcc_path).is_file() and QResource.registerResource(rcc_path):
+        return rcc_path
+
+    import resources_rc  # noqa: F401, registers the resources when it is imported
+
+    return 'resources_rc'
+
+
+def build_resources(qrc_path: str | Path = QRC_PATH, rcc_path: str | Path = RCC_PATH):
+    """
+    Compiles the .qrc into a binary .rcc with pyside6-rcc
+
+    Args:
+        qrc_path: (str | Path, optional) the resource collection to compile
+        rcc_path: (str | Path, optional) where to write the compiled resources
+
+    Raises:
+        FileNotFoundError: if pyside6-rcc can't be found
+        subprocess.CalledProcessError: if pyside6-rcc fails
+    """
+    rcc = shutil.which('pyside6-rcc')
+
+    if rcc is None:
+        raise FileNotFoundError('pyside6-rcc was not found, it comes with PySide6')
+
+    # the paths in the .qrc are relative to it, so compile from its folder
+    subprocess.run([rcc, '--binary', str(Path(qrc_path).resolve()), '-o', str(Path(rcc_path).resolve())], cwd=Path(qrc_path).resolve().parent, check=True)
+
+
+if __name__ == '__main__':
+    build_resources()
+    print(f'wrote {RCC_PATH}', file=sys.stderr)
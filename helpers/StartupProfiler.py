@@ -0,0 +1,270 @@
+"""
+Times where PySplit's startup goes, phase by phase, along with how long every module took to import
+
+Turn it on by launching with --profile-startup (or --profile-startup=report.json), or by setting PYSPLIT_PROFILE_STARTUP
+to 1 or to the path to write the report to. When it is off every call here does nothing.
+
+Nothing here imports Qt, so it can be imported before anything else and see every import after it.
+"""
+from __future__ import annotations
+
+import builtins
+import json
+import os
+import sys
+from contextlib import contextmanager
+from importlib.util import resolve_name
+from time import perf_counter_ns
+
+from helpers.FileHelpers import atomic_write
+
+PROFILE_FLAG = '--profile-startup'
+PROFILE_ENV = 'PYSPLIT_PROFILE_STARTUP'
+DEFAULT_REPORT_PATH = 'startup_profile.json'
+
+NS_PER_MS = 1_000_000
+
+
+class StartupProfiler:
+    """
+    Records nested phases of startup and the cost of each module import
+
+    Phases are opened with phase(), which can be nested. Inside a phase, checkpoint() splits it into consecutive steps
+    without having to indent the code being timed, each checkpoint runs until the next one or until its phase ends.
+
+    Imports are timed by wrapping builtins.__import__, only imports that actually load a module are recorded. A module's
+    total time includes everything it imported, its self time doesn't.
+    """
+    def __init__(self, enabled: bool = False, report_path: str = DEFAULT_REPORT_PATH):
+        self.enabled = enabled
+        self.report_path = report_path
+
+        self.start_ns = perf_counter_ns()
+        self.end_ns = None
+
+        self.phases = []  # [name, depth, start_ns, end_ns, is_checkpoint], in the order they were opened
+        self._open = []  # indexes into phases of the ones still open, innermost last
+
+        self.imports = {}  # module -> [total_ns, self_ns]
+        self.import_ns = 0  # the time spent importing, not counting nested imports twice
+        self._import_stack = []  # the time spent in nested imports of each import in progress
+        self._real_import = None
+        self._timing_imports = False
+
+        if enabled:
+            self.start_import_hook()
+
+    @classmethod
+    def from_environment(cls, argv: list[str] = None, environ: dict = None) -> StartupProfiler:
+        """
+        Makes a profiler that is on if the command line flag or the environment variable asks for it
+
+        Args:
+            argv: (list[str], optional) the command line, defaults to sys.argv
+            environ: (dict, optional) the environment, defaults to os.environ
+
+        Returns:
+            (StartupProfiler) the profiler, on or off
+        """
+        argv = sys.argv if argv is None else argv
+        environ = os.environ if environ is None else environ
+
+        for arg in argv[1:]:
+            if arg == PROFILE_FLAG:
+                return cls(True)
+
+            if arg.startswith(PROFILE_FLAG + '='):
+                return cls(True, arg.split('=', 1)[1] or DEFAULT_REPORT_PATH)
+
+        value = environ.get(PROFILE_ENV, '').strip()
+
+        if value in ('', '0'):
+            return cls(False)
+
+        return cls(True, DEFAULT_REPORT_PATH if value == '1' else value)
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Times everything inside the with block as one phase
+
+        Args:
+            name: (str) what to call the phase in the report
+        """
+        if not self.enabled:
+            yield
+            return
+
+        index = self._begin(name, False)  # inside the current checkpoint, if there is one
+
+        try:
+            yield
+
+        finally:
+            self._end(index)
+
+    def checkpoint(self, name: str):
+        """
+        Ends the current checkpoint, if there is one, and starts timing a new one in the same phase
+
+        Args:
+            name: (str) what to call the step in the report
+        """
+        if not self.enabled:
+            return
+
+        self._close_checkpoint()
+        self._begin(name, True)
+
+    def _begin(self, name: str, is_checkpoint: bool) -> int:
+        self.phases.append([name, len(self._open), perf_counter_ns(), None, is_checkpoint])
+        self._open.append(len(self.phases) - 1)
+
+        return self._open[-1]
+
+    def _end(self, index: int):
+        # anything opened inside this phase that was never closed ends with it
+        while self._open:
+            top = self._open.pop()
+            self.phases[top][3] = perf_counter_ns()
+
+            if top == index:
+                break
+
+    def _close_checkpoint(self):
+        if self._open and self.phases[self._open[-1]][4]:
+            self._end(self._open[-1])
+
+    def start_import_hook(self):
+        """
+        Starts timing imports, does nothing if it is already started
+        """
+        if self._timing_imports:
+            return
+
+        self._timing_imports = True
+
+        if self._real_import is None:
+            self._real_import = builtins.__import__
+            builtins.__import__ = self._timed_import
+
+    def stop_import_hook(self):
+        """
+        Stops timing imports, and puts the normal import back if nothing has wrapped ours since
+        """
+        self._timing_imports = False
+
+        # PySide6 wraps whatever __import__ it finds, so ours can't always be taken out, it just passes everything through
+        if self._real_import is not None and builtins.__import__ == self._timed_import:
+            builtins.__import__ = self._real_import
+            self._real_import = None
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        real_import = self._real_import
+
+        if not self._timing_imports:
+            return real_import(name, globals, locals, fromlist, level)
+
+        try:
+            module = resolve_name('.' * level + name, (globals or {}).get('__package__')) if level else name
+        except (ImportError, ValueError):
+            module = None
+
+        if module is None or module in sys.modules:
+            return real_import(name, globals, locals, fromlist, level)  # already loaded, so it costs nothing worth timing
+
+        self._import_stack.append(0)
+        start = perf_counter_ns()
+
+        try:
+            return real_import(name, globals, locals, fromlist, level)
+
+        finally:
+            total = perf_counter_ns() - start
+            nested = self._import_stack.pop()
+
+            if self._import_stack:
+                self._import_stack[-1] += total
+            else:
+                self.import_ns += total
+
+            if module in sys.modules:  # one that failed to import didn't load anything
+                times = self.imports.setdefault(module, [0, 0])
+                times[0] += total
+                times[1] += total - nested
+
+    def finish(self):
+        """
+        Stops profiling and writes the report, then prints the summary to stderr. Only the first call does anything.
+        """
+        if not self.enabled or self.end_ns is not None:
+            return
+
+        self.end_ns = perf_counter_ns()
+        self.stop_import_hook()
+
+        if self._open:
+            self._end(self._open[0])
+
+        atomic_write(self.report_path, json.dumps(self.report(), indent=4))
+
+        print(self.summary(), file=sys.stderr)
+        print(f'startup report written to {self.report_path}', file=sys.stderr)
+
+    def report(self) -> dict:
+        """
+        Builds the machine-readable report
+
+        Returns:
+            (dict) the total time, the time spent importing, every phase in the order it started, and every import, slowest
+                self time first
+        """
+        end_ns = self.end_ns if self.end_ns is not None else perf_counter_ns()
+
+        phases = [{
+            'name': name,
+            'depth': depth,
+            'start_ms': (start - self.start_ns) / NS_PER_MS,
+            'duration_ms': ((end if end is not None else end_ns) - start) / NS_PER_MS
+        } for name, depth, start, end, _ in self.phases]
+
+        imports = [{
+            'module': module,
+            'total_ms': total / NS_PER_MS,
+            'self_ms': self_ns / NS_PER_MS
+        } for module, (total, self_ns) in sorted(self.imports.items(), key=lambda item: item[1][1], reverse=True)]
+
+        return {
+            'total_ms': (end_ns - self.start_ns) / NS_PER_MS,
+            'imports_ms': self.import_ns / NS_PER_MS,
+            'phases': phases,
+            'imports': imports
+        }
+
+    def summary(self, top_imports: int = 15) -> str:
+        """
+        Builds the human-readable summary
+
+        Args:
+            top_imports: (int, optional) how many of the slowest imports to list
+
+        Returns:
+            (str) the phases as an indented tree and the slowest imports
+        """
+        report = self.report()
+
+        lines = [f'PySplit startup: {report["total_ms"]:.1f} ms, {report["imports_ms"]:.1f} ms of it importing', '', 'phases:']
+
+        for phase in report['phases']:
+            label = '  ' * phase['depth'] + phase['name']
+            lines.append(f'  {label:<40}{phase["duration_ms"]:>10.1f} ms')
+
+        lines += ['', 'slowest imports (self / total):']
+
+        for entry in report['imports'][:top_imports]:
+            lines.append(f'  {entry["module"]:<40}{entry["self_ms"]:>10.1f} ms{entry["total_ms"]:>10.1f} ms')
+
+        return '\n'.join(lines)
+
+
+profiler = StartupProfiler.from_environment()  # the one for this launch, Main imports this first so the import times cover everything
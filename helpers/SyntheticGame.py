@@ -0,0 +1,233 @@
+"""
+Makes up games, attempt histories and control event streams of any size, for stress tests and benchmarks
+
+The games are laid out the same as the files Models.Game reads, and the attempts the same as the records the splits
+widget adds to the attempt history, so anything made here can be loaded the same as the real thing.
+
+Write a game to disk with: python -m helpers.SyntheticGame OUT.json --splits 100000 --attempts 50 --events
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from random import Random
+from typing import Iterator
+
+MEDIAN_SEGMENT_MS = 60_000  # a minute a segment, the length varies a lot around this like real routes do
+SEGMENT_SPREAD = 0.6  # the sigma of the log-normal the segment lengths are drawn from
+MIN_SEGMENT_MS = 1000
+
+GOLD_RANGE = (0.88, 0.97)  # how much faster than the runner's usual pace their best ever segment is
+PB_LOSS = 0.04  # how much slower than the gold the pb segment is on average
+ATTEMPT_LOSS = 0.08  # how much slower than the gold a segment in a normal attempt is on average
+GOLD_CHANCE = 0.02  # the chance of any segment of an attempt beating the gold
+
+RESET_CHANCE = 0.7  # most attempts never make it to the end
+PAUSE_CHANCE = 0.1
+
+EVENTS_SUFFIX = '.events.jsonl'
+
+END_EVENTS = {'RESET': 'RESET', 'STOPPED': 'STOP'}  # the event that ends an attempt early with each result
+
+
+def generate_game(split_count: int, seed: int = None, title: str = 'Synthetic Game', sub_title: str = None,
+                  attempts: int = 0, median_segment_ms: int = MEDIAN_SEGMENT_MS) -> dict:
+    """
+    Makes up a game's JSON with realistic segment lengths, pb segments a little slower than the golds, and running pb times
+
+    Args:
+        split_count: (int) how many splits the game has
+        seed: (int, optional) makes the same game every time for the same seed
+        title: (str, optional) the game's title
+        sub_title: (str, optional) the category, defaults to saying how many splits there are
+        attempts: (int, optional) how many attempts the game says it has had
+        median_segment_ms: (int, optional) how long a typical segment takes
+
+    Returns:
+        (dict) the game, ready for Game.from_json or json.dump
+    """
+    rng = Random(seed)
+    lognormvariate, uniform, expovariate = rng.lognormvariate, rng.uniform, rng.expovariate
+
+    splits = []
+    pb_time = 0
+
+    for i in range(split_count):
+        pace = max(MIN_SEGMENT_MS, median_segment_ms * lognormvariate(0, SEGMENT_SPREAD))
+        gold = round(pace * uniform(*GOLD_RANGE))
+        pb_segment = round(gold * (1 + expovariate(1 / PB_LOSS)))
+        pb_time += pb_segment
+
+        splits.append({
+            'split_name': f'Split {i + 1}',
+            'pb_time_ms': pb_time,
+            'pb_segment_ms': pb_segment,
+            'gold_segment_ms': gold
+        })
+
+    return {
+        'title': title,
+        'sub_title': sub_title if sub_title is not None else f'{split_count} Splits',
+        'lifetime_attempts': attempts,
+        'start_offset': 0.0,
+        'display_pb': True,
+        'splits': splits
+    }
+
+
+def generate_attempts(game: dict, count: int, seed: int = None, reset_chance: float = RESET_CHANCE,
+                      pause_chance: float = PAUSE_CHANCE, started_at: int = 1_700_000_000_000) -> Iterator[dict]:
+    """
+    Makes up attempts at the game, in the same shape as the records the splits widget adds to the attempt history
+
+    Most attempts are reset, and most resets happen early. Segments are usually a little slower than the golds, with the
+    odd new gold.
+
+    Args:
+        game: (dict) the game's JSON, from generate_game or a real file
+        count: (int) how many attempts to make
+        seed: (int, optional) makes the same attempts every time for the same seed
+        reset_chance: (float, optional) the chance of an attempt being reset before the end
+        pause_chance: (float, optional) the chance of an attempt being paused once
+        started_at: (int, optional) the wall clock time in ms the first attempt started at
+
+    Returns:
+        (Iterator[dict]) the attempts, oldest first
+    """
+    rng = Random(seed)
+    random, uniform, expovariate, randrange = rng.random, rng.uniform, rng.expovariate, rng.randrange
+
+    golds = [split['gold_segment_ms'] for split in game['splits']]
+    split_count = len(golds)
+    first_attempt = max(1, game.get('lifetime_attempts', 0) - count + 1)
+
+    for n in range(count):
+        reset_index = int(split_count * random() ** 3) if split_count and random() < reset_chance else None  # resets bunch up early
+        last = split_count if reset_index is None else reset_index
+
+        split_times = []
+        time = 0
+
+        for gold in golds[:last]:
+            if random() < GOLD_CHANCE:
+                time += max(1, round(gold * uniform(0.97, 1.0)))
+            else:
+                time += round(gold * (1 + expovariate(1 / ATTEMPT_LOSS)))
+
+            split_times.append(time)
+
+        pauses = []
+        if random() < pause_chance:
+            paused_at = randrange(time + 1)
+            pauses.append([paused_at, paused_at])  # the timer doesn't move while paused, so it resumes at the same time
+
+        yield {
+            'game': game['title'],
+            'category': game['sub_title'],
+            'attempt': first_attempt + n,
+            'started_at': started_at,
+            'offset': 0,
+            'result': 'FINISHED' if reset_index is None else 'RESET',
+            'split_times': split_times,
+            'reset_index': reset_index,
+            'pauses': pauses
+        }
+
+        started_at += time + 30_000  # and a little time to get going again
+
+
+def attempt_events(attempt: dict) -> list[dict]:
+    """
+    Turns an attempt back into the control events that would have made it, the same as the run journal's entries
+
+    Playing them through a Core.Run.Run over the attempt's game ends with the run's last_attempt matching the attempt.
+
+    Args:
+        attempt: (dict) an attempt from generate_attempts, or a real one from the attempt history
+
+    Returns:
+        (list[dict]) each {'event', 'time'} in order
+    """
+    events = [{'event': 'STARTSPLIT', 'time': None}]
+    pauses = sorted(attempt['pauses'])
+
+    for split_time in attempt['split_times']:
+        while pauses and pauses[0][0] <= split_time:
+            paused_at, resumed_at = pauses.pop(0)
+            events.append({'event': 'PAUSE', 'time': paused_at})
+            events.append({'event': 'RESUME', 'time': resumed_at})
+
+        events.append({'event': 'STARTSPLIT', 'time': split_time})
+
+    for paused_at, resumed_at in pauses:
+        events.append({'event': 'PAUSE', 'time': paused_at})
+        events.append({'event': 'RESUME', 'time': resumed_at})
+
+    if attempt['result'] in END_EVENTS:
+        events.append({'event': END_EVENTS[attempt['result']], 'time': None})
+
+    return events
+
+
+def write_game(path: str | Path, split_count: int, attempts: int = 0, events: bool = False, seed: int = None) -> dict:
+    """
+    Makes up a game and writes it to disk, along with its attempt history and event stream if asked for
+
+    The history goes where AttemptHistory.for_game looks for it, the events go next to the game in a .events.jsonl with
+    one attempt's events per line.
+
+    Args:
+        path: (str | Path) where to write the game's JSON
+        split_count: (int) how many splits the game has
+        attempts: (int, optional) how many attempts to add to its history
+        events: (bool, optional) whether to write the control events for each attempt too
+        seed: (int, optional) makes the same files every time for the same seed
+
+    Returns:
+        (dict) the game that was written
+    """
+    from Core.AttemptHistory import AttemptHistory  # only needed here, so making games in memory stays dependency free
+    from helpers.FileHelpers import atomic_write
+
+    path = Path(path)
+    game = generate_game(split_count, seed=seed, attempts=attempts)
+
+    atomic_write(path, json.dumps(game, indent=4))
+
+    if attempts:
+        history = AttemptHistory.for_game(str(path))
+        events_file = open(path.with_name(path.stem + EVENTS_SUFFIX), 'w') if events else None
+
+        try:
+            for attempt in generate_attempts(game, attempts, seed=seed):
+                history.append(attempt)
+
+                if events_file is not None:
+                    events_file.write(json.dumps(attempt_events(attempt), separators=(',', ':')) + '\n')
+
+        finally:
+            history.close()
+
+            if events_file is not None:
+                events_file.close()
+
+    return game
+
+
+def main(argv: list[str] = None):
+    parser = argparse.ArgumentParser(description='Makes up a game, and optionally its attempt history and control events')
+    parser.add_argument('path', type=Path, help="where to write the game's JSON")
+    parser.add_argument('--splits', type=int, default=1000, help='how many splits the game has')
+    parser.add_argument('--attempts', type=int, default=0, help='how many attempts to add to its history')
+    parser.add_argument('--events', action='store_true', help='also write the control events for each attempt')
+    parser.add_argument('--seed', type=int, default=None, help='makes the same files every time for the same seed')
+    args = parser.parse_args(argv)
+
+    write_game(args.path, args.splits, args.attempts, args.events, args.seed)
+    print(f'wrote {args.path}', file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()